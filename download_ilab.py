@@ -3,58 +3,345 @@
 Script to download i-Lab laureates dataset from French government open data portal
 """
 
-import requests
+import argparse
+import hashlib
+import json
+import os
 import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.client import HTTPException
+from pathlib import Path
 
-def download_ilab_data():
-    """Download i-Lab dataset from data.enseignementsup-recherche.gouv.fr"""
+# Mirrors of the i-Lab export, raced against each other
+MIRRORS = [
+    "https://data.enseignementsup-recherche.gouv.fr/api/explore/v2.1/catalog/datasets/fr-esr-laureats-concours-national-i-lab/exports/csv",
+    "https://data.enseignementsup-recherche.gouv.fr/explore/dataset/fr-esr-laureats-concours-national-i-lab/download/?format=csv",
+    "https://data.enseignementsup-recherche.gouv.fr/api/records/1.0/download?dataset=fr-esr-laureats-concours-national-i-lab&format=csv",
+]
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/csv,application/csv,*/*',
+    'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
+    'Referer': 'https://data.enseignementsup-recherche.gouv.fr/'
+}
+
+MIN_FILE_SIZE = 1000  # anything smaller is an error page, not the dataset
+CHUNK_SIZE = 1 << 16
+MAX_RESUMES = 3
+
+# Network failures that are worth trying another mirror (or a resume) for
+NETWORK_ERRORS = (urllib.error.URLError, HTTPException, OSError)
+
+class DownloadError(Exception):
+    """Raised when no mirror delivers a valid, complete file"""
+
+def file_sha256(filepath):
+    """sha256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def meta_path(output_file):
+    """Sidecar holding the URL, validators, size and checksum of a download"""
+    return output_file.with_name(output_file.name + '.meta.json')
+
+def part_path(output_file):
+    """Temporary file a download is streamed into before the atomic rename"""
+    return output_file.with_name(output_file.name + '.part')
+
+def load_meta(path):
+    """Read a JSON sidecar, or None if it is missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_meta(path, meta):
+    """Write a JSON sidecar atomically"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, path)
+
+def conditional_headers(output_file, meta):
+    """
+    If-None-Match / If-Modified-Since for an output file that is still the
+    one recorded in its sidecar, so unchanged data is not fetched again.
+    """
+    if meta is None or not output_file.exists():
+        return {}
+    if output_file.stat().st_size != meta.get('size') or file_sha256(output_file) != meta.get('sha256'):
+        return {}
 
-    # Try different URL formats for the i-Lab dataset
-    urls = [
-        "https://data.enseignementsup-recherche.gouv.fr/api/explore/v2.1/catalog/datasets/fr-esr-laureats-concours-national-i-lab/exports/csv",
-        "https://data.enseignementsup-recherche.gouv.fr/explore/dataset/fr-esr-laureats-concours-national-i-lab/download/?format=csv",
-        "https://data.enseignementsup-recherche.gouv.fr/api/records/1.0/download?dataset=fr-esr-laureats-concours-national-i-lab&format=csv",
-    ]
-
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/csv,application/csv,*/*',
-        'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
-        'Referer': 'https://data.enseignementsup-recherche.gouv.fr/'
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    return headers
+
+def validators(response):
+    """ETag and Last-Modified of a response (None when absent)"""
+    return {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
     }
 
-    for i, url in enumerate(urls, 1):
-        print(f"Attempt {i}/{len(urls)}: Trying {url}")
+def expected_size(response, offset=0):
+    """Full size of the file from Content-Range or Content-Length, if known"""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range and not content_range.endswith('/*'):
+        return int(content_range.rsplit('/', 1)[1])
+    content_length = response.headers.get('Content-Length')
+    return offset + int(content_length) if content_length else None
+
+def probe_mirror(url, headers, timeout):
+    """
+    Open one mirror and check that it serves the dataset. Returns the open
+    response (None on 304 Not Modified) and its first chunk.
+    """
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return {'url': url, 'response': None, 'first_chunk': b''}
+        raise
+
+    try:
+        first_chunk = response.read(CHUNK_SIZE)
+        content_type = response.headers.get('Content-Type', '').lower()
+        size = expected_size(response)
+        # A CSV content type, or a body too large to be an error message
+        if 'csv' not in content_type and (size or len(first_chunk)) <= MIN_FILE_SIZE:
+            raise ValueError("Response doesn't appear to be the dataset")
+        if first_chunk.lstrip().startswith(b'<'):
+            raise ValueError("Response is an HTML page, not the dataset")
+    except BaseException:
+        response.close()
+        raise
+
+    return {'url': url, 'response': response, 'first_chunk': first_chunk}
+
+def close_probe(future):
+    """Release the connection of a mirror that lost the race"""
+    if not future.cancelled() and future.exception() is None:
+        response = future.result()['response']
+        if response is not None:
+            response.close()
+
+def race_mirrors(urls, headers, timeout):
+    """
+    Open all mirrors concurrently and return the first valid probe. The
+    other connections are closed as soon as they answer.
+    """
+    pool = ThreadPoolExecutor(max_workers=len(urls))
+    futures = {pool.submit(probe_mirror, url, headers, timeout): url for url in urls}
+    winner = None
+    failures = []
+    try:
+        for future in as_completed(futures):
+            try:
+                winner = future.result()
+            except (ValueError, *NETWORK_ERRORS) as e:
+                failures.append(f"{futures[future]}: {e}")
+                continue
+            print(f"  Fastest valid mirror: {futures[future]}")
+            break
+    finally:
+        for future in futures:
+            if winner is None or not future.done() or future.exception() is not None \
+                    or future.result() is not winner:
+                future.add_done_callback(close_probe)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if winner is None:
+        raise DownloadError("All mirrors failed:\n  " + "\n  ".join(failures))
+    return winner
+
+def _chain(first_chunk, response):
+    """The already-read first chunk followed by the rest of the body"""
+    yield first_chunk
+    yield from iter(lambda: response.read(CHUNK_SIZE), b'')
+
+def stream_to_part(response, first_chunk, part_file, digest, offset):
+    """Append a response body to the part file, hashing it; returns the new size"""
+    with open(part_file, 'r+b' if offset else 'wb') as f:
+        f.seek(offset)
+        f.truncate()
+        for chunk in _chain(first_chunk, response):
+            f.write(chunk)
+            digest.update(chunk)
+            offset += len(chunk)
+    return offset
+
+def resume_request(url, offset, resume_validators, timeout):
+    """Request the rest of a file from byte offset, only if it is unchanged"""
+    headers = dict(HEADERS, Range=f'bytes={offset}-')
+    # If-Range makes the server send the whole (new) file if it changed
+    validator = resume_validators.get('etag') or resume_validators.get('last_modified')
+    if validator:
+        headers['If-Range'] = validator
+    return urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout)
+
+def download_to_part(url, response, first_chunk, part_file, timeout, offset=0, digest=None):
+    """
+    Stream a mirror's response into the part file, resuming with a Range
+    request when the connection drops. Returns (size, sha256, validators).
+    """
+    digest = digest or hashlib.sha256()
+    resume_validators = validators(response)
+    total = expected_size(response, offset)
+    save_meta(meta_path(part_file), {'url': url, 'total': total, **resume_validators})
+
+    for attempt in range(MAX_RESUMES + 1):
         try:
-            response = requests.get(url, headers=headers, timeout=30, allow_redirects=True)
-
-            if response.status_code == 200:
-                # Check if we got CSV data
-                content_type = response.headers.get('Content-Type', '')
-                if 'csv' in content_type.lower() or len(response.content) > 1000:
-                    output_file = 'ilab_laureats.csv'
-                    with open(output_file, 'wb') as f:
-                        f.write(response.content)
-                    print(f"✓ Successfully downloaded data to {output_file}")
-                    print(f"  File size: {len(response.content)} bytes")
-                    return True
-                else:
-                    print(f"  Response doesn't appear to be CSV data")
-            else:
-                print(f"  HTTP {response.status_code}: {response.reason}")
-
-        except requests.exceptions.RequestException as e:
-            print(f"  Error: {e}")
-
-        if i < len(urls):
-            time.sleep(2)
-
-    print("\n✗ All download attempts failed")
-    print("\nAlternative: Please manually download the file from:")
-    print("https://www.data.gouv.fr/datasets/laureats-i-lab-concours-national-daide-a-la-creation-dentreprises-de-technologies-innovantes-1")
-    print("or")
-    print("https://data.enseignementsup-recherche.gouv.fr/explore/dataset/fr-esr-laureats-concours-national-i-lab/")
-    return False
+            if response is None:
+                response = resume_request(url, offset, resume_validators, timeout)
+                if response.status != 206:
+                    # The server ignored the range (or the file changed) - start over
+                    offset = 0
+                    digest = hashlib.sha256()
+                    resume_validators = validators(response)
+                    total = expected_size(response)
+                    save_meta(meta_path(part_file), {'url': url, 'total': total, **resume_validators})
+
+            offset = stream_to_part(response, first_chunk, part_file, digest, offset)
+            if total is None or offset >= total:
+                break
+            raise HTTPException(f"connection closed at {offset:,} of {total:,} bytes")
+        except NETWORK_ERRORS as e:
+            if attempt == MAX_RESUMES:
+                raise DownloadError(f"Download from {url} kept failing: {e}")
+            # Every chunk on disk is also in the digest, so resume from there
+            offset = part_file.stat().st_size if part_file.exists() else 0
+            print(f"  Interrupted at {offset:,} bytes ({e}), resuming...")
+        finally:
+            if response is not None:
+                response.close()
+
+        response = None
+        first_chunk = b''
+
+    return offset, digest.hexdigest(), resume_validators
+
+def resume_previous(output_file, timeout):
+    """
+    Continue a download an earlier run left unfinished, if its mirror still
+    serves the same file. Returns (url, download_to_part result), or None.
+    """
+    part_file = part_path(output_file)
+    part_meta = load_meta(meta_path(part_file))
+    if part_meta is None or not part_file.exists():
+        return None
+    if not (part_meta.get('etag') or part_meta.get('last_modified')):
+        return None
+
+    offset = part_file.stat().st_size
+    digest = hashlib.sha256()
+    with open(part_file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+
+    try:
+        response = resume_request(part_meta['url'], offset, part_meta, timeout)
+    except NETWORK_ERRORS:
+        return None
+    if response.status != 206:
+        response.close()
+        return None
+
+    print(f"Resuming {part_meta['url']} from {offset:,} bytes")
+    return part_meta['url'], download_to_part(part_meta['url'], response, b'', part_file, timeout,
+                                              offset=offset, digest=digest)
+
+def fetch(urls, output_file, expected_sha256=None, timeout=30, force=False):
+    """
+    Fetch one file from a list of mirrors into output_file.
+
+    All mirrors are raced and the first valid response is streamed to a
+    part file, then checked (size, optional sha256) and renamed into place.
+    A file that is unchanged on the server (ETag/Last-Modified) is kept.
+    Returns 'downloaded' or 'not_modified'; the sidecar records when the
+    server was last checked ('checked_at').
+    """
+    output_file = Path(output_file)
+    part_file = part_path(output_file)
+    meta = None if force else load_meta(meta_path(output_file))
+
+    resumed = None if force else resume_previous(output_file, timeout)
+    if resumed is None:
+        headers = dict(HEADERS, **conditional_headers(output_file, meta))
+        print(f"Racing {len(urls)} mirror(s) for {output_file.name}...")
+        probe = race_mirrors(urls, headers, timeout)
+
+        if probe['response'] is None:
+            save_meta(meta_path(output_file), dict(meta, checked_at=time.time()))
+            print(f"✓ {output_file} is up to date (not modified on {probe['url']})")
+            return 'not_modified'
+
+        url = probe['url']
+        result = download_to_part(url, probe['response'], probe['first_chunk'], part_file, timeout)
+    else:
+        url, result = resumed
+
+    size, sha256, response_validators = result
+    part_meta = load_meta(meta_path(part_file)) or {}
+
+    # Integrity checks before the file replaces the current one
+    if part_meta.get('total') is not None and size != part_meta['total']:
+        raise DownloadError(f"Size mismatch: got {size:,} bytes, expected {part_meta['total']:,}")
+    if size <= MIN_FILE_SIZE:
+        raise DownloadError(f"Downloaded file too small: {size} bytes (expected > {MIN_FILE_SIZE})")
+    if expected_sha256 and sha256 != expected_sha256.lower():
+        part_file.unlink()
+        meta_path(part_file).unlink(missing_ok=True)
+        raise DownloadError(f"Checksum mismatch: got sha256 {sha256}, expected {expected_sha256}")
+
+    os.replace(part_file, output_file)
+    meta_path(part_file).unlink(missing_ok=True)
+    save_meta(meta_path(output_file), {
+        'url': url, 'size': size, 'sha256': sha256, **response_validators,
+        'checked_at': time.time(),
+    })
+
+    print(f"✓ Successfully downloaded data to {output_file}")
+    print(f"  File size: {size} bytes")
+    print(f"  sha256: {sha256}")
+    return 'downloaded'
+
+def download_ilab_data(output_file='ilab_laureats.csv', expected_sha256=None, timeout=30, force=False):
+    """Download i-Lab dataset from data.enseignementsup-recherche.gouv.fr"""
+    fetch(MIRRORS, output_file, expected_sha256, timeout, force)
+    return True
+
+def main():
+    """Main download function"""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--output', type=Path, default=Path('ilab_laureats.csv'),
+                        help="where to write the CSV")
+    parser.add_argument('--sha256', help="expected sha256 of the CSV")
+    parser.add_argument('--timeout', type=float, default=30,
+                        help="per-request timeout in seconds")
+    parser.add_argument('--force', action='store_true',
+                        help="ignore the cached validators and any partial download")
+    args = parser.parse_args()
+
+    try:
+        return download_ilab_data(args.output, args.sha256, args.timeout, args.force)
+    except DownloadError as e:
+        print(f"\n✗ {e}")
+        print("\nAlternative: Please manually download the file from:")
+        print("https://www.data.gouv.fr/datasets/laureats-i-lab-concours-national-daide-a-la-creation-dentreprises-de-technologies-innovantes-1")
+        print("or")
+        print("https://data.enseignementsup-recherche.gouv.fr/explore/dataset/fr-esr-laureats-concours-national-i-lab/")
+        return False
 
 if __name__ == "__main__":
-    download_ilab_data()
+    main()
@@ -0,0 +1,992 @@
+#!/usr/bin/env python3
+"""
+i-Lab dashboard data layer
+Loading, indexes, aggregation and figure building of the dashboard, without
+any Streamlit call - shared by streamlit_app.py and the build scripts, which
+must produce exactly what the app renders
+"""
+
+import hashlib
+import json
+import math
+import re
+import unicodedata
+from array import array
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+DATA_DIR = Path(__file__).parent / "data" / "ilab"
+LAUREATES_CSV = DATA_DIR / "ilab_laureats.csv"
+LAUREATES_CACHE = DATA_DIR / "ilab_laureats.arrow"
+
+CATEGORICAL_COLUMNS = ['Région', 'Domaine technologique', 'Genre', 'Type de candidature']
+YEAR_COLUMN = 'Année de concours'
+REGION_COLUMN = 'Région'
+
+# Address fields the geocoding index is keyed on, when the source has them
+# (the i-Lab export itself only has the region; a SIRENE-enriched file adds
+# the establishment postcode and commune).
+POSTCODE_COLUMNS = ['Code postal', 'codePostalEtablissement']
+COMMUNE_COLUMNS = ['Commune', 'Ville', 'libelleCommuneEtablissement']
+
+# Columns the filters, charts, map and table need. The long free-text
+# columns (summary, emails, research units...) stay on disk until exported.
+CORE_COLUMNS = (
+    [YEAR_COLUMN] + CATEGORICAL_COLUMNS + ['Nom du lauréat', 'Projet']
+    + POSTCODE_COLUMNS + COMMUNE_COLUMNS
+)
+
+def print_warning(message):
+    """Default problem reporter of the loaders (the dashboard shows them in the page)"""
+    print(f"⚠️ {message}")
+
+def read_source_csv(csv_path):
+    """Parse the semicolon-delimited source CSV"""
+    try:
+        # Try UTF-8 with BOM
+        df = pd.read_csv(csv_path, delimiter=';', encoding='utf-8-sig')
+    except Exception as e:
+        try:
+            # Fallback to regular UTF-8
+            df = pd.read_csv(csv_path, delimiter=';', encoding='utf-8')
+        except Exception as e2:
+            size = csv_path.stat().st_size if csv_path.exists() else 'N/A'
+            # Clean up invalid file so it will be re-downloaded next time
+            if csv_path.exists():
+                csv_path.unlink()
+            raise ValueError(f"Failed to parse CSV ({size} bytes): {e2}") from e2
+
+    # Validate we got data
+    if df is None or df.empty:
+        if csv_path.exists():
+            csv_path.unlink()
+        raise ValueError("CSV loaded but contains no data")
+
+    return df
+
+def to_columnar_types(df):
+    """Dictionary-encode the filter columns and store the year as an integer"""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if YEAR_COLUMN in df.columns:
+        years = pd.to_numeric(df[YEAR_COLUMN], errors='coerce')
+        df[YEAR_COLUMN] = years.astype('int16' if years.notna().all() else 'Int16')
+    return df
+
+def file_signature(path):
+    """Size and mtime of a source file, stored in derived indexes to detect staleness"""
+    stat = path.stat()
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+def source_signature(csv_path):
+    """Size and mtime of the source CSV, stored in the cache metadata"""
+    stat = csv_path.stat()
+    return {
+        b'ilab_source_size': str(stat.st_size).encode(),
+        b'ilab_source_mtime_ns': str(stat.st_mtime_ns).encode(),
+    }
+
+def read_columnar_cache(cache_path, signature, columns=None):
+    """
+    Memory-map the Arrow cache and convert only the requested columns,
+    or return None if the cache is missing or stale.
+    """
+    import pyarrow as pa
+
+    if not cache_path.exists():
+        return None
+    try:
+        with pa.memory_map(str(cache_path)) as source:
+            reader = pa.ipc.open_file(source)
+            metadata = reader.schema.metadata or {}
+            if any(metadata.get(key) != value for key, value in signature.items()):
+                return None
+            table = reader.read_all()
+            if columns is not None:
+                table = table.select([col for col in columns if col in table.column_names])
+            return table.to_pandas()
+    except (pa.ArrowInvalid, OSError):
+        # Unreadable cache - rebuild it from the CSV
+        return None
+
+def write_columnar_cache(df, cache_path, signature):
+    """Write the typed frame as an uncompressed Arrow IPC file (memory-mappable)"""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **signature})
+    # Write next to the target and rename so readers never see a partial file
+    tmp_path = cache_path.with_suffix('.arrow.tmp')
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    tmp_path.replace(cache_path)
+
+def load_laureates(csv_path=LAUREATES_CSV, cache_path=LAUREATES_CACHE, warn=print_warning):
+    """
+    The CORE_COLUMNS of the laureates CSV, served from the columnar cache
+    while it still matches the CSV, else parsed and written to the cache.
+    """
+    import pyarrow as pa
+
+    signature = source_signature(csv_path)
+    df = read_columnar_cache(cache_path, signature, CORE_COLUMNS)
+    if df is not None:
+        return df
+
+    df = to_columnar_types(read_source_csv(csv_path))
+    try:
+        write_columnar_cache(df, cache_path, signature)
+    except (pa.ArrowException, OSError) as e:
+        # The cache is an optimisation only - keep serving the parsed CSV
+        warn(f"Could not write data cache: {e}")
+
+    return df[[col for col in CORE_COLUMNS if col in df.columns]]
+
+def load_detail_rows(row_ids, csv_path=LAUREATES_CSV, cache_path=LAUREATES_CACHE):
+    """All columns of the given rows, fetched from the columnar cache on demand"""
+    import pyarrow as pa
+
+    if cache_path.exists():
+        signature = source_signature(csv_path)
+        try:
+            with pa.memory_map(str(cache_path)) as source:
+                reader = pa.ipc.open_file(source)
+                metadata = reader.schema.metadata or {}
+                # A cache of an earlier CSV (the last rewrite failed) holds other rows
+                if all(metadata.get(key) == value for key, value in signature.items()):
+                    table = reader.read_all()
+                    return table.take(pa.array(row_ids, type=pa.int64())).to_pandas()
+        except (pa.ArrowInvalid, OSError):
+            pass
+
+    # No cache matching the CSV (it could not be written) - fall back to the source CSV
+    df = to_columnar_types(pd.read_csv(csv_path, delimiter=';', encoding='utf-8-sig'))
+    return df.iloc[row_ids]
+
+FILTER_COLUMNS = ['Région', 'Domaine technologique', 'Genre']
+
+def build_filter_index(df):
+    """
+    Build the sidebar filter index: a year-sorted row order plus one packed
+    row bitmap per value of each filter column.
+    """
+    year_values = df[YEAR_COLUMN].to_numpy(dtype='float64', na_value=np.nan)
+    valid_rows = np.flatnonzero(~np.isnan(year_values))
+    order = valid_rows[np.argsort(year_values[valid_rows], kind='stable')]
+    sorted_years = year_values[order].astype(np.int64)
+
+    bitmaps = {}
+    for col in FILTER_COLUMNS:
+        codes = df[col].cat.codes.to_numpy()
+        bitmaps[col] = {
+            value: np.packbits(codes == code)
+            for code, value in enumerate(df[col].cat.categories)
+        }
+
+    return {
+        'n_rows': len(df),
+        'order': order,
+        'sorted_years': sorted_years,
+        'years': [int(y) for y in np.unique(sorted_years)],
+        'bitmaps': bitmaps,
+    }
+
+def select_rows(index, year_range, selections):
+    """
+    Return the ascending row ids matching a year range and the multiselect
+    values in selections ({column: values}; an empty list means no filter).
+    """
+    n_rows = index['n_rows']
+    sorted_years = index['sorted_years']
+    start = np.searchsorted(sorted_years, year_range[0], side='left')
+    stop = np.searchsorted(sorted_years, year_range[1], side='right')
+
+    in_range = np.zeros(n_rows, dtype=bool)
+    in_range[index['order'][start:stop]] = True
+    bits = np.packbits(in_range)
+
+    for col, values in selections.items():
+        if not values:
+            continue
+        column_bitmaps = index['bitmaps'][col]
+        selected = np.zeros_like(bits)
+        for value in values:
+            if value in column_bitmaps:
+                selected |= column_bitmaps[value]
+        bits &= selected
+
+    return np.flatnonzero(np.unpackbits(bits, count=n_rows))
+
+def filter_signature(year_range, selections):
+    """Canonical, hashable form of the sidebar filter state"""
+    return (int(year_range[0]), int(year_range[1])) + tuple(
+        (col, tuple(sorted(values))) for col, values in sorted(selections.items())
+    )
+
+# Free-text columns the dashboard search box looks in
+SEARCH_COLUMNS = ['Projet', 'Résumé']
+SEARCH_INDEX = DATA_DIR / "ilab_search_index.npz"
+
+SEARCH_TOKEN = re.compile(r'[a-z0-9]+')
+SEARCH_MAX_TERM_LENGTH = 40  # longer runs are hashes, URLs or base64, not words
+# Words that occur in nearly every French (or English) text and carry no meaning on their own
+SEARCH_STOPWORDS = frozenset("""
+    au aux avec ce ces cet cette dans de des du elle en est et il ils la le les leur leurs
+    lui mais ne nos notre nous on ou par pas plus pour qu que qui sa se ses son sont sur
+    un une vos votre vous and are for from in is of on or the to with
+""".split())
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def fold_text(text):
+    """Lower-case ASCII form of French text ("L'Œuvre Économique" -> "l'oeuvre economique")"""
+    text = text.lower().replace('œ', 'oe').replace('æ', 'ae')
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+def search_terms(text):
+    """Accent-folded index terms of a text, in order (stopwords and elisions dropped)"""
+    if not isinstance(text, str):
+        return []
+    return [
+        token for token in SEARCH_TOKEN.findall(fold_text(text))
+        if 1 < len(token) <= SEARCH_MAX_TERM_LENGTH and token not in SEARCH_STOPWORDS
+    ]
+
+def build_search_index(texts):
+    """
+    Build a BM25 inverted index over an iterable of documents (row i is
+    document i). Terms are one sorted byte-string array; the postings of
+    term t are docs[indptr[t]:indptr[t+1]] (ascending) with their
+    precomputed BM25 weights, so a query only gathers and sums.
+    """
+    term_ids = {}
+    tokens = array('i')
+    lengths = array('i')
+    for text in texts:
+        terms = search_terms(text)
+        lengths.append(len(terms))
+        tokens.extend(term_ids.setdefault(term, len(term_ids)) for term in terms)
+
+    n_docs = len(lengths)
+    doc_lengths = np.frombuffer(lengths, dtype=np.int32)
+    terms = np.array(list(term_ids), dtype=f'S{SEARCH_MAX_TERM_LENGTH}')
+
+    # Renumber terms in sorted order, then one sort of (term, doc) pairs
+    # gives the postings grouped by term and ascending by doc
+    order = np.argsort(terms)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    docs_of_tokens = np.repeat(np.arange(n_docs, dtype=np.int64), doc_lengths)
+    pairs = rank[np.frombuffer(tokens, dtype=np.int32)].astype(np.int64) * max(n_docs, 1) + docs_of_tokens
+    pairs, term_frequency = np.unique(pairs, return_counts=True)
+    posting_terms = pairs // max(n_docs, 1)
+    docs = (pairs % max(n_docs, 1)).astype(np.int32)
+
+    indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(posting_terms, minlength=len(terms)), out=indptr[1:])
+
+    doc_frequency = np.diff(indptr)
+    idf = np.log1p((n_docs - doc_frequency + 0.5) / (doc_frequency + 0.5))
+    avg_length = doc_lengths.mean() if n_docs else 0.0
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[docs] / max(avg_length, 1e-9))
+    weights = idf[posting_terms] * term_frequency * (BM25_K1 + 1) / (term_frequency + norm)
+
+    return {
+        'terms': terms[order],
+        'indptr': indptr,
+        'docs': docs,
+        'weights': weights.astype(np.float32),
+        'n_docs': np.int64(n_docs),
+    }
+
+def search_index(index, query, rows=None, limit=None):
+    """
+    Documents containing every term of the query, best BM25 score first,
+    optionally restricted to the ascending row ids in rows and to the
+    limit best. Returns None when the query has no searchable term (no
+    search, rather than no hit).
+    """
+    terms = np.unique(np.array(search_terms(query), dtype=f'S{SEARCH_MAX_TERM_LENGTH}'))
+    if len(terms) == 0:
+        return None
+
+    if len(index['terms']) == 0:
+        return np.array([], dtype=np.int64)
+    positions = np.searchsorted(index['terms'], terms)
+    positions = np.minimum(positions, len(index['terms']) - 1)
+    if not (index['terms'][positions] == terms).all():
+        return np.array([], dtype=np.int64)
+
+    # Intersect from the rarest term, so every step shrinks the candidates
+    postings = sorted(
+        ((index['docs'][start:stop], index['weights'][start:stop])
+         for start, stop in zip(index['indptr'][positions], index['indptr'][positions + 1])),
+        key=lambda posting: len(posting[0])
+    )
+    matched = postings[0][0]
+    for docs, _ in postings[1:]:
+        matched = np.intersect1d(matched, docs, assume_unique=True)
+    if rows is not None:
+        matched = np.intersect1d(matched, rows, assume_unique=True)
+
+    if len(postings) == 1 and rows is None:
+        scores = postings[0][1]
+    else:
+        scores = np.zeros(len(matched), dtype=np.float32)
+        for docs, weights in postings:
+            scores += weights[np.searchsorted(docs, matched)]
+
+    # Only the top of a long result list needs sorting
+    if limit is not None and limit < len(matched):
+        top = np.argpartition(-scores, limit)[:limit]
+        matched, scores = matched[top], scores[top]
+    return matched[np.argsort(-scores, kind='stable')].astype(np.int64)
+
+def save_search_index(index, path, signature):
+    """Write an index as one .npz archive, tagged with its source signature"""
+    tmp_path = path.with_suffix('.tmp.npz')
+    np.savez(tmp_path, signature=signature, **index)
+    tmp_path.replace(path)
+
+def read_search_index(path, signature=None):
+    """Load a saved index, or None when it is missing, unreadable or built from another source"""
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as archive:
+            if signature is not None and not np.array_equal(archive['signature'], signature):
+                return None
+            return {name: archive[name] for name in ('terms', 'indptr', 'docs', 'weights', 'n_docs')}
+    except (OSError, KeyError, ValueError):
+        return None
+
+def laureate_search_texts(df):
+    """One searchable text per laureate: the SEARCH_COLUMNS joined"""
+    columns = [col for col in SEARCH_COLUMNS if col in df.columns]
+    texts = df[columns].fillna('').astype(str)
+    return texts.apply(' '.join, axis=1) if columns else pd.Series('', index=df.index)
+
+CUBE_COLUMNS = ['Région', 'Domaine technologique', 'Genre', 'Type de candidature']
+
+def build_count_cube(df):
+    """
+    Count laureates over (year, region, domain, gender, type).
+
+    Every non-year axis has one slot per category plus a trailing slot for
+    missing values, so the cube sums back to every row with a year.
+    """
+    year_values = df[YEAR_COLUMN].to_numpy(dtype='float64', na_value=np.nan)
+    valid = ~np.isnan(year_values)
+    years = np.unique(year_values[valid]).astype(np.int64)
+
+    axis_codes = [np.searchsorted(years, year_values[valid])]
+    labels = {}
+    for col in CUBE_COLUMNS:
+        categories = list(df[col].cat.categories)
+        codes = df[col].cat.codes.to_numpy()[valid].astype(np.int64)
+        codes[codes < 0] = len(categories)
+        axis_codes.append(codes)
+        labels[col] = categories + [None]
+
+    shape = (len(years),) + tuple(len(labels[col]) for col in CUBE_COLUMNS)
+    flat = np.ravel_multi_index(axis_codes, shape)
+    cube = np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+    return {'cube': cube, 'years': years, 'labels': labels}
+
+def slice_cube(cube_data, year_range, selections):
+    """
+    Restrict the cube to a year range and the multiselect values in
+    selections ({column: values}; an empty list means no filter).
+    """
+    years = cube_data['years']
+    start = np.searchsorted(years, year_range[0], side='left')
+    stop = np.searchsorted(years, year_range[1], side='right')
+
+    counts = cube_data['cube'][start:stop]
+    labels = dict(cube_data['labels'])
+    for axis, col in enumerate(CUBE_COLUMNS, start=1):
+        values = selections.get(col)
+        if not values:
+            continue
+        positions = {label: i for i, label in enumerate(labels[col])}
+        keep = [positions[value] for value in values if value in positions]
+        counts = np.take(counts, keep, axis=axis)
+        labels[col] = [labels[col][i] for i in keep]
+
+    return {'cube': counts, 'years': years[start:stop], 'labels': labels}
+
+def cube_counts(view, col):
+    """Non-zero counts per value of one column, largest first (like value_counts)"""
+    axis = CUBE_COLUMNS.index(col) + 1
+    other_axes = tuple(a for a in range(view['cube'].ndim) if a != axis)
+    counts = pd.Series(view['cube'].sum(axis=other_axes), index=view['labels'][col])
+    counts = counts[counts.index.notna() & (counts > 0)]
+    return counts.sort_values(ascending=False, kind='stable')
+
+def cube_year_counts(view, year_col):
+    """Laureates per year with at least one laureate"""
+    counts = view['cube'].sum(axis=tuple(range(1, view['cube'].ndim)))
+    present = counts > 0
+    return pd.DataFrame({year_col: view['years'][present], 'count': counts[present]})
+
+def cube_region_year(view, regions, region_col, year_col):
+    """Region x year pivot table for the given regions"""
+    region_axis = CUBE_COLUMNS.index(region_col) + 1
+    other_axes = tuple(a for a in range(1, view['cube'].ndim) if a != region_axis)
+    by_year_region = view['cube'].sum(axis=other_axes)
+
+    regions = sorted(regions)
+    positions = [view['labels'][region_col].index(region) for region in regions]
+    matrix = by_year_region[:, positions].T
+    present = matrix.sum(axis=0) > 0
+
+    return pd.DataFrame(
+        matrix[:, present],
+        index=pd.Index(regions, name=region_col),
+        columns=pd.Index(view['years'][present], name=year_col)
+    )
+
+def get_region_coordinates():
+    """
+    Returns a dictionary mapping French region names to approximate center coordinates.
+    Includes both current regions (post-2016) and historical regions.
+    """
+    return {
+        # Current French regions (post-2016)
+        'Auvergne-Rhône-Alpes': (45.4471, 4.3852),
+        'Bourgogne-Franche-Comté': (47.2805, 4.9994),
+        'Bretagne': (48.2020, -2.9326),
+        'Centre-Val de Loire': (47.7516, 1.6751),
+        'Corse': (42.0396, 9.0129),
+        'Grand Est': (48.7000, 6.1878),
+        'Hauts-de-France': (50.4801, 2.7937),
+        'Île-de-France': (48.8499, 2.6370),
+        'Normandie': (49.1829, -0.3707),
+        'Nouvelle-Aquitaine': (45.7104, 0.6229),
+        'Occitanie': (43.8927, 3.2827),
+        'Pays de la Loire': (47.7633, -0.3299),
+        "Provence-Alpes-Côte d'Azur": (43.9352, 6.0679),
+
+        # Historical regions (pre-2016) - for backward compatibility
+        'Alsace': (48.3181, 7.4416),
+        'Aquitaine': (44.7000, -0.3400),
+        'Auvergne': (45.7772, 3.0870),
+        'Basse-Normandie': (49.0294, -0.3088),
+        'Bourgogne': (47.0500, 4.5000),
+        'Bretagne': (48.2020, -2.9326),
+        'Centre': (47.7516, 1.6751),
+        'Champagne-Ardenne': (48.9566, 4.3635),
+        'Franche-Comté': (47.2378, 6.0241),
+        'Haute-Normandie': (49.4404, 1.0939),
+        'Languedoc-Roussillon': (43.6108, 3.8767),
+        'Limousin': (45.8336, 1.2611),
+        'Lorraine': (48.6800, 6.2000),
+        'Midi-Pyrénées': (43.6045, 1.4442),
+        'Nord-Pas-de-Calais': (50.6292, 3.0573),
+        'Pays de la Loire': (47.7633, -0.3299),
+        'Picardie': (49.6642, 2.5281),
+        'Poitou-Charentes': (46.1667, -0.3333),
+        'Rhône-Alpes': (45.4471, 4.3852),
+
+        # Overseas territories
+        'Guadeloupe': (16.2650, -61.5510),
+        'Martinique': (14.6415, -61.0242),
+        'Guyane': (3.9339, -53.1258),
+        'La Réunion': (-21.1151, 55.5364),
+        'Mayotte': (-12.8275, 45.1662),
+    }
+
+# Bundled commune/postcode reference (La Poste / INSEE communes file) and
+# the geocoding index built from it, stored next to the Arrow data cache
+GEO_DIR = Path(__file__).parent / "data" / "geo"
+COMMUNE_REFERENCE = GEO_DIR / "communes-departement-region.csv"
+GEOCODE_INDEX = DATA_DIR / "ilab_geocode_index.npz"
+
+def place_key(name):
+    """Accent-, case- and punctuation-insensitive commune name ('Saint-Étienne' -> 'st_etienne')"""
+    if not isinstance(name, str):
+        return ''
+    tokens = normalize_field_name(name).split('_')
+    tokens = [{'saint': 'st', 'sainte': 'ste'}.get(token, token) for token in tokens]
+    # 'LYON CEDEX 03' is still Lyon
+    if 'cedex' in tokens:
+        tokens = tokens[:tokens.index('cedex')]
+    return '_'.join(tokens)
+
+def postcode_key(postcode):
+    """Five-digit postcode, restoring the leading zero lost by numeric parsing"""
+    if isinstance(postcode, float) and not math.isnan(postcode):
+        postcode = str(int(postcode))
+    if not isinstance(postcode, str):
+        return ''
+    digits = re.sub(r'\D', '', postcode)
+    return digits.zfill(5) if 4 <= len(digits) <= 5 else ''
+
+def build_geocode_index(reference_path):
+    """
+    Build the geocoding index from the commune reference file: one sorted
+    array of keys ('cp:<postcode>', 'commune:<name>|<region>' and, for
+    names that are unique in France, 'commune:<name>') with their positions.
+    """
+    with open(reference_path, 'r', encoding='utf-8-sig') as f:
+        header = f.readline()
+    ref = pd.read_csv(reference_path, sep=';' if header.count(';') > header.count(',') else ',',
+                      encoding='utf-8-sig', dtype=str)
+    lat = pd.to_numeric(ref['latitude'], errors='coerce')
+    lon = pd.to_numeric(ref['longitude'], errors='coerce')
+    located = lat.notna() & lon.notna()
+    ref = ref[located].reset_index(drop=True)
+    lat = lat[located].to_numpy()
+    lon = lon[located].to_numpy()
+
+    names = ref['nom_commune'].map(place_key)
+    named = names != ''
+    regions = ref['nom_region'].map(place_key) if 'nom_region' in ref else pd.Series('', index=ref.index)
+    postcodes = ref['code_postal'].map(postcode_key)
+
+    # A bare commune name is only a key when it designates a single commune
+    communes_per_name = ref.groupby(names)['code_commune_INSEE'].transform('nunique')
+
+    keys = pd.concat([
+        'cp:' + postcodes[postcodes != ''],
+        'commune:' + names[named] + '|' + regions[named],
+        'commune:' + names[named & (communes_per_name == 1)],
+    ])
+    positions = keys.index.to_numpy()
+
+    # np.unique sorts the keys; keep the first reference row of each
+    keys, first = np.unique(keys.to_numpy(dtype=str), return_index=True)
+    return {
+        'keys': keys,
+        'lat': lat[positions[first]],
+        'lon': lon[positions[first]],
+    }
+
+def lookup_places(index, keys):
+    """Binary-search an array of keys in the index; misses get NaN"""
+    keys = np.asarray(keys, dtype=str)
+    lat = np.full(len(keys), np.nan)
+    lon = np.full(len(keys), np.nan)
+    if len(index['keys']) == 0 or len(keys) == 0:
+        return lat, lon
+
+    positions = np.searchsorted(index['keys'], keys)
+    positions = np.minimum(positions, len(index['keys']) - 1)
+    found = index['keys'][positions] == keys
+    lat[found] = index['lat'][positions[found]]
+    lon[found] = index['lon'][positions[found]]
+    return lat, lon
+
+def load_geocode_index(reference_path=COMMUNE_REFERENCE, index_path=GEOCODE_INDEX, warn=print_warning):
+    """
+    The geocoding index, rebuilt from the bundled reference file only when
+    that file changed. Returns None when no reference file is bundled.
+    """
+    if not reference_path.exists():
+        return None
+    signature = file_signature(reference_path)
+
+    if index_path.exists():
+        try:
+            with np.load(index_path) as archive:
+                if np.array_equal(archive['signature'], signature):
+                    return {name: archive[name] for name in ('keys', 'lat', 'lon')}
+        except (OSError, KeyError, ValueError):
+            pass  # Unreadable index - rebuild it
+
+    index = build_geocode_index(reference_path)
+    try:
+        tmp_path = index_path.with_suffix('.tmp.npz')
+        np.savez(tmp_path, signature=signature, **index)
+        tmp_path.replace(index_path)
+    except OSError as e:
+        warn(f"Could not write geocoding index: {e}")
+    return index
+
+def geocode_addresses(df, index):
+    """
+    Commune-level positions of the rows that have a postcode or commune
+    field, trying the postcode, then commune and region, then the commune alone.
+    """
+    lat = np.full(len(df), np.nan)
+    lon = np.full(len(df), np.nan)
+    regions = df[REGION_COLUMN].astype(object).map(place_key) if REGION_COLUMN in df else ''
+
+    candidates = (
+        ['cp:' + df[col].map(postcode_key) for col in POSTCODE_COLUMNS if col in df]
+        + ['commune:' + df[col].map(place_key) + '|' + regions for col in COMMUNE_COLUMNS if col in df]
+        + ['commune:' + df[col].map(place_key) for col in COMMUNE_COLUMNS if col in df]
+    )
+    for keys in candidates:
+        missing = np.isnan(lat)
+        if not missing.any():
+            break
+        found_lat, found_lon = lookup_places(index, keys.to_numpy(dtype=str)[missing])
+        lat[missing] = found_lat
+        lon[missing] = found_lon
+    return lat, lon
+
+MAP_JITTER_DEGREES = 0.3  # ~0.3 degrees ≈ 30km variation
+MAP_JITTER_SEED = 20250101
+
+def geocode_rows(df, seed=MAP_JITTER_SEED, index=None):
+    """
+    Place every row at its commune when the geocoding index knows its
+    address, otherwise at its region centre plus a small random jitter, in
+    one vectorized pass. Rows with neither get NaN.
+
+    The jitter comes from a seeded generator and is drawn for the whole
+    frame, so a laureate keeps the same position across reruns and filters.
+    """
+    region_coords = get_region_coordinates()
+    regions = df[REGION_COLUMN]
+
+    # One lookup row per category, plus a trailing NaN row that code -1 (missing) hits
+    centres = np.array(
+        [region_coords.get(region, (np.nan, np.nan)) for region in regions.cat.categories]
+        + [(np.nan, np.nan)],
+        dtype='float64'
+    )
+    coords = centres[regions.cat.codes.to_numpy()]
+
+    rng = np.random.default_rng(seed)
+    coords += rng.uniform(-MAP_JITTER_DEGREES, MAP_JITTER_DEGREES, size=coords.shape)
+
+    if index is not None:
+        lat, lon = geocode_addresses(df, index)
+        located = ~np.isnan(lat)
+        coords[located, 0] = lat[located]
+        coords[located, 1] = lon[located]
+
+    return coords[:, 0], coords[:, 1]
+
+UNKNOWN_REGION = 'Unknown'  # map label of rows without a region (plotly drops null colours)
+
+def map_points(df, lat, lon, row_ids):
+    """One map marker per located row, with its hover fields"""
+    row_ids = row_ids[~np.isnan(lat[row_ids])]
+    rows = df.iloc[row_ids]
+
+    return pd.DataFrame({
+        'lat': lat[row_ids],
+        'lon': lon[row_ids],
+        'region': rows[REGION_COLUMN].astype(object).fillna(UNKNOWN_REGION).to_numpy(dtype=object),
+        'year': rows[YEAR_COLUMN].to_numpy(),
+        'project': rows['Projet'].to_numpy(dtype=object),
+        'laureate': rows['Nom du lauréat'].to_numpy(dtype=object),
+        'domain': rows['Domaine technologique'].to_numpy(dtype=object),
+    })
+
+# Map detail levels: None clusters on the region centres, an int is a grid
+# clustering zoom level, and 'points' sends one marker per laureate.
+MAP_DETAIL_LEVELS = {
+    'Regions': None,
+    'Areas': 8,
+    'Laureates': 'points',
+}
+MAP_CLUSTER_THRESHOLD = 500  # above this many points the map opens clustered
+
+def region_clusters(df, row_ids):
+    """One cluster per region, at the region centre from get_region_coordinates"""
+    region_coords = get_region_coordinates()
+    regions = df[REGION_COLUMN].cat.categories
+
+    codes = df[REGION_COLUMN].cat.codes.to_numpy()[row_ids]
+    counts = np.bincount(codes[codes >= 0], minlength=len(regions))
+    present = [i for i in np.flatnonzero(counts) if regions[i] in region_coords]
+
+    return pd.DataFrame({
+        'lat': [region_coords[regions[i]][0] for i in present],
+        'lon': [region_coords[regions[i]][1] for i in present],
+        'count': counts[present],
+        'region': [regions[i] for i in present],
+    })
+
+def grid_clusters(df, lat, lon, row_ids, zoom):
+    """
+    Grid clusters of the jittered laureate positions at one zoom level.
+    Each cluster is labelled with the region most of its points belong to,
+    or UNKNOWN_REGION when none of them has one (address-geocoded rows may not).
+    """
+    row_ids = row_ids[~np.isnan(lat[row_ids])]
+    clusters = cluster_points(lat[row_ids], lon[row_ids], zoom)
+
+    regions = df[REGION_COLUMN].cat.categories
+    codes = df[REGION_COLUMN].cat.codes.to_numpy()[row_ids]
+    known = codes >= 0
+    region_counts = np.zeros((len(clusters['count']), len(regions)), dtype=np.int64)
+    np.add.at(region_counts, (clusters['cluster'][known], codes[known]), 1)
+
+    labels = np.full(len(clusters['count']), UNKNOWN_REGION, dtype=object)
+    labelled = region_counts.any(axis=1)
+    labels[labelled] = np.asarray(regions, dtype=object)[region_counts[labelled].argmax(axis=1)]
+
+    return pd.DataFrame({
+        'lat': clusters['lat'],
+        'lon': clusters['lon'],
+        'count': clusters['count'],
+        'region': labels,
+    })
+
+def map_frame(df, lat, lon, row_ids, detail):
+    """The markers (points or clusters) of the map at one detail level"""
+    zoom = MAP_DETAIL_LEVELS[detail]
+    if zoom == 'points':
+        return map_points(df, lat, lon, row_ids)
+    if zoom is None:
+        return region_clusters(df, row_ids)
+    return grid_clusters(df, lat, lon, row_ids, zoom)
+
+def default_map_detail(total_count):
+    """Map detail level a selection of total_count laureates opens at"""
+    detail_levels = list(MAP_DETAIL_LEVELS)
+    return detail_levels[0] if total_count > MAP_CLUSTER_THRESHOLD else detail_levels[-1]
+
+def normalize_field_name(name):
+    """'Année de concours' -> 'annee_de_concours'"""
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '_', ascii_name.lower()).strip('_')
+
+def cluster_points(lat, lon, zoom):
+    """
+    Grid-cluster points for a map zoom level: one cluster per cell of a
+    quarter map tile. Returns centroid lat/lon arrays, point counts and
+    the cluster of every non-NaN point ('cluster').
+    """
+    valid = ~(np.isnan(lat) | np.isnan(lon))
+    lat, lon = lat[valid], lon[valid]
+    cell = 360.0 / (2 ** zoom) / 4
+    cells = np.stack([np.floor(lat / cell), np.floor(lon / cell)], axis=1)
+    _, cluster, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    cluster = cluster.ravel()
+    return {
+        'lat': np.bincount(cluster, weights=lat) / counts,
+        'lon': np.bincount(cluster, weights=lon) / counts,
+        'count': counts,
+        'cluster': cluster,
+    }
+
+def figure_cache_key(*parts):
+    """Canonical hash of a filter signature (plus any extra view state)"""
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+def render_overview(cube_data, year_range, selections):
+    """Metrics and the six count charts of a count cube for one filter state"""
+    year_col = YEAR_COLUMN
+    region_col = REGION_COLUMN
+    domain_col = 'Domaine technologique'
+    gender_col = 'Genre'
+    type_col = 'Type de candidature'
+
+    # Every chart below is a slice-and-sum of the count cube
+    view = slice_cube(cube_data, year_range, selections)
+    total_count = int(view['cube'].sum())
+    region_counts = cube_counts(view, region_col)
+    domain_counts = cube_counts(view, domain_col)
+    years_span = year_range[1] - year_range[0] + 1
+
+    # Year trend chart
+    year_counts = cube_year_counts(view, year_col)
+
+    fig_year = px.line(
+        year_counts,
+        x=year_col,
+        y='count',
+        markers=True,
+        title='Number of Laureates per Year',
+        labels={year_col: 'Year', 'count': 'Number of Laureates'}
+    )
+    fig_year.update_traces(line_color='#0055A4', line_width=3, marker_size=8)
+    fig_year.update_layout(hovermode='x unified', height=400)
+
+    top_region_counts = region_counts.head(15)
+
+    fig_region = px.bar(
+        x=top_region_counts.values[::-1],
+        y=top_region_counts.index[::-1],
+        orientation='h',
+        title='Top 15 Regions',
+        labels={'x': 'Number of Laureates', 'y': 'Region'}
+    )
+    fig_region.update_traces(marker_color='#0055A4')
+    fig_region.update_layout(height=500)
+
+    top_domain_counts = domain_counts.head(10)
+
+    fig_domain = px.pie(
+        values=top_domain_counts.values,
+        names=top_domain_counts.index,
+        title='Top 10 Technology Domains',
+        hole=0.4
+    )
+    fig_domain.update_layout(height=500)
+
+    gender_counts = cube_counts(view, gender_col)
+
+    fig_gender = go.Figure(data=[go.Pie(
+        labels=gender_counts.index,
+        values=gender_counts.values,
+        hole=0.4,
+        marker=dict(colors=['#0055A4', '#EF4135'])
+    )])
+    fig_gender.update_layout(height=400)
+
+    type_counts = cube_counts(view, type_col)
+
+    fig_type = go.Figure(data=[go.Pie(
+        labels=type_counts.index,
+        values=type_counts.values,
+        hole=0.4,
+        marker=dict(colors=['#0055A4', '#EF4135', '#FFD700'])
+    )])
+    fig_type.update_layout(height=400)
+
+    # Heatmap of the top 10 regions by year
+    top_regions = region_counts.head(10).index
+    pivot_table = cube_region_year(view, top_regions, region_col, year_col)
+
+    fig_heatmap = px.imshow(
+        pivot_table,
+        labels=dict(x="Year", y="Region", color="Laureates"),
+        x=pivot_table.columns,
+        y=pivot_table.index,
+        color_continuous_scale='Blues',
+        aspect='auto'
+    )
+    fig_heatmap.update_layout(height=500)
+
+    return {
+        'metrics': {
+            'total_count': total_count,
+            'years_span': years_span,
+            'regions_count': len(region_counts),
+            'domains_count': len(domain_counts),
+            'avg_per_year': total_count / years_span if years_span > 0 else 0,
+        },
+        'gender_counts': [(gender, int(count)) for gender, count in gender_counts.items()],
+        'type_counts': [(ctype, int(count)) for ctype, count in type_counts.items()],
+        'figures': {
+            'year': fig_year.to_json(),
+            'region': fig_region.to_json(),
+            'domain': fig_domain.to_json(),
+            'gender': fig_gender.to_json(),
+            'type': fig_type.to_json(),
+            'heatmap': fig_heatmap.to_json(),
+        },
+    }
+
+def render_map(map_df):
+    """The map figure of the markers from map_frame"""
+    if map_df.empty:
+        return {'kind': 'empty', 'figures': {}}
+
+    if 'count' in map_df:
+        fig_map = px.scatter_mapbox(
+            map_df,
+            lat='lat',
+            lon='lon',
+            size='count',
+            size_max=40,
+            hover_name='region',
+            hover_data={
+                'count': True,
+                'lat': False,
+                'lon': False
+            },
+            color='region',
+            zoom=5,
+            height=600,
+            title=f'Geographic Distribution of {int(map_df["count"].sum()):,} Laureates '
+                  f'({len(map_df):,} clusters)'
+        )
+        kind = 'clusters'
+    else:
+        # Determine zoom level based on data spread
+        zoom_level = 5 if len(map_df) > 100 else 6
+
+        fig_map = px.scatter_mapbox(
+            map_df,
+            lat='lat',
+            lon='lon',
+            hover_name='laureate',
+            hover_data={
+                'project': True,
+                'region': True,
+                'year': True,
+                'domain': True,
+                'lat': False,
+                'lon': False
+            },
+            color='region',
+            zoom=zoom_level,
+            height=600,
+            title=f'Geographic Distribution of {len(map_df):,} Laureates'
+        )
+        kind = 'points'
+
+    fig_map.update_layout(
+        mapbox_style="open-street-map",
+        margin={"r":0,"t":40,"l":0,"b":0}
+    )
+    return {'kind': kind, 'figures': {'map': fig_map.to_json()}}
+
+LANDING_SNAPSHOT = DATA_DIR / "ilab_landing_snapshot.json"
+
+def landing_filters(df, filter_index):
+    """Filter state of a new session: all years and genders, no region or domain filter"""
+    years = filter_index['years']
+    genders = [g for g in df['Genre'].unique() if pd.notna(g)]
+    return (min(years), max(years)), {REGION_COLUMN: [], 'Domaine technologique': [], 'Genre': genders}
+
+def render_landing(df, filter_index, cube_data, geocoded, cache=None):
+    """
+    Render the landing view (overview and default map), through cache(key,
+    render) when given - the dashboard passes its figure cache.
+    """
+    cache = cache or (lambda key, render: render())
+    year_range, selections = landing_filters(df, filter_index)
+    signature = filter_signature(year_range, selections)
+    row_ids = select_rows(filter_index, year_range, selections)
+
+    overview_key = figure_cache_key(signature)
+    overview = cache(overview_key, partial(render_overview, cube_data, year_range, selections))
+    map_detail = default_map_detail(overview['metrics']['total_count'])
+    map_key = figure_cache_key(signature, map_detail)
+    rendered_map = cache(map_key, lambda: render_map(map_frame(df, *geocoded, row_ids, map_detail)))
+
+    return {
+        'overview_key': overview_key,
+        'overview': overview,
+        'map_key': map_key,
+        'map': rendered_map,
+    }
+
+def source_digest(csv_path):
+    """sha256 of the source CSV, tying a landing snapshot to the data it shows"""
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def build_landing_snapshot(csv_path=LAUREATES_CSV, output_path=LANDING_SNAPSHOT):
+    """Render the landing view of a CSV and save it as static figure JSON and metrics"""
+    df = load_laureates(csv_path)
+    geocoded = geocode_rows(df, index=load_geocode_index())
+    snapshot = render_landing(df, build_filter_index(df), build_count_cube(df), geocoded)
+    snapshot['source_sha256'] = source_digest(csv_path)
+    snapshot['built_at'] = datetime.now().isoformat(timespec='seconds')
+
+    tmp_path = output_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    tmp_path.replace(output_path)
+    return snapshot
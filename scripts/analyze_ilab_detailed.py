@@ -6,13 +6,14 @@ Provides comprehensive statistics and insights
 
 import csv
 import json
+import sys
 from pathlib import Path
 from collections import Counter, defaultdict
+from itertools import chain
 from datetime import datetime
 
-def load_csv_data(filepath):
-    """Load CSV data with proper delimiter detection"""
-    data = []
+def iter_csv_rows(filepath):
+    """Yield non-empty CSV rows one at a time, with proper delimiter detection"""
     with open(filepath, 'r', encoding='utf-8-sig') as f:
         sample = f.read(2048)
         f.seek(0)
@@ -22,36 +23,113 @@ def load_csv_data(filepath):
         for row in reader:
             # Clean empty rows
             if any(row.values()):
-                data.append(row)
-    return data
+                yield row
+
+def load_csv_data(filepath):
+    """Load CSV data with proper delimiter detection"""
+    return list(iter_csv_rows(filepath))
 
 def analyze_comprehensive(data):
     """Perform comprehensive analysis"""
+    return analyze_streaming(data)
+
+def analyze_streaming(rows):
+    """
+    Perform comprehensive analysis in a single pass over rows.
+
+    rows can be any iterable of row dicts (e.g. iter_csv_rows), so memory
+    stays constant however large the export is. The result is identical to
+    building each statistic with its own pass over a list of rows. It keeps
+    its own counters instead of a dataset_specs aggregate, which loads the
+    whole table and orders groups by label rather than first appearance.
+    """
+    gender_field = 'Genre'
+    year_field = 'Année de concours'
+    region_field = 'Région'
+    domain_field = 'Domaine technologique'
+    type_field = 'Type de candidature'
+    prix_field = 'Grand-Prix'
+    jury_field = 'Jury'
+    prev_field = 'Déjà lauréat en'
+
+    rows = iter(rows)
+    first_row = next(rows, None)
+    fields = list(first_row.keys()) if first_row is not None else []
+
+    total_records = 0
+    genders = Counter()
+    years = Counter()
+    regions = Counter()
+    domains = Counter()
+    types = Counter()
+    juries = Counter()
+    prix_count = 0
+    siret_count = 0
+    siren_count = 0
+    repeat_winners = 0
+    region_year = defaultdict(lambda: defaultdict(int))
+
+    has_gender = gender_field in fields
+    has_year = year_field in fields
+    has_region = region_field in fields
+    has_domain = domain_field in fields
+    has_type = type_field in fields
+    has_prix = prix_field in fields
+    has_jury = jury_field in fields
+
+    if first_row is not None:
+        rows = chain([first_row], rows)
+
+    for row in rows:
+        total_records += 1
+
+        if has_gender:
+            genders[row.get(gender_field, 'Non spécifié')] += 1
+
+        year = row.get(year_field)
+        region = row.get(region_field)
+        if has_year and year:
+            years[year] += 1
+        if has_region and region:
+            regions[region] += 1
+        if has_year and has_region and year and region:
+            region_year[region][year] += 1
+
+        if has_domain and row.get(domain_field):
+            domains[row[domain_field]] += 1
+        if has_type and row.get(type_field):
+            types[row[type_field]] += 1
+        if has_prix and row.get(prix_field):
+            prix_count += 1
+        if has_jury and row.get(jury_field):
+            juries[row[jury_field]] += 1
+
+        if row.get('N° SIRET'):
+            siret_count += 1
+        if row.get('N° SIREN'):
+            siren_count += 1
+        if row.get(prev_field):
+            repeat_winners += 1
 
     analysis = {
         "metadata": {
-            "total_records": len(data),
+            "total_records": total_records,
             "analysis_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "fields": list(data[0].keys()) if data else []
+            "fields": fields
         }
     }
 
     # Gender distribution
-    gender_field = 'Genre'
-    if gender_field in data[0]:
-        genders = [row.get(gender_field, 'Non spécifié') for row in data]
-        analysis['gender_distribution'] = dict(Counter(genders))
+    if has_gender:
+        analysis['gender_distribution'] = dict(genders)
 
     # Year distribution
-    year_field = 'Année de concours'
-    if year_field in data[0]:
-        years = [row.get(year_field, 'Unknown') for row in data if row.get(year_field)]
-        year_counts = Counter(years)
-        analysis['by_year'] = dict(sorted(year_counts.items()))
+    if has_year:
+        analysis['by_year'] = dict(sorted(years.items()))
 
         # Calculate trends
-        if len(year_counts) > 1:
-            years_list = sorted([int(y) for y in year_counts.keys() if y.isdigit()])
+        if len(years) > 1:
+            years_list = sorted([int(y) for y in years.keys() if y.isdigit()])
             if years_list:
                 analysis['year_range'] = {
                     'first': years_list[0],
@@ -60,56 +138,36 @@ def analyze_comprehensive(data):
                 }
 
     # Region distribution
-    region_field = 'Région'
-    if region_field in data[0]:
-        regions = [row.get(region_field, 'Non spécifié') for row in data if row.get(region_field)]
-        analysis['by_region'] = dict(Counter(regions).most_common())
+    if has_region:
+        analysis['by_region'] = dict(regions.most_common())
 
     # Technology domain
-    domain_field = 'Domaine technologique'
-    if domain_field in data[0]:
-        domains = [row.get(domain_field, 'Non spécifié') for row in data if row.get(domain_field)]
-        analysis['by_domain'] = dict(Counter(domains).most_common(25))
+    if has_domain:
+        analysis['by_domain'] = dict(domains.most_common(25))
 
     # Candidature type
-    type_field = 'Type de candidature'
-    if type_field in data[0]:
-        types = [row.get(type_field, 'Non spécifié') for row in data if row.get(type_field)]
-        analysis['by_candidature_type'] = dict(Counter(types))
+    if has_type:
+        analysis['by_candidature_type'] = dict(types)
 
     # Grand Prix winners
-    prix_field = 'Grand-Prix'
-    if prix_field in data[0]:
-        prix_count = sum(1 for row in data if row.get(prix_field))
+    if has_prix:
         analysis['grand_prix_winners'] = prix_count
 
     # Jury level
-    jury_field = 'Jury'
-    if jury_field in data[0]:
-        juries = [row.get(jury_field, 'Non spécifié') for row in data if row.get(jury_field)]
-        analysis['by_jury'] = dict(Counter(juries))
+    if has_jury:
+        analysis['by_jury'] = dict(juries)
 
     # Companies with SIRET/SIREN
-    siret_count = sum(1 for row in data if row.get('N° SIRET'))
-    siren_count = sum(1 for row in data if row.get('N° SIREN'))
     analysis['company_info'] = {
         'with_siret': siret_count,
         'with_siren': siren_count
     }
 
     # Previous winners (repeat laureates)
-    prev_field = 'Déjà lauréat en'
-    repeat_winners = sum(1 for row in data if row.get(prev_field))
     analysis['repeat_laureates'] = repeat_winners
 
     # Region + Year cross-analysis
-    if year_field in data[0] and region_field in data[0]:
-        region_year = defaultdict(lambda: defaultdict(int))
-        for row in data:
-            year = row.get(year_field)
-            region = row.get(region_field)
-            if year and region:
-                region_year[region][year] += 1
+    if has_year and has_region:
         analysis['region_year_detail'] = {
             region: dict(years) for region, years in region_year.items()
         }
@@ -221,7 +279,8 @@ def main():
     base_dir = Path(__file__).parent.parent
     data_dir = base_dir / "data" / "ilab"
 
-    csv_file = data_dir / "ilab_laureats.csv"
+    # Optional argument: another ESR export to run the same report over
+    csv_file = Path(sys.argv[1]) if len(sys.argv) > 1 else data_dir / "ilab_laureats.csv"
 
     if not csv_file.exists():
         print(f"❌ File not found: {csv_file}")
@@ -229,14 +288,10 @@ def main():
 
     print(f"📊 Analyzing: {csv_file.name}")
 
-    # Load data
-    print("Loading data...")
-    data = load_csv_data(csv_file)
-    print(f"✓ Loaded {len(data):,} records")
-
-    # Analyze
-    print("Performing comprehensive analysis...")
-    analysis = analyze_comprehensive(data)
+    # Stream rows through the analysis - the file is never held in memory
+    print("Performing comprehensive analysis (single streaming pass)...")
+    analysis = analyze_streaming(iter_csv_rows(csv_file))
+    print(f"✓ Analyzed {analysis['metadata']['total_records']:,} records")
 
     # Save detailed JSON
     output_json = data_dir / "ilab_analysis_detailed.json"
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Company survival analysis of the i-Lab laureates
+Kaplan-Meier survival curves by cohort year, region and domain, from the
+Sirene-enriched laureate table written by enrich_sirene.py
+"""
+
+import argparse
+import math
+from datetime import datetime
+from pathlib import Path
+
+YEAR_COLUMN = 'Année de concours'
+CREATION_COLUMN = 'dateCreationUniteLegale'
+CLOSURE_COLUMN = 'dateFermetureUniteLegale'
+STATUS_COLUMN = 'etatAdministratifUniteLegale'
+STOCK_DATE_COLUMN = 'dateStockSirene'  # written by enrich_sirene.py
+SOURCE_DIGEST_COLUMN = 'sha256Laureats'  # written by enrich_sirene.py
+
+# Report sections: title and the column the curves are grouped by ('cohort' = 5-year bins of the competition year)
+GROUPINGS = [
+    ("BY COHORT", 'cohort'),
+    ("BY REGION", 'Région'),
+    ("BY TECHNOLOGY DOMAIN", 'Domaine technologique'),
+]
+COHORT_WIDTH = 5
+HORIZONS = [1, 3, 5, 10]  # years after creation reported in the survival tables
+DAYS_PER_YEAR = 365.25
+
+def load_enriched(filepath):
+    """The laureate table with the Sirene columns, all as text"""
+    import pandas as pd
+
+    return pd.read_csv(filepath, sep=';', encoding='utf-8-sig', dtype=str)
+
+def stock_as_of(df):
+    """Sirene extraction date recorded by enrich_sirene.py, or None for older files"""
+    import pandas as pd
+
+    if STOCK_DATE_COLUMN not in df:
+        return None
+    dates = pd.to_datetime(df[STOCK_DATE_COLUMN], errors='coerce').dropna()
+    return dates.max().date() if len(dates) else None
+
+def survival_times(df, as_of=None):
+    """
+    Years from company creation to closure (event) or to as_of (still
+    active, censored) for every row; as_of defaults to the stock date of
+    the table, then to today. Rows whose company is not in Sirene, or
+    closed without a closure date, get a NaN duration.
+    """
+    import numpy as np
+    import pandas as pd
+
+    created = pd.to_datetime(df[CREATION_COLUMN], errors='coerce')
+    closed = pd.to_datetime(df[CLOSURE_COLUMN], errors='coerce')
+    status = df[STATUS_COLUMN]
+    events = (status == 'C') & closed.notna()
+    known = created.notna() & ((status == 'A') | events)
+
+    as_of = pd.Timestamp(as_of or stock_as_of(df) or datetime.now().date())
+    end = closed.where(events, as_of)
+    durations = ((end - created).dt.days / DAYS_PER_YEAR).clip(lower=0).where(known)
+    return durations.to_numpy(dtype='float64', na_value=np.nan), events.to_numpy(dtype=bool)
+
+def cohort_labels(years, width=COHORT_WIDTH):
+    """Competition year -> cohort label ('2005-2009'); missing years stay None"""
+    import numpy as np
+
+    labels = np.full(len(years), None, dtype=object)
+    years = np.asarray(years, dtype='float64')
+    valid = ~np.isnan(years)
+    starts = (years[valid] // width * width).astype(np.int64)
+    labels[valid] = [f"{start}-{start + width - 1}" for start in starts]
+    return labels
+
+def kaplan_meier(durations, events, groups=None):
+    """
+    Kaplan-Meier survival curves of every group in one vectorized pass.
+
+    Rows are sorted by (group, duration), so each distinct time of a group
+    is one step. The companies at risk at a step are the rows from that step
+    to the end of its group, deaths are summed per step with reduceat, and
+    the survival product is a cumulative sum of logs restarted at each group.
+    Returns one row per (group, time): group, time, at_risk, events, survival.
+    """
+    import numpy as np
+    import pandas as pd
+
+    known = ~np.isnan(durations)
+    if groups is None:
+        groups = np.full(len(durations), 'All laureates', dtype=object)
+    groups = np.asarray(groups, dtype=object)
+    known &= pd.notna(groups)
+    codes, labels = pd.factorize(groups[known], sort=True)
+    times = durations[known]
+    closed = np.asarray(events)[known].astype(np.int64)
+
+    order = np.lexsort((times, codes))
+    codes, times, closed = codes[order], times[order], closed[order]
+    if len(codes) == 0:
+        return pd.DataFrame({'group': [], 'time': [], 'at_risk': [], 'events': [], 'survival': []})
+
+    new_group = np.r_[True, codes[1:] != codes[:-1]]
+    step_starts = np.flatnonzero(new_group | np.r_[True, times[1:] != times[:-1]])
+    group_ends = np.r_[np.flatnonzero(new_group)[1:], len(codes)]
+
+    step_codes = codes[step_starts]
+    at_risk = group_ends[step_codes] - step_starts
+    deaths = np.add.reduceat(closed, step_starts)
+
+    # prod(1 - d/n) as exp(sum(log)), with steps where everyone closed counted apart
+    factor = 1 - deaths / at_risk
+    wiped_out = factor <= 0
+    log_factor = np.log(np.where(wiped_out, 1.0, factor))
+    log_total = np.cumsum(log_factor)
+    zero_total = np.cumsum(wiped_out)
+    first_step = np.r_[True, step_codes[1:] != step_codes[:-1]]
+    group_first = np.maximum.accumulate(np.where(first_step, np.arange(len(step_codes)), 0))
+    log_survival = log_total - (log_total - log_factor)[group_first]
+    zeros = zero_total - (zero_total - wiped_out)[group_first]
+    survival = np.where(zeros > 0, 0.0, np.exp(log_survival))
+
+    return pd.DataFrame({
+        'group': labels[step_codes],
+        'time': times[step_starts],
+        'at_risk': at_risk,
+        'events': deaths,
+        'survival': survival,
+    })
+
+def survival_at(curve, horizon):
+    """Survival of one group's curve at a horizon (NaN past its last observed time)"""
+    import numpy as np
+
+    times = curve['time'].to_numpy()
+    if len(times) == 0 or horizon > times[-1]:
+        return math.nan
+    position = np.searchsorted(times, horizon, side='right') - 1
+    return 1.0 if position < 0 else float(curve['survival'].to_numpy()[position])
+
+def median_survival(curve):
+    """First time the survival drops to one half or below (NaN if it never does)"""
+    below = curve[curve['survival'] <= 0.5]
+    return float(below['time'].iloc[0]) if len(below) else math.nan
+
+def survival_table(curves, horizons=HORIZONS):
+    """Companies, closures, survival at each horizon and median survival, per group"""
+    import pandas as pd
+
+    rows = []
+    for group, curve in curves.groupby('group', sort=False):
+        row = {
+            'group': group,
+            'companies': int(curve['at_risk'].iloc[0]),
+            'closed': int(curve['events'].sum()),
+        }
+        row.update({f'{horizon}y': survival_at(curve, horizon) for horizon in horizons})
+        row['median_years'] = median_survival(curve)
+        rows.append(row)
+    return pd.DataFrame(rows, columns=['group', 'companies', 'closed']
+                        + [f'{horizon}y' for horizon in horizons] + ['median_years'])
+
+def curve_points(curves):
+    """Curves as plottable steps, each starting at (0 years, 100%)"""
+    import pandas as pd
+
+    starts = pd.DataFrame({'group': curves['group'].unique(), 'time': 0.0, 'survival': 1.0})
+    points = pd.concat([starts, curves[['group', 'time', 'survival']]], ignore_index=True)
+    return points.sort_values(['group', 'time'], kind='stable').reset_index(drop=True)
+
+def group_values(df, grouping):
+    """Group label of every row for one report grouping"""
+    import pandas as pd
+
+    if grouping == 'cohort':
+        return cohort_labels(pd.to_numeric(df[YEAR_COLUMN], errors='coerce').to_numpy())
+    return df[grouping].to_numpy(dtype=object)
+
+def generate_report(df, durations, events, output_file):
+    """Write the survival tables (overall and per grouping) as a text report"""
+    import numpy as np
+
+    def write_table(f, table):
+        f.write(f"{'':40s} {'Companies':>9s} {'Closed':>7s}"
+                + ''.join(f" {f'{h}y':>6s}" for h in HORIZONS) + f" {'Median':>7s}\n")
+        for row in table.itertuples(index=False):
+            rates = ''.join(f" {value:6.1%}" if not math.isnan(value) else f" {'-':>6s}"
+                            for value in row[3:3 + len(HORIZONS)])
+            median = f"{row.median_years:6.1f}y" if not math.isnan(row.median_years) else f"{'-':>7s}"
+            f.write(f"{str(row.group)[:40]:40s} {row.companies:9,} {row.closed:7,}{rates} {median}\n")
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 100 + "\n")
+        f.write("I-LAB LAUREATES - COMPANY SURVIVAL (KAPLAN-MEIER)\n")
+        f.write("=" * 100 + "\n\n")
+        f.write(f"Generated: {datetime.now().isoformat()}\n")
+        f.write(f"Laureates with a Sirene company: {int((~np.isnan(durations)).sum()):,} of {len(df):,}\n")
+        f.write("Survival = share of companies still active N years after creation\n\n")
+
+        f.write("ALL LAUREATES\n")
+        f.write("-" * 100 + "\n")
+        write_table(f, survival_table(kaplan_meier(durations, events)))
+
+        for title, grouping in GROUPINGS:
+            f.write(f"\n\n{title}\n")
+            f.write("-" * 100 + "\n")
+            write_table(f, survival_table(kaplan_meier(durations, events, group_values(df, grouping))))
+
+        f.write("\n" + "=" * 100 + "\n")
+        f.write("END OF REPORT\n")
+        f.write("=" * 100 + "\n")
+
+def main():
+    """Main survival analysis function"""
+    base_dir = Path(__file__).parent.parent
+    data_dir = base_dir / "data" / "ilab"
+
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--input', type=Path, default=data_dir / "ilab_laureats_sirene.csv",
+                        help="laureate table enriched by enrich_sirene.py")
+    parser.add_argument('--output', type=Path, default=data_dir / "ilab_survival_report.txt")
+    parser.add_argument('--as-of', help="date the Sirene stock was extracted "
+                                        "(default: the stock date written by enrich_sirene.py)")
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"❌ File not found: {args.input} (run enrich_sirene.py first)")
+        return
+
+    print(f"📊 Analyzing company survival: {args.input.name}")
+    df = load_enriched(args.input)
+    durations, events = survival_times(df, args.as_of)
+    print(f"✓ {int((durations == durations).sum()):,} of {len(df):,} laureates have a Sirene company, "
+          f"{int(events.sum()):,} closed")
+
+    generate_report(df, durations, events, args.output)
+    print(f"✓ Report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Build the dashboard landing snapshot
+Renders the unfiltered dashboard state (metrics and figure JSON) with the
+dashboard's own chart builders (ilab_data), so the app can paint it on a
+cold start
+"""
+
+import sys
+from pathlib import Path
+
+# The snapshot must hold exactly what the app renders, so use its builders
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+def main():
+    """Main build function"""
+    from ilab_data import LANDING_SNAPSHOT, LAUREATES_CSV, build_landing_snapshot
+    # Importing streamlit registers the plotly template the app's figures are built with
+    import streamlit  # noqa: F401
+
+    if not LAUREATES_CSV.exists():
+        print(f"❌ {LAUREATES_CSV} not found (run download_ilab.py first)")
+        return
+
+    print("📊 Rendering the unfiltered dashboard state...")
+    snapshot = build_landing_snapshot()
+
+    metrics = snapshot['overview']['metrics']
+    figure_count = len(snapshot['overview']['figures']) + len(snapshot['map']['figures'])
+    print(f"✓ {metrics['total_count']:,} laureates, {figure_count} figures")
+    print(f"✓ Saved to {LANDING_SNAPSHOT} ({LANDING_SNAPSHOT.stat().st_size:,} bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Build the full-text search indexes
+Laureate project names/summaries (used by the dashboard search box) and the
+data.gouv.fr catalog titles, descriptions and tags, as BM25 inverted indexes
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Same tokenizer and index format as the dashboard, which reads the laureate index
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+CATALOG_TEXT_COLUMNS = ['title', 'description', 'tags']
+
+def build_laureate_index():
+    """Index the SEARCH_COLUMNS of the laureates CSV into SEARCH_INDEX"""
+    from ilab_data import (LAUREATES_CSV, SEARCH_INDEX, build_search_index, file_signature,
+                           laureate_search_texts, read_source_csv, save_search_index)
+
+    csv_path = LAUREATES_CSV
+    if not csv_path.exists():
+        print(f"❌ {csv_path} not found (run download_ilab.py first)")
+        return
+    df = read_source_csv(csv_path)
+    index = build_search_index(laureate_search_texts(df))
+    save_search_index(index, SEARCH_INDEX, file_signature(csv_path))
+    print(f"✓ {len(df):,} laureates, {len(index['terms']):,} terms -> {SEARCH_INDEX.name} "
+          f"({SEARCH_INDEX.stat().st_size:,} bytes)")
+
+def catalog_texts(catalog_path, batch_size=20_000):
+    """Yield one searchable text per catalog row, in catalog.parquet order"""
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(catalog_path)
+    columns = [col for col in CATALOG_TEXT_COLUMNS if col in parquet.schema_arrow.names]
+    for batch in parquet.iter_batches(batch_size=batch_size, columns=columns):
+        values = [batch.column(col).to_pylist() for col in columns]
+        for row in zip(*values):
+            yield ' '.join(value for value in row if value)
+
+def build_catalog_index(catalog_path, output_path):
+    """Index the catalog text columns; document i is row i of catalog.parquet"""
+    from ilab_data import build_search_index, file_signature, save_search_index
+
+    if not catalog_path.exists():
+        print(f"❌ {catalog_path} not found (run ingest_catalog.py first)")
+        return
+    index = build_search_index(catalog_texts(catalog_path))
+    save_search_index(index, output_path, file_signature(catalog_path))
+    print(f"✓ {int(index['n_docs']):,} datasets, {len(index['terms']):,} terms, "
+          f"{len(index['docs']):,} postings -> {output_path.name} ({output_path.stat().st_size:,} bytes)")
+
+def query_catalog(catalog_path, index_path, query, limit):
+    """Run one query against the catalog index and print the best titles"""
+    import pyarrow.parquet as pq
+    from ilab_data import file_signature, read_search_index, search_index
+
+    index = read_search_index(index_path, file_signature(catalog_path))
+    if index is None:
+        print(f"❌ {index_path} is missing or older than {catalog_path.name}; rebuild it")
+        return
+
+    start = time.perf_counter()
+    rows = search_index(index, query, limit=limit)
+    elapsed = time.perf_counter() - start
+    if rows is None:
+        print("❌ The query has no searchable words")
+        return
+    print(f"📊 Top {len(rows):,} datasets for '{query}' ({elapsed * 1000:.2f} ms)")
+
+    titles = pq.read_table(catalog_path, columns=['id', 'title']).take(rows).to_pylist()
+    for rank, row in enumerate(titles, start=1):
+        print(f"  {rank:>2}. {row['title']} ({row['id']})")
+
+def main():
+    """Main index build function"""
+    base_dir = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--catalog', type=Path,
+                        default=base_dir / "data" / "catalog" / "catalog.parquet",
+                        help="consolidated catalog written by ingest_catalog.py")
+    parser.add_argument('--catalog-index', type=Path,
+                        default=base_dir / "data" / "catalog" / "catalog_search_index.npz")
+    parser.add_argument('--skip-laureates', action='store_true')
+    parser.add_argument('--skip-catalog', action='store_true')
+    parser.add_argument('--query', help="search the catalog index instead of building")
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.query:
+        query_catalog(args.catalog, args.catalog_index, args.query, args.limit)
+        return
+
+    if not args.skip_laureates:
+        print("📊 Indexing laureate projects and summaries...")
+        build_laureate_index()
+    if not args.skip_catalog:
+        print("📊 Indexing catalog titles, descriptions and tags...")
+        build_catalog_index(args.catalog, args.catalog_index)
+
+if __name__ == "__main__":
+    main()
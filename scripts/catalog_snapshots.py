@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Delta-encoded snapshot store for the data.gouv.fr catalog exports
+Keeps the first snapshot as a base table and every later one as row deltas keyed on id
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+
+KEY = 'id'
+MANIFEST_NAME = "manifest.json"
+BASE_NAME = "base.parquet"
+
+# Snapshot id of an export file: export-dataset-<YYYYMMDD-HHMMSS>-<n> -by MaxAI.csv
+SNAPSHOT_ID = re.compile(r'export-dataset-(\d{8}-\d{6})-')
+
+# Columns that change between pulls for most datasets; diff reports these by default
+VOLATILE_COLUMNS = ['last_modified', 'quality_score', 'metric.views']
+
+# Delta columns: the operation, then per catalog column its new value, its
+# old value and whether it changed (a null can be a real new value)
+OP_COLUMN = '_op'
+OLD_SUFFIX = '@old'
+CHANGED_SUFFIX = '@changed'
+
+def snapshot_id_of(export_files):
+    """Timestamp shared by the export files of one catalog pull"""
+    ids = {match.group(1) for path in export_files if (match := SNAPSHOT_ID.search(path.name))}
+    if len(ids) != 1:
+        raise ValueError(f"Expected the exports of exactly one snapshot, found: {sorted(ids) or 'none'}")
+    return ids.pop()
+
+def load_manifest(store_dir):
+    """Ordered list of the stored snapshots and their delta statistics"""
+    manifest_file = Path(store_dir) / MANIFEST_NAME
+    if not manifest_file.exists():
+        return {'columns': None, 'snapshots': []}
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(store_dir, manifest):
+    """Write the manifest last, so a crash never lists a missing delta"""
+    manifest_file = Path(store_dir) / MANIFEST_NAME
+    tmp_file = manifest_file.with_suffix('.json.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    tmp_file.replace(manifest_file)
+
+def read_parquet(path):
+    """Read a store file with Arrow-backed dtypes (nullable ints, bools and timestamps)"""
+    import pandas as pd
+
+    return pd.read_parquet(path, dtype_backend='pyarrow')
+
+def to_frame(table):
+    """Arrow table (e.g. from ingest_catalog) to a frame with the store's dtypes"""
+    import pandas as pd
+
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def same_values(old, new):
+    """Element-wise equality of two aligned Series, where null equals null"""
+    equal = (old == new).fillna(False).astype(bool)
+    return equal | (old.isna() & new.isna())
+
+def same_value(old, new):
+    """Scalar version of same_values"""
+    import pandas as pd
+
+    if pd.isna(old) or pd.isna(new):
+        return pd.isna(old) and pd.isna(new)
+    return bool(old == new)
+
+def compute_delta(old_df, new_df):
+    """
+    Delta turning old_df into new_df, keyed on id: added rows in full,
+    removed ids, and for changed rows only the changed cells (old and new).
+    """
+    import pandas as pd
+
+    if list(old_df.columns) != list(new_df.columns):
+        raise ValueError("Snapshots have different columns; start a new store for the new schema")
+
+    columns = [col for col in new_df.columns if col != KEY]
+    old = old_df.set_index(KEY)
+    new = new_df.set_index(KEY)
+
+    added_ids = new.index.difference(old.index, sort=False)
+    removed_ids = old.index.difference(new.index, sort=False)
+    common_ids = new.index.intersection(old.index, sort=False)
+    new_common = new.loc[common_ids]
+    old_common = old.loc[common_ids].set_axis(new_common.index)
+
+    changed_masks = {col: ~same_values(old_common[col], new_common[col]) for col in columns}
+    changed_rows = pd.concat(changed_masks, axis=1).any(axis=1).to_numpy()
+    changed_ids = common_ids[changed_rows]
+
+    parts = []
+    if len(added_ids):
+        added = new.loc[added_ids].copy()
+        for col in columns:
+            added[col + OLD_SUFFIX] = old_df[col].iloc[:0].reindex(added.index)
+            added[col + CHANGED_SUFFIX] = True
+        added[OP_COLUMN] = 'added'
+        parts.append(added)
+
+    if len(changed_ids):
+        changed = pd.DataFrame(index=changed_ids)
+        for col in columns:
+            mask = changed_masks[col].to_numpy()[changed_rows]
+            changed[col] = new_common[col].iloc[changed_rows].where(mask)
+            changed[col + OLD_SUFFIX] = old_common[col].iloc[changed_rows].where(mask)
+            changed[col + CHANGED_SUFFIX] = mask
+        changed[OP_COLUMN] = 'changed'
+        parts.append(changed)
+
+    if len(removed_ids):
+        removed = pd.DataFrame(index=removed_ids)
+        for col in columns:
+            removed[col] = old[col].iloc[:0].reindex(removed.index)
+            removed[col + OLD_SUFFIX] = old.loc[removed_ids, col]
+            removed[col + CHANGED_SUFFIX] = False
+        removed[OP_COLUMN] = 'removed'
+        parts.append(removed)
+
+    delta_columns = [OP_COLUMN] + [name for col in columns
+                                   for name in (col, col + OLD_SUFFIX, col + CHANGED_SUFFIX)]
+    if not parts:
+        empty = new.iloc[:0].copy()
+        for col in columns:
+            empty[col + OLD_SUFFIX] = empty[col]
+            empty[col + CHANGED_SUFFIX] = pd.Series(dtype=bool)
+        empty[OP_COLUMN] = pd.Series(dtype=object)
+        parts.append(empty)
+
+    delta = pd.concat(parts)[delta_columns]
+    delta.index.name = KEY
+    delta = delta.reset_index()
+
+    stats = {
+        'rows': len(new_df),
+        'added': len(added_ids),
+        'removed': len(removed_ids),
+        'changed_rows': len(changed_ids),
+        'changed_cells': int(sum(mask.sum() for mask in changed_masks.values())),
+    }
+    return delta, stats
+
+def apply_delta(df, delta):
+    """Apply one delta to a snapshot frame (rows are keyed on id, not ordered)"""
+    import pandas as pd
+
+    columns = [col for col in df.columns if col != KEY]
+    ops = delta[OP_COLUMN]
+    result = df.set_index(KEY)
+
+    removed = delta.loc[ops == 'removed', KEY]
+    result = result.drop(index=removed)
+
+    changed = delta[ops == 'changed'].set_index(KEY)
+    for col in columns:
+        mask = changed[col + CHANGED_SUFFIX].to_numpy(dtype=bool)
+        if mask.any():
+            result.loc[changed.index[mask], col] = changed[col][mask].astype(result[col].dtype)
+
+    added = delta[ops == 'added'].set_index(KEY)[columns].astype(result.dtypes.to_dict())
+    result = pd.concat([result, added])
+    result.index.name = KEY
+    return result.reset_index()
+
+def add_snapshot(store_dir, df, snapshot_id):
+    """
+    Store one snapshot: the first becomes the base table, later ones a delta
+    against the latest stored snapshot. Returns the delta statistics.
+    """
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(store_dir)
+    known = [entry['id'] for entry in manifest['snapshots']]
+    if snapshot_id in known:
+        raise ValueError(f"Snapshot {snapshot_id} is already stored")
+    if known and snapshot_id < known[-1]:
+        raise ValueError(f"Snapshot {snapshot_id} is older than the latest stored one ({known[-1]})")
+
+    if not known:
+        df.to_parquet(store_dir / BASE_NAME, compression='zstd', index=False)
+        manifest['columns'] = list(df.columns)
+        stats = {'rows': len(df), 'added': len(df), 'removed': 0, 'changed_rows': 0, 'changed_cells': 0}
+        entry = {'id': snapshot_id, 'file': BASE_NAME, **stats}
+    else:
+        delta, stats = compute_delta(reconstruct(store_dir, known[-1]), df)
+        delta_name = f"delta-{snapshot_id}.parquet"
+        delta.to_parquet(store_dir / delta_name, compression='zstd', index=False)
+        entry = {'id': snapshot_id, 'file': delta_name, **stats}
+
+    manifest['snapshots'].append(entry)
+    save_manifest(store_dir, manifest)
+    return stats
+
+def reconstruct(store_dir, snapshot_id=None):
+    """Rebuild a stored snapshot (default: the latest) from the base and its deltas"""
+    store_dir = Path(store_dir)
+    snapshots = load_manifest(store_dir)['snapshots']
+    ids = [entry['id'] for entry in snapshots]
+    if not ids:
+        raise ValueError(f"No snapshots stored in {store_dir}")
+    target = ids.index(snapshot_id if snapshot_id is not None else ids[-1])
+
+    df = read_parquet(store_dir / snapshots[0]['file'])
+    for entry in snapshots[1:target + 1]:
+        df = apply_delta(df, read_parquet(store_dir / entry['file']))
+    return df
+
+def changes_between(store_dir, start_id, end_id, columns=None):
+    """
+    What changed from snapshot start_id to end_id, read from the deltas
+    in between only. Returns (added ids, removed ids, cell changes) where
+    cell changes is a frame of id, column, old (at start_id), new (at end_id).
+    """
+    import pandas as pd
+
+    store_dir = Path(store_dir)
+    snapshots = load_manifest(store_dir)['snapshots']
+    ids = [entry['id'] for entry in snapshots]
+    start, end = ids.index(start_id), ids.index(end_id)
+    if start > end:
+        raise ValueError(f"{start_id} is later than {end_id}")
+    columns = columns or VOLATILE_COLUMNS
+
+    # A dataset is absent at start_id if its first op is 'added', and at
+    # end_id if its last op is 'removed'. A cell's value at start_id is the
+    # old value of its first change or removal, and at end_id the new value
+    # of its last change or (re-)addition.
+    first_op, last_op = {}, {}
+    first_old, last_new = {}, {}
+    for entry in snapshots[start + 1:end + 1]:
+        wanted = [KEY, OP_COLUMN] + [name for col in columns
+                                     for name in (col, col + OLD_SUFFIX, col + CHANGED_SUFFIX)]
+        delta = pd.read_parquet(store_dir / entry['file'], columns=wanted, dtype_backend='pyarrow')
+        ops = delta[OP_COLUMN]
+
+        for dataset_id, op in zip(delta[KEY], ops):
+            first_op.setdefault(dataset_id, op)
+            last_op[dataset_id] = op
+
+        for col in columns:
+            changed = (ops == 'changed').to_numpy() & delta[col + CHANGED_SUFFIX].to_numpy(dtype=bool)
+            leaves = changed | (ops == 'removed').to_numpy()
+            for dataset_id, old in zip(delta.loc[leaves, KEY], delta.loc[leaves, col + OLD_SUFFIX]):
+                first_old.setdefault((dataset_id, col), old)
+            arrives = changed | (ops == 'added').to_numpy()
+            for dataset_id, new in zip(delta.loc[arrives, KEY], delta.loc[arrives, col]):
+                last_new[(dataset_id, col)] = new
+
+    added = sorted(dataset_id for dataset_id, op in first_op.items()
+                   if op == 'added' and last_op[dataset_id] != 'removed')
+    removed = sorted(dataset_id for dataset_id, op in first_op.items()
+                     if op != 'added' and last_op[dataset_id] == 'removed')
+
+    # Cells of datasets added or removed in the range are covered by those lists
+    rows = [
+        (dataset_id, col, first_old[(dataset_id, col)], new)
+        for (dataset_id, col), new in last_new.items()
+        if first_op[dataset_id] != 'added' and last_op[dataset_id] != 'removed'
+        and not same_value(first_old[(dataset_id, col)], new)
+    ]
+    cell_changes = pd.DataFrame(rows, columns=[KEY, 'column', 'old', 'new'], dtype=object)
+    return added, removed, cell_changes
+
+def main():
+    """Main snapshot store function"""
+    base_dir = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--store', type=Path,
+                        default=base_dir / "data" / "catalog" / "snapshots",
+                        help="snapshot store directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="store the catalog pull found in --source-dir")
+    add.add_argument('--source-dir', type=Path, default=base_dir,
+                     help="directory holding the export-dataset-*.csv files of one pull")
+    add.add_argument('--workers', type=int, default=None, help="number of parser processes")
+
+    commands.add_parser('list', help="list the stored snapshots")
+
+    diff = commands.add_parser('diff', help="what changed between two snapshots")
+    diff.add_argument('start')
+    diff.add_argument('end')
+    diff.add_argument('--columns', nargs='+', default=VOLATILE_COLUMNS)
+
+    show = commands.add_parser('show', help="rebuild one snapshot as a Parquet file")
+    show.add_argument('snapshot')
+    show.add_argument('--output', type=Path, required=True)
+
+    args = parser.parse_args()
+
+    if args.command == 'add':
+        from ingest_catalog import find_exports, ingest_exports
+
+        export_files = find_exports(args.source_dir)
+        if not export_files:
+            print(f"❌ No export files found in {args.source_dir}")
+            return
+        snapshot_id = snapshot_id_of(export_files)
+        print(f"📊 Ingesting snapshot {snapshot_id} ({len(export_files)} files)...")
+        table, _ = ingest_exports(export_files, workers=args.workers)
+        stats = add_snapshot(args.store, to_frame(table), snapshot_id)
+        print(f"✓ Stored {stats['rows']:,} datasets: {stats['added']:,} added, "
+              f"{stats['removed']:,} removed, {stats['changed_rows']:,} changed "
+              f"({stats['changed_cells']:,} cells)")
+
+    elif args.command == 'list':
+        for entry in load_manifest(args.store)['snapshots']:
+            size = (args.store / entry['file']).stat().st_size
+            print(f"{entry['id']}  {entry['rows']:>9,} rows  +{entry['added']:,} "
+                  f"-{entry['removed']:,} ~{entry['changed_rows']:,}  {entry['file']} ({size:,} bytes)")
+
+    elif args.command == 'diff':
+        added, removed, cell_changes = changes_between(args.store, args.start, args.end, args.columns)
+        print(f"📊 {args.start} → {args.end}")
+        print(f"  Added datasets: {len(added):,}")
+        print(f"  Removed datasets: {len(removed):,}")
+        for col in args.columns:
+            print(f"  Changed {col}: {(cell_changes['column'] == col).sum():,}")
+
+    elif args.command == 'show':
+        df = reconstruct(args.store, args.snapshot)
+        df.to_parquet(args.output, compression='zstd', index=False)
+        print(f"✓ Rebuilt {args.snapshot} ({len(df):,} rows) into {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Declarative dataset specs and one aggregation engine for every open-data project
+A spec maps a file's columns to typed dimensions and measures; any grouping
+of the dimensions is then counted in one vectorized pass
+"""
+
+import argparse
+import unicodedata
+from pathlib import Path
+
+from process_ilab import detect_analysis_fields, detect_delimiter
+
+BASE_DIR = Path(__file__).parent.parent
+
+# One spec per dataset. 'read' is passed to the CSV reader; dimensions are
+# name -> (column, type) and measures name -> (column, aggregation); each
+# report groups by some dimensions, keeping the top 'limit' groups (all of
+# them, in dimension order, when limit is None).
+DATASET_SPECS = {
+    'ilab': {
+        'title': "I-LAB LAUREATES",
+        'path': BASE_DIR / "data" / "ilab" / "ilab_laureats.csv",
+        'read': {'sep': ';', 'encoding': 'utf-8-sig'},
+        'dimensions': {
+            'year': ('Année de concours', 'year'),
+            'region': ('Région', 'category'),
+            'domain': ('Domaine technologique', 'category'),
+            'gender': ('Genre', 'category'),
+            'type': ('Type de candidature', 'category'),
+            'jury': ('Jury', 'category'),
+        },
+        'measures': {
+            'laureates': (None, 'count'),
+            'grand_prix': ('Grand-Prix', 'nonempty'),
+            'with_siret': ('N° SIRET', 'nonempty'),
+            'repeat_laureates': ('Déjà lauréat en', 'nonempty'),
+        },
+        'reports': [
+            ("BY YEAR", ['year'], None),
+            ("BY REGION", ['region'], 20),
+            ("BY TECHNOLOGY DOMAIN", ['domain'], 20),
+            ("BY GENDER", ['gender'], None),
+            ("BY CANDIDATURE TYPE AND YEAR", ['type', 'year'], None),
+            ("BY REGION AND DOMAIN", ['region', 'domain'], 20),
+        ],
+    },
+    'french_tech': {
+        'title': "FRENCH TECH 40/120 (2023)",
+        'path': BASE_DIR / "data" / "ilab" / "French Tech 40_120 - 2023.csv",
+        'read': {'sep': ',', 'header': None, 'names': ['name', 'website']},
+        'dimensions': {
+            'domain_suffix': ('website', 'domain_suffix'),
+        },
+        'measures': {
+            'companies': (None, 'count'),
+            'with_website': ('website', 'nonempty'),
+        },
+        'reports': [
+            ("BY WEBSITE DOMAIN SUFFIX", ['domain_suffix'], None),
+        ],
+    },
+    'catalog': {
+        'title': "DATA.GOUV.FR CATALOG",
+        'path': BASE_DIR / "data" / "catalog" / "catalog.parquet",
+        'dimensions': {
+            'created_year': ('created_at', 'year'),
+            'organization': ('organization', 'category'),
+            'license': ('license', 'category'),
+            'frequency': ('frequency', 'category'),
+            'featured': ('featured', 'bool'),
+        },
+        'measures': {
+            'datasets': (None, 'count'),
+            'views': ('metric.views', 'sum'),
+            'reuses': ('metric.reuses', 'sum'),
+            'quality_score': ('quality_score', 'mean'),
+        },
+        'reports': [
+            ("BY CREATION YEAR", ['created_year'], None),
+            ("BY ORGANIZATION", ['organization'], 25),
+            ("BY LICENSE", ['license'], None),
+            ("BY UPDATE FREQUENCY", ['frequency'], 20),
+            ("FEATURED BY CREATION YEAR", ['featured', 'created_year'], None),
+        ],
+    },
+}
+
+DIMENSION_TYPES = ['category', 'year', 'month', 'bool', 'domain_suffix']
+MEASURE_AGGREGATIONS = ['count', 'nonempty', 'sum', 'mean']
+MISSING_LABEL = 'Unknown'
+TRUE_VALUES = {'true', '1', 'oui', 'yes', 'x', 'o', 'y'}
+
+def fold_name(name):
+    """Field name without accents ('Année de concours' -> 'Annee de concours')"""
+    return unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+
+def guess_spec(path):
+    """
+    A spec for a CSV no spec describes: the year, region and category
+    fields picked by name like process_ilab does, counted by year and top 20.
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        sample = f.read(2048)
+    delimiter = detect_delimiter(sample)
+    fields = sample.splitlines()[0].split(delimiter) if sample else []
+    fields = [field.strip().strip('"') for field in fields]
+
+    # Match on accent-folded names, so 'Année' and 'Région' are found too;
+    # the first field of each folded name wins, as it does in process_ilab
+    folded = {}
+    for field in fields:
+        folded.setdefault(fold_name(field), field)
+    dimensions, reports = {}, []
+    for section, field in detect_analysis_fields(list(folded)).items():
+        if field is None:
+            continue
+        field = folded[field]
+        name = section.removeprefix('by_')
+        dimensions[name] = (field, 'year' if name == 'year' else 'category')
+        reports.append((f"BY {name.upper()} ({field})", [name], None if name == 'year' else 20))
+
+    return {
+        'title': Path(path).name.upper(),
+        'path': Path(path),
+        'read': {'sep': delimiter, 'encoding': 'utf-8-sig'},
+        'dimensions': dimensions,
+        'measures': {'records': (None, 'count')},
+        'reports': reports,
+    }
+
+def validate_spec(spec):
+    """Check the dimension types, aggregations and report dimensions of a spec (ValueError)"""
+    for name, (_, kind) in spec['dimensions'].items():
+        if kind not in DIMENSION_TYPES:
+            raise ValueError(f"dimension {name!r}: unknown type {kind!r}")
+    for name, (column, aggregation) in spec['measures'].items():
+        if aggregation not in MEASURE_AGGREGATIONS:
+            raise ValueError(f"measure {name!r}: unknown aggregation {aggregation!r}")
+        if column is None and aggregation != 'count':
+            raise ValueError(f"measure {name!r}: {aggregation!r} needs a column")
+    for title, by, _ in spec['reports']:
+        unknown = [name for name in by if name not in spec['dimensions']]
+        if unknown:
+            raise ValueError(f"report {title!r}: unknown dimensions {unknown}")
+
+def spec_columns(spec):
+    """Source columns a spec reads, in first-use order"""
+    columns = [column for column, _ in spec['dimensions'].values()]
+    columns += [column for column, _ in spec['measures'].values() if column is not None]
+    return list(dict.fromkeys(columns))
+
+def load_table(spec):
+    """Only the spec's columns of its file (CSV as text, Parquet with its own types)"""
+    import pandas as pd
+
+    columns = spec_columns(spec)
+    path = Path(spec['path'])
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False,
+                       na_values=[''], **spec.get('read', {}))
+
+def typed_values(values, kind):
+    """Values of one dimension column as the labels of its type (NaN/None when missing)"""
+    import pandas as pd
+
+    if kind == 'year':
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values.dt.year.astype('Int64')
+        return pd.to_numeric(values.astype('string').str.extract(r'((?:19|20)\d{2})')[0], errors='coerce').astype('Int64')
+    if kind == 'month':
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values.dt.strftime('%Y-%m')
+        return values.astype('string').str.extract(r'(\d{4}-\d{2})')[0]
+    if kind == 'bool':
+        if pd.api.types.is_bool_dtype(values):
+            return values.astype('boolean')
+        text = values.astype('string').str.strip().str.lower()
+        return text.isin(TRUE_VALUES).astype('boolean').where(text.notna() & (text != ''))
+    if kind == 'domain_suffix':
+        host = values.astype('string').str.lower().str.extract(r'^(?:[a-z]+://)?([^/:?#]+)')[0]
+        return host.str.extract(r'\.([a-z0-9-]+)\.?$')[0]
+    text = values.astype('string').str.strip()
+    return text.where(text != '')
+
+def dimension_codes(values, kind):
+    """
+    Integer code of every row and the label of every code, in label order;
+    missing values get the last code, labelled MISSING_LABEL.
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes, labels = pd.factorize(typed_values(values, kind), sort=True)
+    labels = np.asarray(labels, dtype=object)
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(labels), codes)
+        labels = np.append(labels, MISSING_LABEL)
+    return codes.astype(np.int64), labels
+
+def measure_values(table, column, aggregation):
+    """Per-row weight of a measure (1 for counts) and whether the row has a value"""
+    import numpy as np
+    import pandas as pd
+
+    if aggregation == 'count':
+        return np.ones(len(table)), np.ones(len(table), dtype=bool)
+    values = table[column]
+    if aggregation == 'nonempty':
+        filled = values.notna().to_numpy() & (values.astype('string').str.strip() != '').fillna(False).to_numpy()
+        return filled.astype('float64'), np.ones(len(table), dtype=bool)
+    numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    present = ~np.isnan(numbers)
+    return np.where(present, numbers, 0.0), present
+
+def prepare(table, spec):
+    """Dimension codes and measure weights of a table, computed once for all reports"""
+    validate_spec(spec)
+    dimensions = {name: dimension_codes(table[column], kind)
+                  for name, (column, kind) in spec['dimensions'].items()}
+    measures = {name: (aggregation, *measure_values(table, column, aggregation))
+                for name, (column, aggregation) in spec['measures'].items()}
+    return {'rows': len(table), 'dimensions': dimensions, 'measures': measures}
+
+def aggregate(prepared, by, limit=None):
+    """
+    Every measure per combination of the by dimensions, in one pass: the
+    dimension codes are combined into one group code, then each measure is
+    a weighted bincount over it. With limit, only the top groups of the
+    first measure are kept; otherwise groups follow the dimension order.
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes = [prepared['dimensions'][name][0] for name in by]
+    sizes = [len(prepared['dimensions'][name][1]) for name in by]
+    group = np.ravel_multi_index(codes, sizes) if by else np.zeros(prepared['rows'], dtype=np.int64)
+    present_groups, group = np.unique(group, return_inverse=True)
+
+    result = {}
+    keys = np.unravel_index(present_groups, sizes) if by else []
+    for name, key in zip(by, keys):
+        result[name] = prepared['dimensions'][name][1][key]
+
+    n_groups = len(present_groups)
+    for name, (aggregation, weights, present) in prepared['measures'].items():
+        totals = np.bincount(group, weights=weights, minlength=n_groups)
+        if aggregation == 'mean':
+            counts = np.bincount(group, weights=present, minlength=n_groups)
+            result[name] = np.divide(totals, counts, out=np.full(n_groups, np.nan), where=counts > 0)
+        elif aggregation == 'sum':
+            # Sums of integer columns stay integers
+            result[name] = totals.astype(np.int64) if np.array_equal(weights, np.round(weights)) else totals
+        else:
+            result[name] = totals.astype(np.int64)
+
+    table = pd.DataFrame(result)
+    if limit is not None and len(table):
+        first_measure = next(iter(prepared['measures']))
+        table = table.sort_values(first_measure, ascending=False, kind='stable').head(limit)
+    return table.reset_index(drop=True)
+
+def analyze(spec, table=None):
+    """All the reports of a spec, as {title: DataFrame}, from one read of its columns"""
+    table = load_table(spec) if table is None else table
+    prepared = prepare(table, spec)
+    analysis = {"TOTAL": aggregate(prepared, [])}
+    for title, by, limit in spec['reports']:
+        analysis[title] = aggregate(prepared, by, limit)
+    return analysis
+
+def format_value(value):
+    """One report cell"""
+    if isinstance(value, float):
+        return f"{value:,.2f}" if value == value else '-'
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
+
+def generate_report(spec, analysis, output_file):
+    """Write every report table of a spec as a text report"""
+    from datetime import datetime
+
+    measures = list(spec['measures'])
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 100 + "\n")
+        f.write(f"{spec['title']} - SPEC REPORT\n")
+        f.write("=" * 100 + "\n\n")
+        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"Source: {Path(spec['path']).name}\n")
+        totals = analysis['TOTAL'].to_dict('records')
+        for name in measures:
+            f.write(f"{name}: {format_value(totals[0][name]) if totals else '-'}\n")
+
+        for title, table in analysis.items():
+            if title == "TOTAL":
+                continue
+            f.write(f"\n\n{title}\n")
+            f.write("-" * 100 + "\n")
+            dimensions = [col for col in table.columns if col not in measures]
+            f.write(f"{' / '.join(dimensions)[:50]:50s}" + ''.join(f" {name[:16]:>16s}" for name in measures) + "\n")
+            for row in table.itertuples(index=False):
+                label = ' / '.join(str(value) for value in row[:len(dimensions)])
+                values = row[len(dimensions):]
+                f.write(f"{label[:50]:50s}" + ''.join(f" {format_value(value):>16s}" for value in values) + "\n")
+
+        f.write("\n" + "=" * 100 + "\n")
+        f.write("END OF REPORT\n")
+        f.write("=" * 100 + "\n")
+
+def main():
+    """Main spec report function"""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('dataset', help=f"a spec name ({', '.join(DATASET_SPECS)}) or the path of any CSV")
+    parser.add_argument('--output', type=Path, help="report file (default: <source>_spec_report.txt next to the source)")
+    args = parser.parse_args()
+
+    if args.dataset in DATASET_SPECS:
+        spec = DATASET_SPECS[args.dataset]
+    elif Path(args.dataset).exists():
+        spec = guess_spec(Path(args.dataset))
+        print(f"✓ No spec for {Path(args.dataset).name}; dimensions guessed from field names: "
+              f"{', '.join(column for column, _ in spec['dimensions'].values()) or 'none'}")
+    else:
+        print(f"❌ Unknown dataset or file: {args.dataset}")
+        return
+
+    path = Path(spec['path'])
+    if not path.exists():
+        print(f"❌ File not found: {path}")
+        return
+
+    print(f"📊 Analyzing {path.name} ({len(spec['dimensions'])} dimensions, {len(spec['measures'])} measures)...")
+    analysis = analyze(spec)
+    output = args.output or path.with_name(f"{path.stem}_spec_report.txt")
+    generate_report(spec, analysis, output)
+    print(f"✓ {len(spec['reports'])} reports saved to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Enrich the i-Lab laureates from a local Sirene stock file
+Streams the INSEE bulk files once and keeps only the laureates' companies,
+instead of one rate-limited API call per SIRET
+"""
+
+import argparse
+import re
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from process_ilab import file_sha256
+
+# Columns read from StockUniteLegale (one row per company)
+UNIT_COLUMNS = [
+    'siren', 'etatAdministratifUniteLegale', 'dateCreationUniteLegale', 'dateDebut',
+    'activitePrincipaleUniteLegale', 'categorieJuridiqueUniteLegale', 'trancheEffectifsUniteLegale',
+]
+# Columns read from StockEtablissement (one row per establishment)
+ESTABLISHMENT_COLUMNS = [
+    'siren', 'siret', 'etablissementSiege', 'etatAdministratifEtablissement',
+    'activitePrincipaleEtablissement', 'codePostalEtablissement', 'libelleCommuneEtablissement',
+]
+
+# Columns added to the laureate table ('C' = cessée, 'A' = active; 'F' = fermé for establishments)
+UNIT_FIELDS = [
+    'etatAdministratifUniteLegale', 'dateCreationUniteLegale', 'dateFermetureUniteLegale',
+    'activitePrincipaleUniteLegale', 'categorieJuridiqueUniteLegale', 'trancheEffectifsUniteLegale',
+]
+ESTABLISHMENT_FIELDS = [
+    'siret', 'etatAdministratifEtablissement', 'activitePrincipaleEtablissement',
+    'codePostalEtablissement', 'libelleCommuneEtablissement',
+]
+# Date the stock was extracted, written on every row: active companies are known to be active up to it
+STOCK_DATE_COLUMN = 'dateStockSirene'
+# sha256 of the laureate CSV the table was built from, so row-aligned readers can check it still matches
+SOURCE_DIGEST_COLUMN = 'sha256Laureats'
+
+BLOCK_SIZE = 16 << 20  # bytes of CSV parsed per batch
+
+def normalize_number(value, digits):
+    """SIREN (9 digits) or SIRET (14 digits) from a free-form cell, or ''"""
+    if not isinstance(value, str):
+        return ''
+    number = re.sub(r'\D', '', value.split('.')[0])
+    return number.zfill(digits) if digits - 1 <= len(number) <= digits else ''
+
+@contextmanager
+def open_stock(path):
+    """Binary stream of a stock CSV, read straight from the .zip INSEE distributes (closed with it)"""
+    if path.suffix == '.zip':
+        with zipfile.ZipFile(path) as archive:
+            name = next(name for name in archive.namelist() if name.endswith('.csv'))
+            with archive.open(name) as stream:
+                yield stream
+        return
+    with open(path, 'rb') as stream:
+        yield stream
+
+def iter_stock_batches(path, columns, block_size=BLOCK_SIZE):
+    """
+    Yield the stock file in record batches of the given columns only, as
+    strings. CSV (plain or zipped) is parsed incrementally; Parquet is read
+    row group by row group.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pv
+    import pyarrow.parquet as pq
+
+    if path.suffix == '.parquet':
+        for batch in pq.ParquetFile(path).iter_batches(columns=columns):
+            yield pa.RecordBatch.from_arrays(
+                [batch.column(col).cast(pa.string()) for col in columns], names=columns)
+        return
+
+    with open_stock(path) as stream:
+        reader = pv.open_csv(
+            stream,
+            read_options=pv.ReadOptions(block_size=block_size),
+            convert_options=pv.ConvertOptions(
+                include_columns=columns,
+                column_types={col: pa.string() for col in columns},
+            ),
+        )
+        yield from reader
+
+def hash_join_stock(path, key, keys, columns, block_size=BLOCK_SIZE):
+    """
+    Stream a stock file once and keep the rows whose key is in keys (a hash
+    lookup per row). Only the matching rows are ever held in memory.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    value_set = pa.array(sorted(keys), type=pa.string())
+    matched = []
+    scanned = 0
+    for batch in iter_stock_batches(path, columns, block_size):
+        scanned += batch.num_rows
+        mask = pc.is_in(batch.column(key), value_set=value_set)
+        if pc.any(mask).as_py():
+            matched.append(batch.filter(mask))
+
+    schema = pa.schema([(col, pa.string()) for col in columns])
+    return pa.Table.from_batches(matched, schema=schema), scanned
+
+def unit_fields(units):
+    """One row of company fields per SIREN; a closed company's closure date is its last period start"""
+    units = units.drop_duplicates('siren').set_index('siren')
+    closed = units['etatAdministratifUniteLegale'] == 'C'
+    units['dateFermetureUniteLegale'] = units['dateDebut'].where(closed)
+    return units[UNIT_FIELDS]
+
+def establishment_fields(establishments, sirens, sirets):
+    """
+    The establishment of each laureate: its own SIRET when it has one,
+    otherwise the head office (siège) of its company.
+    """
+    by_siret = establishments.drop_duplicates('siret').set_index('siret', drop=False)
+    head_offices = (establishments[establishments['etablissementSiege'].str.lower() == 'true']
+                    .drop_duplicates('siren').set_index('siren'))
+
+    own = by_siret.reindex(sirets.where(sirets != '')).reset_index(drop=True)
+    head_office = head_offices.reindex(sirens.where(sirens != '')).reset_index(drop=True)
+    return own.combine_first(head_office)[ESTABLISHMENT_FIELDS]
+
+def stock_date(path):
+    """Default extraction date of a stock file: the day it was downloaded (its modification date)"""
+    return datetime.fromtimestamp(path.stat().st_mtime).date().isoformat()
+
+def enrich(laureates, units_path, establishments_path=None, block_size=BLOCK_SIZE, as_of=None):
+    """
+    Add the Sirene company (and establishment) fields to the laureate table,
+    and the stock extraction date as_of (default: stock_date of units_path).
+    """
+    import pandas as pd
+
+    sirets = laureates['N° SIRET'].map(lambda value: normalize_number(value, 14))
+    sirens = laureates['N° SIREN'].map(lambda value: normalize_number(value, 9))
+    # A SIRET starts with its company's SIREN
+    sirens = sirens.where(sirens != '', sirets.str[:9])
+    keys = set(sirens[sirens != ''])
+    stats = {'laureates': len(laureates), 'sirens': len(keys)}
+
+    start = time.time()
+    units, scanned = hash_join_stock(units_path, 'siren', keys, UNIT_COLUMNS, block_size)
+    units = unit_fields(units.to_pandas())
+    stats.update(units_scanned=scanned, units_matched=len(units), units_seconds=time.time() - start)
+
+    enriched = laureates.reset_index(drop=True)
+    enriched = pd.concat([enriched, units.reindex(sirens.where(sirens != '')).reset_index(drop=True)], axis=1)
+
+    if establishments_path is not None:
+        start = time.time()
+        establishments, scanned = hash_join_stock(
+            establishments_path, 'siren', keys, ESTABLISHMENT_COLUMNS, block_size)
+        fields = establishment_fields(establishments.to_pandas(), sirens.reset_index(drop=True),
+                                      sirets.reset_index(drop=True))
+        enriched = pd.concat([enriched, fields], axis=1)
+        stats.update(establishments_scanned=scanned, establishments_matched=establishments.num_rows,
+                     establishments_seconds=time.time() - start)
+
+    enriched[STOCK_DATE_COLUMN] = as_of or stock_date(units_path)
+    stats['enriched'] = int(enriched['etatAdministratifUniteLegale'].notna().sum())
+    return enriched, stats
+
+def main():
+    """Main enrichment function"""
+    base_dir = Path(__file__).parent.parent
+    data_dir = base_dir / "data" / "ilab"
+
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('units', type=Path,
+                        help="StockUniteLegale file (.csv, .zip or .parquet)")
+    parser.add_argument('--establishments', type=Path,
+                        help="StockEtablissement file (.csv, .zip or .parquet), for the address and NAF of each site")
+    parser.add_argument('--input', type=Path, default=data_dir / "ilab_laureats.csv")
+    parser.add_argument('--output', type=Path, default=data_dir / "ilab_laureats_sirene.csv")
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE,
+                        help="bytes of CSV parsed per batch")
+    parser.add_argument('--stock-date',
+                        help="date the Sirene stock was extracted, YYYY-MM-DD (default: the stock file's date)")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    laureates = pd.read_csv(args.input, sep=';', encoding='utf-8-sig', dtype=str)
+    print(f"📊 Enriching {len(laureates):,} laureates from {args.units.name}...")
+
+    enriched, stats = enrich(laureates, args.units, args.establishments, args.block_size, args.stock_date)
+    enriched[SOURCE_DIGEST_COLUMN] = file_sha256(args.input)
+    print(f"✓ Scanned {stats['units_scanned']:,} legal units in {stats['units_seconds']:.1f}s, "
+          f"matched {stats['units_matched']:,} of {stats['sirens']:,} SIRENs")
+    if args.establishments is not None:
+        print(f"✓ Scanned {stats['establishments_scanned']:,} establishments in "
+              f"{stats['establishments_seconds']:.1f}s, kept {stats['establishments_matched']:,}")
+
+    enriched.to_csv(args.output, sep=';', index=False, encoding='utf-8-sig')
+    print(f"✓ {stats['enriched']:,} of {stats['laureates']:,} laureates enriched, saved to {args.output}")
+    print(f"  Stock date: {enriched[STOCK_DATE_COLUMN].iloc[0]}")
+
+    status = enriched['etatAdministratifUniteLegale'].value_counts()
+    print(f"  Active companies: {status.get('A', 0):,}")
+    print(f"  Closed companies: {status.get('C', 0):,}")
+
+if __name__ == "__main__":
+    main()
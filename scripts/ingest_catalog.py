@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Bulk ingestion of the data.gouv.fr catalog exports
+Consolidates the export-dataset-*.csv files into one columnar (Parquet) store
+"""
+
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from process_ilab import detect_delimiter
+
+# Descriptions can be far larger than the csv module's default 128 KB field limit
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+EXPORT_PATTERN = "export-dataset-*.csv"
+
+# Every catalog record starts on a new line with its quoted 24-hex-digit id
+RECORD_START = re.compile(r'^"[0-9a-f]{24}";', re.MULTILINE)
+
+INT_COLUMNS = [
+    'resources_count', 'main_resources_count',
+    'metric.discussions', 'metric.discussions_open', 'metric.reuses',
+    'metric.dataservices', 'metric.followers', 'metric.views',
+    'metric.resources_downloads',
+]
+FLOAT_COLUMNS = ['quality_score']
+BOOL_COLUMNS = ['featured', 'archived']
+TIMESTAMP_COLUMNS = [
+    'created_at', 'last_modified', 'harvest.created_at', 'harvest.modified_at',
+]
+
+# Dict-literal columns such as "{'2025-01': 0, '2025-02': 3}", keyed by matrix name
+MONTHLY_COLUMNS = {
+    'reuses': 'metric.reuses_by_months',
+    'followers': 'metric.followers_by_months',
+}
+MONTH_VALUE = re.compile(r"'(\d{4}-\d{2})':\s*(-?\d+)")
+
+def export_number(path):
+    """Sequence number of an export file (export-dataset-<ts>-<n> -by MaxAI.csv)"""
+    match = re.search(r'-(\d+)\s*-by', path.name)
+    return int(match.group(1)) if match else 0
+
+def find_exports(source_dir):
+    """Export files in the order they were written"""
+    return sorted(Path(source_dir).glob(EXPORT_PATTERN), key=export_number)
+
+def read_export(path):
+    """
+    Parse one export file into a string-typed Arrow table.
+
+    The exporter splits its output every N lines, so a record can start at
+    the end of one file and finish at the top of the next one (after that
+    file's header). Those two fragments are returned as raw text ('tail' and
+    'head') so the caller can stitch them back together.
+    """
+    import pyarrow as pa
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+
+    header_end = text.index('\n') + 1
+    delimiter = detect_delimiter(text[:header_end])
+    fields = next(csv.reader([text[:header_end]], delimiter=delimiter))
+    body = text[header_end:]
+
+    starts = [match.start() for match in RECORD_START.finditer(body)]
+    if not starts:
+        return {'number': export_number(path), 'fields': fields, 'table': None,
+                'head': body, 'tail': '', 'malformed': 0}
+
+    head = body[:starts[0]]
+    rows = list(csv.reader(io.StringIO(body[starts[0]:]), delimiter=delimiter))
+
+    # A short last row is the first half of a record continued in the next file
+    tail = ''
+    if rows and len(rows[-1]) != len(fields):
+        rows.pop()
+        tail = body[starts[-1]:]
+
+    complete = [row for row in rows if len(row) == len(fields)]
+    columns = list(zip(*complete)) if complete else [()] * len(fields)
+    table = pa.table({field: pa.array(values, type=pa.string())
+                      for field, values in zip(fields, columns)})
+
+    return {'number': export_number(path), 'fields': fields, 'table': table,
+            'head': head, 'tail': tail, 'malformed': len(rows) - len(complete)}
+
+def stitch_split_records(parts, delimiter=';'):
+    """Rebuild the records that were split across consecutive export files"""
+    import pyarrow as pa
+
+    fields = parts[0]['fields']
+    stitched = []
+    unmatched = 0
+    for current, following in zip(parts, parts[1:]):
+        if not current['tail']:
+            continue
+        # The split happens at a line break inside a quoted multi-line field
+        text = current['tail'] + '\n' + following['head']
+        rows = list(csv.reader(io.StringIO(text), delimiter=delimiter))
+        if len(rows) == 1 and len(rows[0]) == len(fields):
+            stitched.append(rows[0])
+        else:
+            unmatched += 1
+
+    columns = list(zip(*stitched)) if stitched else [()] * len(fields)
+    table = pa.table({field: pa.array(values, type=pa.string())
+                      for field, values in zip(fields, columns)})
+    return table, unmatched
+
+def deduplicate(table, key='id'):
+    """Keep the first occurrence of every key, in export order"""
+    import numpy as np
+    import pyarrow as pa
+
+    row_numbers = pa.array(np.arange(table.num_rows))
+    first_rows = (
+        table.select([key])
+        .append_column('_row', row_numbers)
+        .group_by(key)
+        .aggregate([('_row', 'min')])
+        .column('_row_min')
+    )
+    return table.take(pa.array(np.sort(first_rows.to_numpy())))
+
+def apply_types(table):
+    """Cast the numeric, boolean and timestamp columns of the string table"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    def nullify_empty(column):
+        return pc.if_else(pc.equal(column, ''), pa.scalar(None, pa.string()), column)
+
+    casts = (
+        [(name, pa.int64()) for name in INT_COLUMNS]
+        + [(name, pa.float64()) for name in FLOAT_COLUMNS]
+        + [(name, pa.timestamp('us')) for name in TIMESTAMP_COLUMNS]
+    )
+    for name, target in casts:
+        if name not in table.column_names:
+            continue
+        index = table.column_names.index(name)
+        try:
+            typed = nullify_empty(table.column(name)).cast(target)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # Leave a column with unexpected values as text rather than fail the run
+            print(f"  ⚠️ Kept {name} as text (values not castable to {target})")
+            continue
+        table = table.set_column(index, name, typed)
+
+    for name in BOOL_COLUMNS:
+        if name not in table.column_names:
+            continue
+        index = table.column_names.index(name)
+        column = nullify_empty(table.column(name))
+        table = table.set_column(index, name, pc.equal(column, 'True'))
+
+    return table
+
+def parse_monthly_metrics(table):
+    """
+    Parse the dict-literal monthly metric columns into dense matrices.
+
+    Each cell is scanned once with a regex instead of ast.literal_eval.
+    All matrices share one sorted month axis. Row i is table row i.
+    Cells without a dict (e.g. '0') become rows of zeros.
+    """
+    import numpy as np
+
+    parsed = {}
+    for name, column in MONTHLY_COLUMNS.items():
+        if column in table.column_names:
+            cells = table.column(column).to_pylist()
+            parsed[name] = [MONTH_VALUE.findall(cell) if cell else [] for cell in cells]
+
+    months = sorted({month for cells in parsed.values() for pairs in cells for month, _ in pairs})
+    month_position = {month: i for i, month in enumerate(months)}
+
+    metrics = {
+        'ids': np.array(table.column('id').to_pylist(), dtype=str),
+        'months': np.array(months, dtype=str),
+    }
+    for name, cells in parsed.items():
+        lengths = np.fromiter((len(pairs) for pairs in cells), dtype=np.int64, count=len(cells))
+        rows = np.repeat(np.arange(len(cells)), lengths)
+        cols = np.fromiter((month_position[month] for pairs in cells for month, _ in pairs),
+                           dtype=np.int64, count=int(lengths.sum()))
+        values = np.fromiter((int(value) for pairs in cells for _, value in pairs),
+                             dtype=np.int64, count=int(lengths.sum()))
+
+        matrix = np.zeros((len(cells), len(months)), dtype=np.int32)
+        matrix[rows, cols] = values
+        metrics[name] = matrix
+
+    return metrics
+
+def save_monthly_metrics(metrics, output_file):
+    """Persist the monthly matrices, ids and month axis as one .npz archive"""
+    import numpy as np
+
+    np.savez(output_file, **metrics)
+
+def load_monthly_metrics(input_file):
+    """Load the matrices saved by save_monthly_metrics as a dict of arrays"""
+    import numpy as np
+
+    with np.load(input_file) as archive:
+        return {name: archive[name] for name in archive.files}
+
+def monthly_trend(metrics, name, rows=None):
+    """Total of one monthly metric per month, over all datasets or the given rows"""
+    matrix = metrics[name] if rows is None else metrics[name][rows]
+    return dict(zip(metrics['months'].tolist(), matrix.sum(axis=0).tolist()))
+
+def ingest_exports(export_files, workers=None):
+    """Parse all exports in a process pool and return one deduplicated table"""
+    import pyarrow as pa
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(read_export, export_files))
+
+    parts.sort(key=lambda part: part['number'])
+    stitched, unmatched = stitch_split_records(parts)
+    tables = [part['table'] for part in parts if part['table'] is not None] + [stitched]
+    table = pa.concat_tables(tables)
+
+    stats = {
+        'files': len(parts),
+        'records': table.num_rows,
+        'stitched': stitched.num_rows,
+        'skipped': sum(part['malformed'] for part in parts) + unmatched,
+    }
+
+    table = deduplicate(table)
+    stats['unique'] = table.num_rows
+    return apply_types(table), stats
+
+def main():
+    """Main ingestion function"""
+    base_dir = Path(__file__).parent.parent
+
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--source-dir', type=Path, default=base_dir,
+                        help="directory holding the export-dataset-*.csv files")
+    parser.add_argument('--output', type=Path,
+                        default=base_dir / "data" / "catalog" / "catalog.parquet",
+                        help="consolidated Parquet file to write")
+    parser.add_argument('--metrics-output', type=Path,
+                        default=base_dir / "data" / "catalog" / "catalog_monthly_metrics.npz",
+                        help="dataset x month matrices of reuses and followers")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="number of parser processes")
+    args = parser.parse_args()
+
+    export_files = find_exports(args.source_dir)
+    if not export_files:
+        print(f"❌ No {EXPORT_PATTERN} files found in {args.source_dir}")
+        return
+
+    print(f"📊 Ingesting {len(export_files)} catalog exports with {args.workers} workers...")
+    table, stats = ingest_exports(export_files, workers=args.workers)
+    print(f"✓ Parsed {stats['records']:,} records "
+          f"({stats['stitched']:,} stitched across files, {stats['skipped']:,} skipped)")
+    print(f"✓ {stats['unique']:,} unique datasets after deduplicating on id")
+
+    import pyarrow.parquet as pq
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    print(f"Saving columnar store to {args.output}...")
+    pq.write_table(table, args.output, compression='zstd')
+    print(f"✓ Saved ({args.output.stat().st_size:,} bytes)")
+
+    print("Parsing monthly reuse/follower metrics...")
+    metrics = parse_monthly_metrics(table)
+    save_monthly_metrics(metrics, args.metrics_output)
+    print(f"✓ Saved {len(metrics['ids']):,} x {len(metrics['months'])} month matrices "
+          f"to {args.metrics_output.name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Link i-Lab laureate companies to the French Tech 40/120 list
+Fuzzy entity resolution on normalized company names and website domains,
+with blocking so it scales to full company registries
+"""
+
+import argparse
+import re
+import unicodedata
+from pathlib import Path
+
+from process_ilab import detect_delimiter
+
+# Tokens that say what kind of company it is, not which one
+NAME_STOPWORDS = frozenset("""
+    sa sas sasu sarl eurl sci snc scop sca scs gie se sem spa inc ltd llc gmbh bv
+    societe ste cie group groupe holding france the and et de la le les des du
+""".split())
+
+# Hosts shared by unrelated companies (social profiles, site builders, ISPs)
+GENERIC_HOSTS = frozenset("""
+    linkedin.com facebook.com twitter.com x.com instagram.com youtube.com google.com
+    wixsite.com wordpress.com blogspot.com github.io medium.com notion.site webflow.io
+    free.fr orange.fr wanadoo.fr gmail.com societe.com pagesjaunes.fr
+    welcometothejungle.com
+""".split())
+
+# Second-level labels under which the registrable domain has three labels
+SECOND_LEVEL_LABELS = frozenset(['co', 'com', 'gouv', 'asso', 'org', 'net', 'ac'])
+
+# Character trigrams of [a-z0-9] names, padded with one space on each side
+TRIGRAM_ALPHABET = ' abcdefghijklmnopqrstuvwxyz0123456789'
+TRIGRAM_BASE = len(TRIGRAM_ALPHABET)
+TRIGRAM_COUNT = TRIGRAM_BASE ** 3
+
+MAX_BLOCK_PAIRS = 10_000  # blocks larger than this are too common to say anything (recall trade-off, see candidate_pairs)
+PAIR_CHUNK_SIZE = 1_000_000  # candidate pairs scored per batch
+DEFAULT_THRESHOLD = 0.5
+
+def fold(text):
+    """Lower-case ASCII form of a name ("Société Générale" -> "societe generale")"""
+    text = text.lower().replace('œ', 'oe').replace('æ', 'ae')
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+def name_key(name):
+    """
+    Comparable form of a company name: folded, legal forms and filler
+    words dropped, spaces removed ("Back Market SAS" -> "backmarket").
+    """
+    if not isinstance(name, str):
+        return ''
+    tokens = re.findall(r'[a-z0-9]+', fold(name))
+    kept = [token for token in tokens if token not in NAME_STOPWORDS]
+    return ''.join(kept or tokens)
+
+def domain_host(url):
+    """Registrable domain of a website ("https://fr.ankorstore.com/x" -> "ankorstore.com")"""
+    if not isinstance(url, str):
+        return ''
+    host = re.sub(r'^[a-z][a-z0-9+.-]*://', '', url.strip().lower())
+    host = re.split(r'[/?#:]', host, maxsplit=1)[0].strip('.')
+    labels = [label for label in host.split('.') if label]
+    if len(labels) < 2:
+        return ''
+    keep = 3 if len(labels) >= 3 and labels[-2] in SECOND_LEVEL_LABELS and len(labels[-1]) == 2 else 2
+    host = '.'.join(labels[-keep:])
+    return '' if host in GENERIC_HOSTS else host
+
+def trigram_sets(keys):
+    """
+    Distinct character trigram ids of every key, in CSR form: the trigrams
+    of key i are grams[indptr[i]:indptr[i+1]], ascending. Computed for all
+    keys at once over one concatenated byte buffer.
+    """
+    import numpy as np
+
+    padded = [f' {key} ' for key in keys]
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+    codes_of_bytes = np.zeros(256, dtype=np.int64)
+    for code, char in enumerate(TRIGRAM_ALPHABET):
+        codes_of_bytes[ord(char)] = code
+    codes = codes_of_bytes[np.frombuffer(''.join(padded).encode('ascii'), dtype=np.uint8)]
+
+    # A trigram starts at every position that leaves two more characters in its key
+    gram_counts = np.maximum(lengths - 2, 0)
+    owners = np.repeat(np.arange(len(keys)), gram_counts)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(keys) else np.zeros(0, dtype=np.int64)
+    first_gram = np.concatenate([[0], np.cumsum(gram_counts)[:-1]]) if len(keys) else starts
+    positions = starts[owners] + np.arange(len(owners)) - first_gram[owners]
+    grams = (codes[positions] * TRIGRAM_BASE + codes[positions + 1]) * TRIGRAM_BASE + codes[positions + 2]
+
+    # Sorting (owner, gram) pairs groups each key's trigrams and drops repeats
+    pairs = np.unique(owners * TRIGRAM_COUNT + grams)
+    owners, grams = pairs // TRIGRAM_COUNT, pairs % TRIGRAM_COUNT
+    indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=len(keys)), out=indptr[1:])
+    return {'indptr': indptr, 'grams': grams}
+
+def gather(sets, ids):
+    """Concatenated trigrams of the given keys, with the position in ids they belong to"""
+    import numpy as np
+
+    lengths = np.diff(sets['indptr'])[ids]
+    owners = np.repeat(np.arange(len(ids)), lengths)
+    first = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(ids) else lengths
+    positions = sets['indptr'][ids][owners] + np.arange(len(owners)) - first[owners]
+    return owners, sets['grams'][positions]
+
+def prefix_tokens(sets, rank, threshold):
+    """
+    Prefix filter for a Jaccard threshold t: with trigrams ordered rarest
+    first, two sets with Jaccard >= t share at least one trigram among the
+    first |x| - ceil(t * |x|) + 1 of each. Returns (key, trigram) pairs.
+    """
+    import numpy as np
+
+    sizes = np.diff(sets['indptr'])
+    ids = np.arange(len(sizes))
+    owners, grams = gather(sets, ids)
+    order = np.lexsort((rank[grams], owners))
+    owners, grams = owners[order], grams[order]
+    position = np.arange(len(owners)) - sets['indptr'][owners]
+    prefix_length = sizes - np.ceil(threshold * sizes).astype(np.int64) + 1
+    keep = position < prefix_length[owners]
+    return owners[keep], grams[keep]
+
+def candidate_pairs(left_sets, right_sets, left_hosts, right_hosts, threshold):
+    """
+    Candidate (left, right) pairs: same website domain, or a shared trigram
+    in the prefix filter of their names. Never compares all pairs.
+
+    Blocks (a trigram or a domain) that would yield more than
+    MAX_BLOCK_PAIRS pairs are skipped. This trades recall for speed: a pair
+    whose only shared prefix trigram or domain is such a block is missed.
+    Returns the pair ids and the number of skipped blocks and pairs.
+    """
+    import numpy as np
+    import pandas as pd
+
+    # Global trigram order: rarest over both sides first
+    frequency = (np.bincount(left_sets['grams'], minlength=TRIGRAM_COUNT)
+                 + np.bincount(right_sets['grams'], minlength=TRIGRAM_COUNT))
+    rank = np.empty(TRIGRAM_COUNT, dtype=np.int64)
+    rank[np.argsort(frequency, kind='stable')] = np.arange(TRIGRAM_COUNT)
+
+    left_keys, left_grams = prefix_tokens(left_sets, rank, threshold)
+    right_keys, right_grams = prefix_tokens(right_sets, rank, threshold)
+    blocks = [(pd.DataFrame({'block': left_grams, 'left': left_keys}),
+               pd.DataFrame({'block': right_grams, 'right': right_keys}))]
+
+    left_has_host = np.flatnonzero(left_hosts != '')
+    right_has_host = np.flatnonzero(right_hosts != '')
+    blocks.append((pd.DataFrame({'block': left_hosts[left_has_host], 'left': left_has_host}),
+                   pd.DataFrame({'block': right_hosts[right_has_host], 'right': right_has_host})))
+
+    pairs = []
+    skipped = {'blocks': 0, 'pairs': 0}
+    for left_block, right_block in blocks:
+        # Skip blocks whose pair count would approach an all-pairs comparison
+        sizes = (left_block['block'].value_counts()
+                 .mul(right_block['block'].value_counts(), fill_value=0))
+        usable = sizes.index[(sizes > 0) & (sizes <= MAX_BLOCK_PAIRS)]
+        skipped['blocks'] += int((sizes > MAX_BLOCK_PAIRS).sum())
+        skipped['pairs'] += int(sizes[sizes > MAX_BLOCK_PAIRS].sum())
+        joined = left_block[left_block['block'].isin(usable)].merge(
+            right_block[right_block['block'].isin(usable)], on='block')
+        pairs.append(joined['left'].to_numpy(dtype=np.int64) * len(right_hosts)
+                     + joined['right'].to_numpy(dtype=np.int64))
+
+    pairs = np.unique(np.concatenate(pairs))
+    return pairs // max(len(right_hosts), 1), pairs % max(len(right_hosts), 1), skipped
+
+def trigram_jaccard(left_sets, right_sets, left_ids, right_ids):
+    """
+    Jaccard similarity of the trigram sets of each (left, right) pair,
+    vectorized: both sets of every pair are tagged with the pair number and
+    sorted together, and each repeated (pair, trigram) is one shared trigram.
+    """
+    import numpy as np
+
+    similarity = np.zeros(len(left_ids))
+    for start in range(0, len(left_ids), PAIR_CHUNK_SIZE):
+        chunk = slice(start, start + PAIR_CHUNK_SIZE)
+        left_owner, left_grams = gather(left_sets, left_ids[chunk])
+        right_owner, right_grams = gather(right_sets, right_ids[chunk])
+        tagged = np.sort(np.concatenate([left_owner * TRIGRAM_COUNT + left_grams,
+                                         right_owner * TRIGRAM_COUNT + right_grams]))
+        shared = tagged[1:][tagged[1:] == tagged[:-1]] // TRIGRAM_COUNT
+        count = len(left_ids[chunk])
+        intersection = np.bincount(shared, minlength=count)
+        union = (np.diff(left_sets['indptr'])[left_ids[chunk]]
+                 + np.diff(right_sets['indptr'])[right_ids[chunk]] - intersection)
+        similarity[chunk] = np.where(union > 0, intersection / np.maximum(union, 1), 0.0)
+    return similarity
+
+def link_companies(left, right, threshold=DEFAULT_THRESHOLD):
+    """
+    Link the rows of two company tables (each with 'name' and 'website'
+    columns). Returns one row per linked left company: its best right
+    match, the name similarity, whether the domains match and a confidence
+    (name similarity, raised to at least 0.7 by a matching domain), plus
+    the matching statistics.
+    """
+    import numpy as np
+    import pandas as pd
+
+    left_keys = left['name'].map(name_key).tolist()
+    right_keys = right['name'].map(name_key).tolist()
+    left_hosts = left['website'].map(domain_host).to_numpy(dtype=str)
+    right_hosts = right['website'].map(domain_host).to_numpy(dtype=str)
+    left_sets = trigram_sets(left_keys)
+    right_sets = trigram_sets(right_keys)
+
+    left_ids, right_ids, skipped = candidate_pairs(left_sets, right_sets, left_hosts, right_hosts, threshold)
+    similarity = trigram_jaccard(left_sets, right_sets, left_ids, right_ids)
+    same_domain = (left_hosts[left_ids] == right_hosts[right_ids]) & (left_hosts[left_ids] != '')
+    confidence = np.where(same_domain, 0.7 + 0.3 * similarity, similarity)
+
+    links = pd.DataFrame({
+        'left': left_ids,
+        'right': right_ids,
+        'name_similarity': similarity.round(3),
+        'same_domain': same_domain,
+        'confidence': confidence.round(3),
+    })
+    links = links[links['confidence'] >= threshold]
+    links = links.sort_values(['confidence', 'name_similarity'], ascending=False, kind='stable')
+    links = links.drop_duplicates('left').sort_values('left').reset_index(drop=True)
+
+    stats = {
+        'candidates': len(left_ids),
+        'all_pairs': len(left) * len(right),
+        'skipped_blocks': skipped['blocks'],
+        'skipped_pairs': skipped['pairs'],
+        'links': len(links),
+    }
+    return links, stats
+
+def load_french_tech(filepath):
+    """The French Tech 40/120 list as a name/website table (the file has no header)"""
+    import pandas as pd
+
+    with open(filepath, 'r', encoding='utf-8-sig') as f:
+        first_line = f.readline()
+    delimiter = detect_delimiter(first_line)
+    has_header = 'http' not in first_line.lower()
+    return pd.read_csv(filepath, sep=delimiter, encoding='utf-8-sig', dtype=str,
+                       header=0 if has_header else None, names=['name', 'website'])
+
+def load_ilab_companies(filepath):
+    """One row per i-Lab company (name and SIREN), with its website and laureate years"""
+    import pandas as pd
+
+    with open(filepath, 'r', encoding='utf-8-sig') as f:
+        delimiter = detect_delimiter(f.readline())
+    df = pd.read_csv(filepath, sep=delimiter, encoding='utf-8-sig', dtype=str)
+    df = df[df['Libellé entreprise'].notna()]
+
+    companies = (
+        df.assign(key=df['Libellé entreprise'].map(name_key))
+        .groupby(['key', df['N° SIREN'].fillna('')], sort=False)
+        .agg(name=('Libellé entreprise', 'first'),
+             website=('Site web entreprise', 'first'),
+             years=('Année de concours', lambda years: ', '.join(sorted(set(years.dropna())))),
+             laureates=('Libellé entreprise', 'size'))
+        .reset_index()
+        .rename(columns={'N° SIREN': 'siren'})
+    )
+    return companies[['name', 'siren', 'website', 'years', 'laureates']]
+
+def main():
+    """Main matching function"""
+    base_dir = Path(__file__).parent.parent
+    data_dir = base_dir / "data" / "ilab"
+
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--ilab', type=Path, default=data_dir / "ilab_laureats.csv")
+    parser.add_argument('--french-tech', type=Path, default=data_dir / "French Tech 40_120 - 2023.csv")
+    parser.add_argument('--output', type=Path, default=data_dir / "ilab_french_tech_links.csv")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="minimum confidence of a link (0-1)")
+    args = parser.parse_args()
+
+    print("Loading companies...")
+    companies = load_ilab_companies(args.ilab)
+    french_tech = load_french_tech(args.french_tech)
+    print(f"✓ {len(companies):,} i-Lab companies, {len(french_tech):,} French Tech 40/120 companies")
+
+    links, stats = link_companies(companies, french_tech, args.threshold)
+    print(f"✓ Scored {stats['candidates']:,} candidate pairs "
+          f"(instead of {stats['all_pairs']:,} for all pairs)")
+    if stats['skipped_blocks']:
+        print(f"⚠️ Skipped {stats['skipped_blocks']:,} blocks over {MAX_BLOCK_PAIRS:,} pairs "
+              f"({stats['skipped_pairs']:,} pairs): companies sharing only those trigrams or domains are not linked")
+
+    table = companies.iloc[links['left']].reset_index(drop=True).add_prefix('ilab_').join(
+        french_tech.iloc[links['right']].reset_index(drop=True).add_prefix('french_tech_'))
+    table = table.join(links[['name_similarity', 'same_domain', 'confidence']])
+    table = table.sort_values('confidence', ascending=False, kind='stable')
+    table.to_csv(args.output, index=False)
+
+    print(f"✓ {len(table):,} links saved to {args.output}")
+    for row in table.head(10).itertuples():
+        print(f"  {row.confidence:.2f}  {row.ilab_name} -> {row.french_tech_name}")
+
+if __name__ == "__main__":
+    main()
@@ -3,60 +3,90 @@
 Process and analyze i-Lab laureates dataset
 """
 
+import argparse
 import csv
+import hashlib
+import io
 import json
+import os
 from pathlib import Path
 from collections import Counter, defaultdict
 from datetime import datetime
 
+def detect_delimiter(sample):
+    """Guess the CSV delimiter (';' or ',') from a sample of the file"""
+    return ';' if sample.count(';') > sample.count(',') else ','
+
 def load_csv_data(filepath):
     """Load CSV data and return as list of dictionaries"""
     data = []
-    with open(filepath, 'r', encoding='utf-8') as f:
+    # newline='' keeps line breaks inside quoted multi-line fields intact
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
         # Try to detect delimiter
         sample = f.read(1024)
         f.seek(0)
-        delimiter = ';' if sample.count(';') > sample.count(',') else ','
+        delimiter = detect_delimiter(sample)
 
         reader = csv.DictReader(f, delimiter=delimiter)
         for row in reader:
             data.append(row)
     return data
 
-def analyze_data(data):
-    """Perform basic analysis on the dataset"""
-    if not data:
-        return {"error": "No data to analyze"}
+# Analysis sections and the field each one groups by, with how many values to keep
+ANALYSIS_SECTIONS = [
+    ("by_year", None),
+    ("by_region", 20),
+    ("by_category", 20),
+]
 
-    analysis = {
-        "total_records": len(data),
-        "fields": list(data[0].keys()) if data else [],
-        "record_count": len(data)
+def detect_analysis_fields(fields):
+    """Pick the year, region and category fields by matching field names"""
+    year_fields = [f for f in fields if 'year' in f.lower() or 'annee' in f.lower() or 'date' in f.lower()]
+    region_fields = [f for f in fields if 'region' in f.lower() or 'territoire' in f.lower()]
+    category_fields = [f for f in fields if any(term in f.lower() for term in ['categorie', 'category', 'domaine', 'domain', 'secteur'])]
+
+    return {
+        "by_year": year_fields[0] if year_fields else None,
+        "by_region": region_fields[0] if region_fields else None,
+        "by_category": category_fields[0] if category_fields else None,
     }
 
-    # Analyze by year if year field exists
-    year_fields = [f for f in analysis["fields"] if 'year' in f.lower() or 'annee' in f.lower() or 'date' in f.lower()]
-    if year_fields:
-        year_field = year_fields[0]
-        years = [row.get(year_field, 'Unknown') for row in data]
-        analysis["by_year"] = dict(Counter(years).most_common())
-
-    # Analyze by region if region field exists
-    region_fields = [f for f in analysis["fields"] if 'region' in f.lower() or 'territoire' in f.lower()]
-    if region_fields:
-        region_field = region_fields[0]
-        regions = [row.get(region_field, 'Unknown') for row in data]
-        analysis["by_region"] = dict(Counter(regions).most_common(20))
-
-    # Analyze by category/domain if such field exists
-    category_fields = [f for f in analysis["fields"] if any(term in f.lower() for term in ['categorie', 'category', 'domaine', 'domain', 'secteur'])]
-    if category_fields:
-        category_field = category_fields[0]
-        categories = [row.get(category_field, 'Unknown') for row in data]
-        analysis["by_category"] = dict(Counter(categories).most_common(20))
+def update_counters(counters, rows, analysis_fields):
+    """
+    Add rows to the per-section value counters. Counters keep first-seen
+    order, so adding rows later gives the same result as counting them all
+    at once. They are plain dicts rather than a dataset_specs aggregate
+    because the manifest carries them over to the next incremental run.
+    """
+    for section, field in analysis_fields.items():
+        if field is None:
+            continue
+        counter = Counter(counters.get(section, {}))
+        counter.update(row.get(field, 'Unknown') for row in rows)
+        counters[section] = dict(counter)
+    return counters
 
+def analysis_from_counters(fields, record_count, counters):
+    """Build the analysis dict from the full value counters"""
+    analysis = {
+        "total_records": record_count,
+        "fields": fields,
+        "record_count": record_count
+    }
+    for section, limit in ANALYSIS_SECTIONS:
+        if section in counters:
+            analysis[section] = dict(Counter(counters[section]).most_common(limit))
     return analysis
 
+def analyze_data(data):
+    """Perform basic analysis on the dataset"""
+    if not data:
+        return {"error": "No data to analyze"}
+
+    fields = list(data[0].keys())
+    counters = update_counters({}, data, detect_analysis_fields(fields))
+    return analysis_from_counters(fields, len(data), counters)
+
 def save_analysis(analysis, output_file):
     """Save analysis results to a text file"""
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -90,8 +120,159 @@ def save_analysis(analysis, output_file):
                 f.write(f"  {category}: {count}\n")
             f.write("\n")
 
+MANIFEST_NAME = "ilab_manifest.json"
+
+def file_sha256(filepath, limit=None):
+    """SHA-256 of a file's content, or of its first limit bytes"""
+    digest = hashlib.sha256()
+    remaining = limit
+    with open(filepath, 'rb') as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(1 << 20 if remaining is None else min(1 << 20, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest.hexdigest()
+
+def row_fingerprint(row):
+    """Short hash of a record's values (independent of quoting and line endings)"""
+    values = '\x1f'.join('' if value is None else str(value) for value in row.values())
+    return hashlib.blake2b(values.encode('utf-8'), digest_size=8).hexdigest()
+
+def load_manifest(manifest_file):
+    """Load the manifest written by the previous run, if any"""
+    if not manifest_file.exists():
+        return None
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_manifest(manifest, manifest_file):
+    """Save content hash, row fingerprints and value counters for the next run"""
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+def load_rows_from_offset(filepath, offset, fields):
+    """Load the records that start at a byte offset (a line boundary) of the CSV"""
+    with open(filepath, 'rb') as raw:
+        delimiter = detect_delimiter(raw.read(1024).decode('utf-8', errors='ignore'))
+        raw.seek(offset)
+        text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        return list(csv.DictReader(text, fieldnames=fields, delimiter=delimiter))
+
+def find_appended_rows(filepath, manifest, size):
+    """
+    Return the records appended to the CSV since the manifest was written,
+    or None if the file changed in any other way (full re-analysis needed).
+    """
+    if filepath.name != manifest['source'] or size <= manifest['size'] or not manifest['record_count']:
+        return None
+
+    # Fast path: the previous content is an unchanged prefix ending on a line break
+    with open(filepath, 'rb') as f:
+        f.seek(manifest['size'] - 1)
+        ends_on_line_break = f.read(1) == b'\n'
+    if ends_on_line_break and file_sha256(filepath, limit=manifest['size']) == manifest['sha256']:
+        return load_rows_from_offset(filepath, manifest['size'], manifest['fields'])
+
+    # Re-exported file: the previous records must come first, unchanged
+    data = load_csv_data(filepath)
+    if not data or list(data[0].keys()) != manifest['fields']:
+        return None
+    previous = manifest['row_fingerprints']
+    if [row_fingerprint(row) for row in data[:len(previous)]] != previous:
+        return None
+    return data[len(previous):]
+
+def append_json_records(output_json, records):
+    """
+    Append records to a JSON array written by json.dump(..., indent=2).
+    The result is byte-identical to dumping the full list again.
+    """
+    if not records:
+        return True
+    with open(output_json, 'r+b') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        f.seek(max(end - 2, 0))
+        if f.read() != b'\n]':
+            return False
+        body = json.dumps(records, ensure_ascii=False, indent=2)[2:-2]
+        f.seek(end - 2)
+        f.write((',\n' + body + '\n]').encode('utf-8'))
+        f.truncate()
+    return True
+
+# Parquet compression codecs offered for the columnar output ('none' disables it)
+PARQUET_COMPRESSIONS = ['zstd', 'snappy', 'gzip', 'none']
+
+def records_to_table(records, fields, schema=None):
+    """
+    Convert row dicts to a column-oriented Arrow table. Field names are
+    stored once, and repetitive text columns are dictionary-encoded. Pass
+    schema to reuse the encoding of an existing file.
+    """
+    import pyarrow as pa
+
+    columns = {}
+    for field in fields:
+        values = pa.array([row.get(field) for row in records], type=pa.string())
+        if schema is not None:
+            values = values.cast(schema.field(field).type)
+        elif len(values) and len(values.unique()) <= len(values) // 2:
+            values = values.dictionary_encode()
+        columns[field] = values
+    return pa.table(columns)
+
+def save_processed_parquet(records, fields, output_file, compression):
+    """Save processed records as a compressed, column-oriented Parquet file"""
+    import pyarrow.parquet as pq
+
+    table = records_to_table(records, fields)
+    pq.write_table(table, output_file, compression=compression)
+
+def append_processed_parquet(records, output_file, compression):
+    """Append records to a Parquet file written by save_processed_parquet"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    existing = pq.read_table(output_file)
+    added = records_to_table(records, existing.schema.names, schema=existing.schema)
+    pq.write_table(pa.concat_tables([existing, added]), output_file, compression=compression)
+    return True
+
+def append_processed(records, output_file, output_format, compression):
+    """Append records to the processed output in place (False if not possible)"""
+    if output_format == 'parquet':
+        return append_processed_parquet(records, output_file, compression)
+    return append_json_records(output_file, records)
+
+def read_processed_columns(input_file, columns=None):
+    """
+    Lazily read a Parquet output one column at a time.
+    Yields (field, values) pairs, and reads only the requested columns.
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(input_file)
+    for field in columns or parquet_file.schema_arrow.names:
+        yield field, parquet_file.read(columns=[field]).column(field).to_pylist()
+
 def main():
     """Main processing function"""
+    parser = argparse.ArgumentParser(description="Process and analyze i-Lab laureates dataset")
+    parser.add_argument('--full', action='store_true',
+                        help="ignore the manifest of the previous run and re-analyze everything")
+    parser.add_argument('--format', choices=['json', 'parquet'], default='json',
+                        help="processed data output: indented JSON (default) or columnar Parquet")
+    parser.add_argument('--compression', choices=PARQUET_COMPRESSIONS, default='zstd',
+                        help="compression codec for --format parquet")
+    args = parser.parse_args()
+
     base_dir = Path(__file__).parent.parent
     data_dir = base_dir / "data" / "ilab"
 
@@ -107,28 +288,81 @@ def main():
     input_file = csv_files[0]
     print(f"📊 Processing: {input_file.name}")
 
-    # Load data
-    print("Loading data...")
-    data = load_csv_data(input_file)
-    print(f"✓ Loaded {len(data)} records")
+    output_data = data_dir / f"ilab_processed.{args.format}"
+    output_analysis = data_dir / "ilab_analysis.txt"
+    manifest_file = data_dir / MANIFEST_NAME
+
+    manifest = None if args.full else load_manifest(manifest_file)
+    outputs_exist = output_data.exists() and output_analysis.exists()
+    if manifest and manifest.get('output') != [output_data.name, args.compression]:
+        # Output format changed since the last run - rewrite it in full
+        outputs_exist = False
+    size = input_file.stat().st_size
+    sha256 = file_sha256(input_file)
 
-    # Analyze
-    print("Analyzing data...")
-    analysis = analyze_data(data)
+    if (manifest and outputs_exist and manifest['source'] == input_file.name
+            and manifest['size'] == size and manifest['sha256'] == sha256):
+        print("✓ Source unchanged since the last run - nothing to do")
+        return
+
+    appended = find_appended_rows(input_file, manifest, size) if manifest and outputs_exist else None
 
-    # Save processed data
-    output_json = data_dir / "ilab_processed.json"
-    print(f"Saving processed data to {output_json.name}...")
-    with open(output_json, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"✓ Saved {len(data)} records to JSON")
+    if appended == []:
+        # Re-exported without new records (e.g. other line endings) - outputs are still current
+        manifest.update(size=size, sha256=sha256)
+        save_manifest(manifest, manifest_file)
+        print("✓ Source re-exported without new records - manifest updated")
+        return
+
+    if appended is not None and append_processed(appended, output_data, args.format, args.compression):
+        # Incremental: only the new records are read and counted
+        print(f"✓ Found {len(appended)} new records since the last run")
+        fields = manifest['fields']
+        record_count = manifest['record_count'] + len(appended)
+        counters = update_counters(manifest['counters'], appended, detect_analysis_fields(fields))
+        fingerprints = manifest['row_fingerprints'] + [row_fingerprint(row) for row in appended]
+        analysis = analysis_from_counters(fields, record_count, counters)
+        print(f"✓ Appended {len(appended)} records to {output_data.name}")
+    else:
+        # Load data
+        print("Loading data...")
+        data = load_csv_data(input_file)
+        print(f"✓ Loaded {len(data)} records")
+
+        # Analyze
+        print("Analyzing data...")
+        fields = list(data[0].keys()) if data else []
+        record_count = len(data)
+        counters = update_counters({}, data, detect_analysis_fields(fields))
+        fingerprints = [row_fingerprint(row) for row in data]
+        analysis = analysis_from_counters(fields, record_count, counters) if data else analyze_data(data)
+
+        # Save processed data
+        print(f"Saving processed data to {output_data.name}...")
+        if args.format == 'parquet':
+            save_processed_parquet(data, fields, output_data, args.compression)
+            print(f"✓ Saved {len(data)} records to Parquet ({output_data.stat().st_size:,} bytes)")
+        else:
+            with open(output_data, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            print(f"✓ Saved {len(data)} records to JSON")
 
     # Save analysis
-    output_analysis = data_dir / "ilab_analysis.txt"
     print(f"Saving analysis to {output_analysis.name}...")
     save_analysis(analysis, output_analysis)
     print(f"✓ Analysis saved")
 
+    save_manifest({
+        "source": input_file.name,
+        "size": size,
+        "sha256": sha256,
+        "output": [output_data.name, args.compression],
+        "fields": fields,
+        "record_count": record_count,
+        "row_fingerprints": fingerprints,
+        "counters": counters,
+    }, manifest_file)
+
     print("\n" + "=" * 80)
     print("Summary:")
     print(f"  Total records: {analysis.get('total_records', 0)}")
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Repeat-laureate graph of the i-Lab competition
+Links every laureate to all their competition years (parsed from "Déjà
+lauréat en") and to the research units and structures of their projects,
+stored as compact adjacency arrays (CSR)
+"""
+
+import argparse
+import re
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+
+NAME_COLUMNS = ['Nom du lauréat', 'Prénom du candidat']
+YEAR_COLUMN = 'Année de concours'
+TYPE_COLUMN = 'Type de candidature'
+PREVIOUS_COLUMN = 'Déjà lauréat en'
+# Lab fields: (id column, label columns in order of preference)
+UNIT_FIELDS = ("Id de l'unité de recherche liée au projet",
+               ["Sigle de l'unité de recherche liée au projet", 'Unité de recherche liée au projet'])
+STRUCTURE_FIELDS = ('Id de la structure liée au projet', ['Structure liée au projet'])
+
+# Candidature stages, in the order a project goes through them
+STAGES = ['en émergence', 'création-développement']
+EMERGENCE, CREATION = 0, 1
+UNKNOWN_STAGE = -1
+
+PREVIOUS_ENTRY = re.compile(r'((?:19|20)\d{2})\s*(?:\(([^)]*)\))?')
+MULTI_VALUE = re.compile(r'\s*[|;]\s*')  # separator of several labs in one cell
+
+GRAPH_ARRAYS = [
+    'row_person', 'part_indptr', 'part_year', 'part_stage', 'part_row',
+    'unit_indptr', 'unit_ids', 'unit_labels', 'structure_indptr', 'structure_ids', 'structure_labels',
+]
+
+def fold(text):
+    """Lower-case ASCII form of a name or label, for matching"""
+    text = unicodedata.normalize('NFKD', str(text).lower()).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+def stage_code(text):
+    """Stage index of a candidature type ('en émergence' -> 0), or UNKNOWN_STAGE"""
+    folded = fold(text) if isinstance(text, str) else ''
+    if 'emergence' in folded:
+        return EMERGENCE
+    if 'creation' in folded or 'developpement' in folded:
+        return CREATION
+    return UNKNOWN_STAGE
+
+def person_keys(df):
+    """
+    Row -> person id; rows with the same folded name and first name are one
+    person. Name columns missing from the export are left out of the key.
+    """
+    import numpy as np
+    import pandas as pd
+
+    name_columns = [col for col in NAME_COLUMNS if col in df.columns]
+    keys = pd.Series('', index=df.index)
+    for col in name_columns:
+        keys = keys + '|' + df[col].fillna('').astype(str).map(fold)
+    # A row without any name is a person of its own
+    keys = keys.where(keys.str.strip('|') != '', pd.Series(np.arange(len(df)), index=df.index).astype(str) + '#')
+    codes, _ = pd.factorize(keys.to_numpy())
+    return codes.astype(np.int32)
+
+def to_csr(owners, values, n_owners):
+    """Sort (owner, value) edges by owner into indptr + values arrays"""
+    import numpy as np
+
+    order = np.argsort(owners, kind='stable')
+    indptr = np.zeros(n_owners + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=n_owners), out=indptr[1:])
+    return indptr, values[order]
+
+def participations(df, row_person):
+    """
+    Participation edges (person, year, stage, row): each row's own
+    competition, plus the earlier ones listed in "Déjà lauréat en" (row -1).
+    A participation known from several rows is kept once, from its own row
+    when there is one.
+    """
+    import numpy as np
+    import pandas as pd
+
+    own = pd.DataFrame({
+        'person': row_person,
+        'year': pd.to_numeric(df[YEAR_COLUMN], errors='coerce').to_numpy(),
+        'stage': df[TYPE_COLUMN].map(stage_code).to_numpy() if TYPE_COLUMN in df else UNKNOWN_STAGE,
+        'row': np.arange(len(df)),
+    })
+
+    previous = df[PREVIOUS_COLUMN].fillna('').astype(str) if PREVIOUS_COLUMN in df else pd.Series('', index=df.index)
+    entries = previous.reset_index(drop=True).str.extractall(PREVIOUS_ENTRY)
+    listed = pd.DataFrame({
+        'person': row_person[entries.index.get_level_values(0)],
+        'year': pd.to_numeric(entries[0]).to_numpy(),
+        'stage': entries[1].map(stage_code).to_numpy(),
+        'row': -1,
+    })
+
+    edges = pd.concat([own, listed], ignore_index=True).dropna(subset=['year'])
+    edges = edges.sort_values(['person', 'year', 'stage', 'row'], ascending=[True, True, True, False])
+    return edges.drop_duplicates(['person', 'year', 'stage'])
+
+def split_values(cell):
+    """The labs listed in one cell"""
+    return [value for value in MULTI_VALUE.split(cell.strip()) if value]
+
+def lab_edges(df, row_person, id_column, label_columns):
+    """
+    Distinct (person, lab) edges of one lab field and the label of each
+    lab. Labs are keyed by their id, or by their folded label when the id
+    is missing; several labs in one cell are paired up in order.
+    """
+    import numpy as np
+    import pandas as pd
+
+    label_columns = [col for col in label_columns if col in df.columns]
+    ids = df[id_column].fillna('').astype(str) if id_column in df else pd.Series('', index=df.index)
+    labels = pd.Series('', index=df.index)
+    for col in reversed(label_columns):
+        labels = df[col].fillna('').astype(str).where(lambda values: values.str.strip() != '', labels)
+
+    owners, keys, names = [], [], []
+    for person, ident, label in zip(row_person, ids, labels):
+        row_names = split_values(label)
+        row_keys = split_values(ident) or [fold(name) for name in row_names]
+        if len(row_names) != len(row_keys):
+            row_names = row_keys
+        owners.extend([person] * len(row_keys))
+        keys.extend(row_keys)
+        names.extend(row_names)
+
+    edges = pd.DataFrame({'person': np.array(owners, dtype=np.int32), 'key': keys, 'label': names})
+    edges['lab'], _ = pd.factorize(edges['key'])
+    lab_labels = edges.drop_duplicates('lab')['label'].to_numpy(dtype=str)
+    edges = edges.drop_duplicates(['person', 'lab'])
+    return edges['person'].to_numpy(np.int32), edges['lab'].to_numpy(np.int32), lab_labels
+
+def build_repeat_graph(df):
+    """The person -> participations and person -> labs adjacency arrays of a laureate table"""
+    import numpy as np
+
+    row_person = person_keys(df)
+    n_persons = int(row_person.max()) + 1 if len(row_person) else 0
+
+    edges = participations(df, row_person)
+    person = edges['person'].to_numpy(np.int32)
+    part_indptr, order = to_csr(person, np.arange(len(edges)), n_persons)
+    graph = {
+        'row_person': row_person,
+        'part_indptr': part_indptr,
+        'part_year': edges['year'].to_numpy(np.int16)[order],
+        'part_stage': edges['stage'].to_numpy(np.int8)[order],
+        'part_row': edges['row'].to_numpy(np.int32)[order],
+    }
+
+    for name, (id_column, label_columns) in (('unit', UNIT_FIELDS), ('structure', STRUCTURE_FIELDS)):
+        owners, labs, labels = lab_edges(df, row_person, id_column, label_columns)
+        graph[f'{name}_indptr'], graph[f'{name}_ids'] = to_csr(owners, labs, n_persons)
+        graph[f'{name}_labels'] = labels
+    return graph
+
+def save_repeat_graph(graph, path, signature):
+    """Write the graph as one .npz archive, tagged with its source signature"""
+    import numpy as np
+
+    tmp_path = path.with_suffix('.tmp.npz')
+    np.savez(tmp_path, signature=signature, **graph)
+    tmp_path.replace(path)
+
+def read_repeat_graph(path, signature=None):
+    """Load a saved graph, or None when it is missing, unreadable or built from another source"""
+    import numpy as np
+
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as archive:
+            if signature is not None and not np.array_equal(archive['signature'], signature):
+                return None
+            return {name: archive[name] for name in GRAPH_ARRAYS}
+    except (OSError, KeyError, ValueError):
+        return None
+
+def participation_path(graph, person):
+    """Competition path of one person: (year, stage name, row or -1) in year order"""
+    start, end = graph['part_indptr'][person], graph['part_indptr'][person + 1]
+    return [(int(year), STAGES[stage] if stage >= 0 else None, int(row))
+            for year, stage, row in zip(graph['part_year'][start:end], graph['part_stage'][start:end],
+                                        graph['part_row'][start:end])]
+
+def persons_of_rows(graph, row_ids):
+    """Distinct persons of the given rows"""
+    import numpy as np
+
+    return np.unique(graph['row_person'][row_ids])
+
+def person_stats(graph):
+    """
+    Per person: number of participations, first Émergence year and last
+    Création-développement year (0 when none), from reductions over the
+    CSR segments.
+    """
+    import numpy as np
+
+    indptr = graph['part_indptr']
+    counts = np.diff(indptr)
+    person = np.repeat(np.arange(len(counts)), counts)
+    years = graph['part_year'].astype(np.int64)
+    stages = graph['part_stage']
+
+    first_emergence = np.full(len(counts), np.iinfo(np.int64).max)
+    np.minimum.at(first_emergence, person[stages == EMERGENCE], years[stages == EMERGENCE])
+    last_creation = np.zeros(len(counts), dtype=np.int64)
+    np.maximum.at(last_creation, person[stages == CREATION], years[stages == CREATION])
+    first_emergence[first_emergence == np.iinfo(np.int64).max] = 0
+    return counts, first_emergence, last_creation
+
+def conversion_by_cohort(graph, persons=None):
+    """
+    Émergence laureates per first Émergence year, and how many of them were
+    later laureates in Création-développement.
+    """
+    import numpy as np
+    import pandas as pd
+
+    counts, first_emergence, last_creation = person_stats(graph)
+    if persons is None:
+        persons = np.arange(len(counts))
+    first_emergence, last_creation = first_emergence[persons], last_creation[persons]
+
+    emerged = first_emergence > 0
+    converted = emerged & (last_creation >= first_emergence)
+    cohorts = pd.DataFrame({'year': first_emergence[emerged], 'converted': converted[emerged]})
+    table = cohorts.groupby('year')['converted'].agg(emergence='size', converted='sum').reset_index()
+    table['rate'] = table['converted'] / table['emergence']
+    return table
+
+def repeat_labs(graph, kind='unit', persons=None, min_laureates=1):
+    """
+    Laureates and repeat laureates (two or more participations) linked to
+    each lab of a kind ('unit' or 'structure'), most repeat laureates first.
+    """
+    import numpy as np
+    import pandas as pd
+
+    counts = np.diff(graph['part_indptr'])
+    indptr, labs, labels = graph[f'{kind}_indptr'], graph[f'{kind}_ids'], graph[f'{kind}_labels']
+    selected = np.ones(len(counts), dtype=bool)
+    if persons is not None:
+        selected = np.zeros(len(counts), dtype=bool)
+        selected[persons] = True
+
+    owners = np.repeat(np.arange(len(counts)), np.diff(indptr))
+    keep = selected[owners]
+    laureates = np.bincount(labs[keep], minlength=len(labels))
+    repeats = np.bincount(labs[keep & (counts[owners] > 1)], minlength=len(labels))
+
+    table = pd.DataFrame({'lab': labels, 'laureates': laureates, 'repeat_laureates': repeats})
+    table = table[table['laureates'] >= min_laureates]
+    table['repeat_share'] = table['repeat_laureates'] / table['laureates']
+    return table.sort_values(['repeat_laureates', 'laureates'], ascending=False, kind='stable').reset_index(drop=True)
+
+def generate_report(graph, output_file, top=20):
+    """Write conversion by cohort and the labs with the most repeat laureates as a text report"""
+    counts, _, _ = person_stats(graph)
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 100 + "\n")
+        f.write("I-LAB LAUREATES - REPEAT PARTICIPATION\n")
+        f.write("=" * 100 + "\n\n")
+        f.write(f"Generated: {datetime.now().isoformat()}\n")
+        f.write(f"Laureates: {len(counts):,} ({len(graph['row_person']):,} rows)\n")
+        f.write(f"Repeat laureates (2+ competitions): {int((counts > 1).sum()):,}\n\n")
+
+        f.write("ÉMERGENCE → CRÉATION-DÉVELOPPEMENT CONVERSION BY COHORT\n")
+        f.write("-" * 100 + "\n")
+        conversion = conversion_by_cohort(graph)
+        for row in conversion.itertuples(index=False):
+            f.write(f"{row.year}: {row.converted:4,} of {row.emergence:4,} ({row.rate:5.1%}) {'█' * int(row.rate * 50)}\n")
+        total = conversion[['emergence', 'converted']].sum()
+        if total['emergence']:
+            f.write(f"Total: {total['converted']:,} of {total['emergence']:,} "
+                    f"({total['converted'] / total['emergence']:.1%})\n")
+
+        for title, kind in (("RESEARCH UNITS", 'unit'), ("STRUCTURES", 'structure')):
+            f.write(f"\n\n{title} WITH THE MOST REPEAT LAUREATES (Top {top})\n")
+            f.write("-" * 100 + "\n")
+            for i, row in enumerate(repeat_labs(graph, kind).head(top).itertuples(index=False), 1):
+                f.write(f"{i:2d}. {row.lab[:60]:60s}: {row.repeat_laureates:4,} of {row.laureates:4,} "
+                        f"({row.repeat_share:5.1%})\n")
+
+        f.write("\n" + "=" * 100 + "\n")
+        f.write("END OF REPORT\n")
+        f.write("=" * 100 + "\n")
+
+def main():
+    """Main repeat-laureate graph function"""
+    import numpy as np
+    import pandas as pd
+
+    base_dir = Path(__file__).parent.parent
+    data_dir = base_dir / "data" / "ilab"
+
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--input', type=Path, default=data_dir / "ilab_laureats.csv")
+    parser.add_argument('--graph', type=Path, default=data_dir / "ilab_repeat_graph.npz")
+    parser.add_argument('--output', type=Path, default=data_dir / "ilab_repeat_report.txt")
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"❌ File not found: {args.input}")
+        return
+
+    print(f"📊 Building the repeat-laureate graph: {args.input.name}")
+    df = pd.read_csv(args.input, sep=';', encoding='utf-8-sig', dtype=str)
+    graph = build_repeat_graph(df)
+    stat = args.input.stat()
+    save_repeat_graph(graph, args.graph, np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64))
+    print(f"✓ {len(graph['part_indptr']) - 1:,} laureates, {len(graph['part_year']):,} participations, "
+          f"{len(graph['unit_labels']):,} units, {len(graph['structure_labels']):,} structures -> {args.graph.name}")
+
+    generate_report(graph, args.output)
+    print(f"✓ Report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -12,374 +12,580 @@ Deploy to Streamlit Cloud:
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import gzip
+import io
 import json
-from pathlib import Path
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
-
-# Page config
-st.set_page_config(
-    page_title="i-Lab Laureates Dashboard",
-    page_icon="🚀",
-    layout="wide",
-    initial_sidebar_state="expanded"
+from functools import partial
+
+# Loading, indexes, aggregation and figures live in ilab_data, which the
+# build scripts share; this module adds the caching and the page itself
+from ilab_data import (
+    DATA_DIR, LANDING_SNAPSHOT, LAUREATES_CACHE, LAUREATES_CSV, MAP_DETAIL_LEVELS, REGION_COLUMN,
+    SEARCH_INDEX, YEAR_COLUMN, build_count_cube, build_filter_index, build_search_index,
+    default_map_detail, figure_cache_key, file_signature, filter_signature, geocode_rows,
+    landing_filters, laureate_search_texts, load_detail_rows, load_laureates, map_frame,
+    read_search_index, render_map, render_overview, save_search_index, search_index, search_terms,
+    select_rows, source_digest,
 )
+from ilab_data import load_geocode_index as read_geocode_index
+from ilab_data import render_landing as render_landing_view
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        background: linear-gradient(135deg, #0055A4 0%, #EF4135 100%);
-        padding: 2rem;
-        border-radius: 10px;
-        color: white;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .metric-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 8px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        text-align: center;
-    }
-    .metric-value {
-        font-size: 2.5em;
-        font-weight: bold;
-        color: #0055A4;
-    }
-    .metric-label {
-        color: #666;
-        font-size: 0.9em;
-        text-transform: uppercase;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-@st.cache_data
-def load_data():
-    """Load CSV data - downloads from GitHub if not present"""
-    import urllib.request
-
-    # Define paths
-    data_dir = Path(__file__).parent / "data" / "ilab"
-    csv_path = data_dir / "ilab_laureats.csv"
+@st.cache_resource
+def load_problems():
+    """
+    Problems the loaders met, waiting for show_problems. Loaders may run in
+    the warm-up thread, which has no page to write to.
+    """
+    return {'messages': [], 'lock': threading.Lock()}
+
+def report_problem(message):
+    """Queue a warning for the next script run to display"""
+    problems = load_problems()
+    with problems['lock']:
+        problems['messages'].append(message)
+
+def show_problems():
+    """Display (once) the problems reported since the last run"""
+    problems = load_problems()
+    with problems['lock']:
+        messages, problems['messages'] = problems['messages'], []
+    for message in messages:
+        st.warning(f"⚠️ {message}")
+
+# Remote files the dashboard runs on. Each asset's manifest (URL, size,
+# sha256, ETag/Last-Modified, last check) is the .meta.json sidecar that
+# download_ilab.fetch keeps next to the file.
+ASSETS = {
+    'laureates_csv': {
+        'url': 'https://raw.githubusercontent.com/chobrien99-svg/Laur-ats-I-LAB/main/fr-esr-laureats-concours-national-i-lab.csv',
+        'path': LAUREATES_CSV,
+        'sha256': None,  # not published upstream; set it to pin a release
+        'ttl': 24 * 3600,
+    },
+}
+MIN_ASSET_SIZE = 1000  # Expect at least 1KB for a valid file
+ASSET_REFRESH_INTERVAL = 15 * 60  # how often the refresher looks for expired assets
+
+@contextmanager
+def asset_lock(path):
+    """
+    Exclusive lock on an asset, shared by every worker process, so only one
+    of them downloads it. Without fcntl (Windows) there is no lock.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
 
-    # Create directory if needed
-    data_dir.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + '.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
-    # Download if file doesn't exist or is too small (corrupt/empty)
-    min_file_size = 1000  # Expect at least 1KB for valid CSV
-    needs_download = not csv_path.exists() or (csv_path.exists() and csv_path.stat().st_size < min_file_size)
+def asset_ready(name):
+    """Whether an asset is on disk (downloads are renamed into place whole)"""
+    path = ASSETS[name]['path']
+    return path.exists() and path.stat().st_size >= MIN_ASSET_SIZE
 
-    if needs_download:
-        url = 'https://raw.githubusercontent.com/chobrien99-svg/Laur-ats-I-LAB/main/fr-esr-laureats-concours-national-i-lab.csv'
-        st.info(f"⬇️ Downloading data from GitHub (one-time, ~4MB)...")
-        try:
-            urllib.request.urlretrieve(url, csv_path)
+def asset_expired(name):
+    """Whether an asset's TTL has passed since the server was last checked"""
+    from download_ilab import load_meta, meta_path
 
-            # Verify download was successful
-            if not csv_path.exists():
-                raise FileNotFoundError("Download completed but file not found")
+    meta = load_meta(meta_path(ASSETS[name]['path'])) or {}
+    return time.time() - meta.get('checked_at', 0) > ASSETS[name]['ttl']
 
-            file_size = csv_path.stat().st_size
-            if file_size < min_file_size:
-                raise ValueError(f"Downloaded file too small: {file_size} bytes (expected > {min_file_size})")
+def ensure_asset(name, refresh=False):
+    """
+    Download an asset if it is missing - or, with refresh, revalidate it
+    once its TTL has expired (a conditional request, usually a 304).
+    Returns True when a new version was written.
+    """
+    from download_ilab import fetch
+
+    asset = ASSETS[name]
+    if asset_ready(name) and not (refresh and asset_expired(name)):
+        return False
+
+    asset['path'].parent.mkdir(parents=True, exist_ok=True)
+    with asset_lock(asset['path']):
+        # Another worker may have fetched it while this one waited
+        if asset_ready(name) and not (refresh and asset_expired(name)):
+            return False
+        return fetch([asset['url']], asset['path'], asset['sha256']) == 'downloaded'
+
+def clear_asset_caches(name):
+    """Drop everything derived from an asset after a new version arrived"""
+    if name == 'laureates_csv':
+        for cached in (load_data, load_filter_index, load_count_cube, load_geocoded_rows,
+                       load_figure_cache, load_map_frame, load_landing_snapshot, load_search_index,
+                       load_repeat_graph, load_survival_data):
+            cached.clear()
+
+def refresh_assets():
+    """Background loop revalidating expired assets, without blocking sessions"""
+    while True:
+        time.sleep(ASSET_REFRESH_INTERVAL)
+        for name in ASSETS:
+            try:
+                if ensure_asset(name, refresh=True):
+                    clear_asset_caches(name)
+            except Exception as e:
+                # Keep serving the current file; try again next round
+                print(f"⚠️ Could not refresh {name}: {e}")
+
+@st.cache_resource
+def start_asset_refresh():
+    """Start the background refresher, once per process"""
+    thread = threading.Thread(target=refresh_assets, name='asset-refresh', daemon=True)
+    thread.start()
+    return thread
+
+def require_asset(name, message):
+    """
+    Make sure one asset is on disk, downloading only that asset (reported
+    in the page). An asset already on disk is served as is; the background
+    refresher revalidates it once its TTL has expired.
+    """
+    start_asset_refresh()
+    if asset_ready(name):
+        return
 
-            st.success(f"✅ Downloaded successfully! ({file_size:,} bytes)")
-        except Exception as e:
-            st.error(f"❌ Download failed: {e}")
-            st.error(f"Please check: {url}")
-            # Clean up failed download
-            if csv_path.exists():
-                csv_path.unlink()
-            raise
-
-    # Load the CSV
+    url = ASSETS[name]['url']
+    st.info(message)
     try:
-        # Try UTF-8 with BOM
-        df = pd.read_csv(csv_path, delimiter=';', encoding='utf-8-sig')
+        ensure_asset(name)
+        st.success(f"✅ Downloaded successfully! ({ASSETS[name]['path'].stat().st_size:,} bytes)")
     except Exception as e:
-        try:
-            # Fallback to regular UTF-8
-            df = pd.read_csv(csv_path, delimiter=';', encoding='utf-8')
-        except Exception as e2:
-            st.error(f"Failed to parse CSV: {e2}")
-            st.error(f"File size: {csv_path.stat().st_size if csv_path.exists() else 'N/A'} bytes")
-            # Clean up invalid file so it will be re-downloaded next time
-            if csv_path.exists():
-                csv_path.unlink()
-            st.cache_data.clear()  # Clear cache to force re-download
-            raise
-
-    # Validate we got data
-    if df is None or df.empty:
-        st.error("CSV loaded but contains no data")
-        if csv_path.exists():
-            csv_path.unlink()
-        raise ValueError("CSV file is empty")
-
-    return df
-
-def get_region_coordinates():
+        st.error(f"❌ Download failed: {e}")
+        st.error(f"Please check: {url}")
+        raise
+
+@st.cache_resource
+def load_data():
     """
-    Returns a dictionary mapping French region names to approximate center coordinates.
-    Includes both current regions (post-2016) and historical regions.
+    Load CSV data - downloads from GitHub if not present, then serves the
+    CORE_COLUMNS of a columnar cache. The frame is shared by all sessions.
     """
-    return {
-        # Current French regions (post-2016)
-        'Auvergne-Rhône-Alpes': (45.4471, 4.3852),
-        'Bourgogne-Franche-Comté': (47.2805, 4.9994),
-        'Bretagne': (48.2020, -2.9326),
-        'Centre-Val de Loire': (47.7516, 1.6751),
-        'Corse': (42.0396, 9.0129),
-        'Grand Est': (48.7000, 6.1878),
-        'Hauts-de-France': (50.4801, 2.7937),
-        'Île-de-France': (48.8499, 2.6370),
-        'Normandie': (49.1829, -0.3707),
-        'Nouvelle-Aquitaine': (45.7104, 0.6229),
-        'Occitanie': (43.8927, 3.2827),
-        'Pays de la Loire': (47.7633, -0.3299),
-        "Provence-Alpes-Côte d'Azur": (43.9352, 6.0679),
-
-        # Historical regions (pre-2016) - for backward compatibility
-        'Alsace': (48.3181, 7.4416),
-        'Aquitaine': (44.7000, -0.3400),
-        'Auvergne': (45.7772, 3.0870),
-        'Basse-Normandie': (49.0294, -0.3088),
-        'Bourgogne': (47.0500, 4.5000),
-        'Bretagne': (48.2020, -2.9326),
-        'Centre': (47.7516, 1.6751),
-        'Champagne-Ardenne': (48.9566, 4.3635),
-        'Franche-Comté': (47.2378, 6.0241),
-        'Haute-Normandie': (49.4404, 1.0939),
-        'Languedoc-Roussillon': (43.6108, 3.8767),
-        'Limousin': (45.8336, 1.2611),
-        'Lorraine': (48.6800, 6.2000),
-        'Midi-Pyrénées': (43.6045, 1.4442),
-        'Nord-Pas-de-Calais': (50.6292, 3.0573),
-        'Pays de la Loire': (47.7633, -0.3299),
-        'Picardie': (49.6642, 2.5281),
-        'Poitou-Charentes': (46.1667, -0.3333),
-        'Rhône-Alpes': (45.4471, 4.3852),
-
-        # Overseas territories
-        'Guadeloupe': (16.2650, -61.5510),
-        'Martinique': (14.6415, -61.0242),
-        'Guyane': (3.9339, -53.1258),
-        'La Réunion': (-21.1151, 55.5364),
-        'Mayotte': (-12.8275, 45.1662),
-    }
+    require_asset('laureates_csv', "⬇️ Downloading data from GitHub (one-time, ~4MB)...")
+    return load_laureates(ASSETS['laureates_csv']['path'], warn=report_problem)
+
+# Download formats: file extension and MIME type
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+EXPORT_CHUNK_ROWS = 10_000
+
+def iter_detail_chunks(row_ids, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    All columns of the given rows as Arrow tables of at most chunk_rows rows.
+    An empty selection still yields one empty table, so exports keep a header.
+    """
+    import pyarrow as pa
 
-@st.cache_data
-def load_geojson():
-    """Load GeoJSON data - downloads from GitHub if not present"""
-    import urllib.request
+    cache_path = LAUREATES_CACHE
+    if not cache_path.exists():
+        # No cache (it could not be written) - fall back to the source CSV
+        yield pa.Table.from_pandas(load_detail_rows(row_ids), preserve_index=False)
+        return
 
-    # Define paths
-    data_dir = Path(__file__).parent / "data" / "ilab"
-    geojson_path = data_dir / "ilab_laureats.geojson"
+    with pa.memory_map(str(cache_path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+        for start in range(0, max(len(row_ids), 1), chunk_rows):
+            chunk_ids = pa.array(row_ids[start:start + chunk_rows], type=pa.int64())
+            yield table.take(chunk_ids)
 
-    # Create directory if needed
-    data_dir.mkdir(parents=True, exist_ok=True)
+def export_rows(row_ids, export_format):
+    """
+    Export every column of the selected rows (run only when downloaded).
+    The file is written chunk by chunk, so the rows are never held as one
+    DataFrame or CSV string.
+    """
+    buffer = io.BytesIO()
+
+    if export_format == 'Parquet':
+        import pyarrow.parquet as pq
+
+        writer = None
+        for chunk in iter_detail_chunks(row_ids):
+            if writer is None:
+                writer = pq.ParquetWriter(buffer, chunk.schema, compression='zstd')
+            writer.write_table(chunk)
+        writer.close()
+    else:
+        raw = gzip.GzipFile(fileobj=buffer, mode='wb') if export_format == 'CSV (gzip)' else buffer
+        text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        for i, chunk in enumerate(iter_detail_chunks(row_ids)):
+            chunk.to_pandas().to_csv(text, header=(i == 0), index=False)
+        text.flush()
+        text.detach()
+        if raw is not buffer:
+            raw.close()
+
+    buffer.seek(0)
+    return buffer
+
+@st.cache_resource
+def load_filter_index():
+    """Build the filter index once per process, next to the cached DataFrame"""
+    return build_filter_index(load_data())
+
+@st.cache_resource
+def load_search_index():
+    """
+    The laureate search index, rebuilt only when the source CSV changed
+    (the build script writes the same file ahead of time).
+    """
+    signature = file_signature(ASSETS['laureates_csv']['path'])
 
-    # Download if file doesn't exist or is too small (corrupt/empty)
-    min_file_size = 1000  # Expect at least 1KB for valid GeoJSON
-    needs_download = not geojson_path.exists() or (geojson_path.exists() and geojson_path.stat().st_size < min_file_size)
+    index = read_search_index(SEARCH_INDEX, signature)
+    if index is not None:
+        return index
 
-    if needs_download:
-        url = 'https://raw.githubusercontent.com/chobrien99-svg/Laur-ats-I-LAB/main/fr-esr-laureats-concours-national-i-lab.geojson'
-        st.info(f"⬇️ Downloading map data from GitHub (one-time, ~6MB)...")
-        try:
-            urllib.request.urlretrieve(url, geojson_path)
+    n_rows = len(load_data())
+    index = build_search_index(laureate_search_texts(load_detail_rows(np.arange(n_rows))))
+    try:
+        save_search_index(index, SEARCH_INDEX, signature)
+    except OSError as e:
+        report_problem(f"Could not write search index: {e}")
+    return index
+
+@st.cache_resource
+def load_count_cube():
+    """Build the count cube once per process from load_data() output"""
+    return build_count_cube(load_data())
+
+@st.cache_resource
+def load_geocode_index():
+    """The geocoding index, once per process (None without a bundled reference file)"""
+    return read_geocode_index(warn=report_problem)
+
+@st.cache_resource
+def load_geocoded_rows():
+    """Coordinates for every row, computed once per process"""
+    return geocode_rows(load_data(), index=load_geocode_index())
+
+@st.cache_data(max_entries=32)
+def load_map_frame(signature, _row_ids, detail):
+    """Map markers (points or clusters) for one filter state and detail level"""
+    lat, lon = load_geocoded_rows()
+    return map_frame(load_data(), lat, lon, _row_ids, detail)
+
+FIGURE_CACHE_MAX_ENTRIES = 64
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # serialized figure JSON kept in memory
+
+@st.cache_resource
+def load_figure_cache():
+    """Process-wide LRU of rendered dashboard states, shared by all sessions"""
+    return {'entries': OrderedDict(), 'bytes': 0, 'lock': threading.Lock()}
+
+def cached_render(key, render):
+    """
+    Return render() from the figure cache, building and storing it on a
+    miss. render() returns a dict whose 'figures' are figure JSON strings;
+    least recently used entries are evicted past either cache limit.
+    """
+    cache = load_figure_cache()
+    with cache['lock']:
+        entry = cache['entries'].get(key)
+        if entry is not None:
+            cache['entries'].move_to_end(key)
+            return entry[0]
+
+    rendered = render()
+    size = sum(len(spec) for spec in rendered['figures'].values())
+
+    with cache['lock']:
+        if key not in cache['entries'] and size <= FIGURE_CACHE_MAX_BYTES:
+            cache['entries'][key] = (rendered, size)
+            cache['bytes'] += size
+            while (len(cache['entries']) > FIGURE_CACHE_MAX_ENTRIES
+                   or cache['bytes'] > FIGURE_CACHE_MAX_BYTES):
+                _, (_, evicted_size) = cache['entries'].popitem(last=False)
+                cache['bytes'] -= evicted_size
+    return rendered
+
+def show_figure(spec):
+    """Display cached figure JSON (already validated when it was built)"""
+    st.plotly_chart(go.Figure(json.loads(spec), _validate=False), use_container_width=True)
+
+def render_filtered_overview(year_range, selections, row_ids=None):
+    """
+    Metrics and the six count charts for one filter state. With row_ids
+    (a text search is active) they count those rows instead of everyone.
+    """
+    cube_data = load_count_cube() if row_ids is None else build_count_cube(load_data().iloc[row_ids])
+    return render_overview(cube_data, year_range, selections)
+
+def render_filtered_map(signature, row_ids, map_detail):
+    """The map figure for one filter state and detail level"""
+    return render_map(load_map_frame(signature, row_ids, map_detail))
+
+SURVIVAL_SOURCE = DATA_DIR / "ilab_laureats_sirene.csv"
+# "Compare by" choices of the survival tab: None = one curve, 'cohort' = 5-year competition cohorts
+SURVIVAL_GROUPS = {
+    'All laureates': None,
+    'Cohort (5 years)': 'cohort',
+    'Region': REGION_COLUMN,
+    'Technology domain': 'Domaine technologique',
+}
+SURVIVAL_MAX_CURVES = 8  # largest groups drawn; the table lists them all
+
+@st.cache_resource
+def load_survival_data():
+    """
+    Survival time (years) and closure flag of every laureate, aligned with
+    load_data(), from the Sirene-enriched table. None until enrich_sirene.py
+    has been run (or when it was run on another version of the CSV).
+    """
+    if not SURVIVAL_SOURCE.exists():
+        return None
+    from scripts.analyze_survival import SOURCE_DIGEST_COLUMN, load_enriched, survival_times
+
+    enriched = load_enriched(SURVIVAL_SOURCE)
+    # Rows are attached to load_data() by position: only a table built from this exact CSV lines up
+    digest = source_digest(ASSETS['laureates_csv']['path'])
+    if (SOURCE_DIGEST_COLUMN not in enriched or (enriched[SOURCE_DIGEST_COLUMN] != digest).any()
+            or len(enriched) != len(load_data())):
+        return None
+    # Active companies are censored at the stock date enrich_sirene.py recorded
+    durations, events = survival_times(enriched)
+    return {'durations': durations, 'events': events}
+
+def render_survival(row_ids, compare_by):
+    """Kaplan-Meier curves and survival table of the filtered laureates"""
+    from scripts.analyze_survival import HORIZONS, cohort_labels, curve_points, kaplan_meier, survival_table
+
+    survival = load_survival_data()
+    durations = survival['durations'][row_ids]
+    events = survival['events'][row_ids]
+
+    grouping = SURVIVAL_GROUPS[compare_by]
+    groups = None
+    if grouping == 'cohort':
+        groups = cohort_labels(load_data()[YEAR_COLUMN].to_numpy(dtype='float64', na_value=np.nan)[row_ids])
+    elif grouping is not None:
+        groups = load_data()[grouping].to_numpy(dtype=object, na_value=None)[row_ids]
+
+    curves = kaplan_meier(durations, events, groups)
+    if curves.empty:
+        return {'figures': {}, 'table': [], 'companies': 0}
+    table = survival_table(curves).sort_values('companies', ascending=False, kind='stable')
+
+    shown = table['group'].head(SURVIVAL_MAX_CURVES)
+    points = curve_points(curves[curves['group'].isin(shown)])
+    fig_survival = px.line(
+        points,
+        x='time',
+        y='survival',
+        color='group',
+        line_shape='hv',
+        labels={'time': 'Years since company creation', 'survival': 'Still active', 'group': compare_by},
+        title='Company Survival (Kaplan-Meier)'
+    )
+    fig_survival.update_layout(height=450, yaxis_tickformat='.0%', yaxis_range=[0, 1.02])
 
-            # Verify download was successful
-            if not geojson_path.exists():
-                raise FileNotFoundError("Download completed but file not found")
+    table = table.rename(columns={'group': compare_by, 'companies': 'Companies', 'closed': 'Closed',
+                                  'median_years': 'Median (years)'})
+    table = table.rename(columns={f'{horizon}y': f'{horizon}-year' for horizon in HORIZONS})
+    return {
+        'figures': {'survival': fig_survival.to_json()},
+        'table': table.to_dict('records'),
+        'companies': int((~np.isnan(durations)).sum()),
+    }
 
-            file_size = geojson_path.stat().st_size
-            if file_size < min_file_size:
-                raise ValueError(f"Downloaded file too small: {file_size} bytes (expected > {min_file_size})")
+def show_survival(rendered_survival, total_count):
+    """Display the survival curves and table of a rendered survival view"""
+    if not rendered_survival['figures']:
+        st.info("None of the filtered laureates has a company found in Sirene.")
+        return
+
+    st.caption(f"{rendered_survival['companies']:,} of {total_count:,} filtered laureates have a company "
+               "in Sirene. Companies still active are censored at the Sirene extraction date.")
+    show_figure(rendered_survival['figures']['survival'])
+    st.dataframe(
+        pd.DataFrame(rendered_survival['table']),
+        column_config={col: st.column_config.NumberColumn(format="percent")
+                       for col in rendered_survival['table'][0] if col.endswith('-year')},
+        hide_index=True,
+        use_container_width=True
+    )
 
-            st.success(f"✅ Map data downloaded successfully! ({file_size:,} bytes)")
-        except Exception as e:
-            st.error(f"❌ Download failed: {e}")
-            st.error(f"Please check: {url}")
-            # Clean up failed download
-            if geojson_path.exists():
-                geojson_path.unlink()
-            raise
-
-    # Load the GeoJSON
-    try:
-        with open(geojson_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # Validate it's a dictionary with features
-            if not isinstance(data, dict):
-                raise ValueError("GeoJSON is not a valid dictionary")
-            if 'features' not in data:
-                raise ValueError("GeoJSON missing 'features' key")
-            return data
-    except Exception as e:
-        st.error(f"Failed to parse GeoJSON: {e}")
-        # Clean up invalid file so it will be re-downloaded next time
-        if geojson_path.exists():
-            geojson_path.unlink()
-        raise
+REPEAT_GRAPH = DATA_DIR / "ilab_repeat_graph.npz"
+REPEAT_TOP_LABS = 15
 
-def main():
-    # Header
-    st.markdown("""
-    <div class="main-header">
-        <h1>🚀 i-Lab Laureates Dashboard</h1>
-        <p>Concours national d'aide à la création d'entreprises de technologies innovantes</p>
-        <p>Interactive analysis of 3,923 laureates from 1999-2025</p>
-    </div>
-    """, unsafe_allow_html=True)
+@st.cache_resource
+def load_repeat_graph():
+    """
+    The repeat-laureate graph (participations and labs of every laureate as
+    CSR arrays), rebuilt only when the source CSV changed.
+    """
+    from scripts.repeat_laureates import build_repeat_graph, read_repeat_graph, save_repeat_graph
 
-    # Load data
-    with st.spinner("Loading data..."):
-        df = load_data()
+    signature = file_signature(ASSETS['laureates_csv']['path'])
 
-    # Data cleaning
-    year_col = 'Année de concours'
-    region_col = 'Région'
-    domain_col = 'Domaine technologique'
-    gender_col = 'Genre'
-    type_col = 'Type de candidature'
+    graph = read_repeat_graph(REPEAT_GRAPH, signature)
+    if graph is not None:
+        return graph
 
-    # Sidebar filters
-    st.sidebar.header("🔍 Filters")
-
-    # Year range
-    years = sorted([int(y) for y in df[year_col].unique() if pd.notna(y) and str(y).isdigit()])
-    year_range = st.sidebar.slider(
-        "Year Range",
-        min_value=min(years),
-        max_value=max(years),
-        value=(min(years), max(years))
+    graph = build_repeat_graph(load_detail_rows(np.arange(len(load_data()))))
+    try:
+        save_repeat_graph(graph, REPEAT_GRAPH, signature)
+    except OSError as e:
+        report_problem(f"Could not write repeat-laureate graph: {e}")
+    return graph
+
+def render_repeats(row_ids):
+    """Émergence -> Création conversion and repeat-winner labs of the filtered laureates"""
+    from scripts.repeat_laureates import conversion_by_cohort, person_stats, persons_of_rows, repeat_labs
+
+    graph = load_repeat_graph()
+    persons = persons_of_rows(graph, row_ids)
+    counts, _, _ = person_stats(graph)
+    conversion = conversion_by_cohort(graph, persons)
+
+    fig_conversion = px.bar(
+        conversion,
+        x='year',
+        y='rate',
+        hover_data={'emergence': True, 'converted': True},
+        labels={'year': 'First Émergence year', 'rate': 'Later Création-développement laureates',
+                'emergence': 'Émergence laureates', 'converted': 'Converted'},
+        title='Émergence → Création-développement Conversion'
     )
+    fig_conversion.update_layout(height=400, yaxis_tickformat='.0%')
 
-    # Region filter
-    regions = sorted([r for r in df[region_col].unique() if pd.notna(r)])
-    selected_regions = st.sidebar.multiselect(
-        "Regions",
-        options=regions,
-        default=[]
-    )
+    labs = repeat_labs(graph, 'unit', persons).head(REPEAT_TOP_LABS)
+    labs = labs.rename(columns={'lab': 'Research unit', 'laureates': 'Laureates',
+                                'repeat_laureates': 'Repeat laureates', 'repeat_share': 'Repeat share'})
+    return {
+        'figures': {'conversion': fig_conversion.to_json()},
+        'metrics': {
+            'laureates': len(persons),
+            'repeat_laureates': int((counts[persons] > 1).sum()),
+            'emergence': int(conversion['emergence'].sum()),
+            'converted': int(conversion['converted'].sum()),
+        },
+        'labs': labs.to_dict('records'),
+    }
 
-    # Domain filter
-    domains = sorted([d for d in df[domain_col].unique() if pd.notna(d)])
-    selected_domains = st.sidebar.multiselect(
-        "Technology Domains",
-        options=domains,
-        default=[]
-    )
+def show_repeats(rendered_repeats):
+    """Display the repeat-laureate metrics, conversion chart and lab table"""
+    metrics = rendered_repeats['metrics']
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Laureates", f"{metrics['laureates']:,}")
+    with col2:
+        st.metric("Repeat Laureates", f"{metrics['repeat_laureates']:,}")
+    with col3:
+        rate = metrics['converted'] / metrics['emergence'] if metrics['emergence'] else 0
+        st.metric("Émergence → Création", f"{rate:.1%}")
 
-    # Gender filter
-    genders = [g for g in df[gender_col].unique() if pd.notna(g)]
-    selected_genders = st.sidebar.multiselect(
-        "Gender",
-        options=genders,
-        default=genders
-    )
+    show_figure(rendered_repeats['figures']['conversion'])
 
-    # Apply filters
-    filtered_df = df.copy()
-    filtered_df = filtered_df[
-        (filtered_df[year_col].astype(str).str.isdigit()) &
-        (filtered_df[year_col].astype(int) >= year_range[0]) &
-        (filtered_df[year_col].astype(int) <= year_range[1])
-    ]
+    if rendered_repeats['labs']:
+        st.markdown("**Research units with the most repeat laureates**")
+        st.dataframe(
+            pd.DataFrame(rendered_repeats['labs']),
+            column_config={'Repeat share': st.column_config.NumberColumn(format="percent")},
+            hide_index=True,
+            use_container_width=True
+        )
 
-    if selected_regions:
-        filtered_df = filtered_df[filtered_df[region_col].isin(selected_regions)]
+def setup_page():
+    """Page config and custom CSS (the first Streamlit calls of every run)"""
+    # Page config
+    st.set_page_config(
+        page_title="i-Lab Laureates Dashboard",
+        page_icon="🚀",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
 
-    if selected_domains:
-        filtered_df = filtered_df[filtered_df[domain_col].isin(selected_domains)]
+    # Custom CSS
+    st.markdown("""
+    <style>
+        .main-header {
+            background: linear-gradient(135deg, #0055A4 0%, #EF4135 100%);
+            padding: 2rem;
+            border-radius: 10px;
+            color: white;
+            text-align: center;
+            margin-bottom: 2rem;
+        }
+        .metric-card {
+            background: white;
+            padding: 1.5rem;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            text-align: center;
+        }
+        .metric-value {
+            font-size: 2.5em;
+            font-weight: bold;
+            color: #0055A4;
+        }
+        .metric-label {
+            color: #666;
+            font-size: 0.9em;
+            text-transform: uppercase;
+        }
+    </style>
+    """, unsafe_allow_html=True)
 
-    if selected_genders:
-        filtered_df = filtered_df[filtered_df[gender_col].isin(selected_genders)]
+def show_overview(overview):
+    """Display the metrics and count charts of a rendered overview"""
+    metrics = overview['metrics']
+    figures = overview['figures']
+    total_count = metrics['total_count']
 
     # Metrics row
     col1, col2, col3, col4, col5 = st.columns(5)
 
     with col1:
-        st.metric("Total Laureates", f"{len(filtered_df):,}")
+        st.metric("Total Laureates", f"{total_count:,}")
 
     with col2:
-        years_span = year_range[1] - year_range[0] + 1
-        st.metric("Years", years_span)
+        st.metric("Years", metrics['years_span'])
 
     with col3:
-        regions_count = filtered_df[region_col].nunique()
-        st.metric("Regions", regions_count)
+        st.metric("Regions", metrics['regions_count'])
 
     with col4:
-        domains_count = filtered_df[domain_col].nunique()
-        st.metric("Domains", domains_count)
+        st.metric("Domains", metrics['domains_count'])
 
     with col5:
-        avg_per_year = len(filtered_df) / years_span if years_span > 0 else 0
-        st.metric("Avg/Year", f"{avg_per_year:.0f}")
+        st.metric("Avg/Year", f"{metrics['avg_per_year']:.0f}")
 
     st.divider()
 
     # Year trend chart
     st.subheader("📈 Laureates Over Time")
 
-    year_counts = filtered_df.groupby(year_col).size().reset_index(name='count')
-    year_counts[year_col] = year_counts[year_col].astype(int)
-    year_counts = year_counts.sort_values(year_col)
-
-    fig_year = px.line(
-        year_counts,
-        x=year_col,
-        y='count',
-        markers=True,
-        title='Number of Laureates per Year',
-        labels={year_col: 'Year', 'count': 'Number of Laureates'}
-    )
-    fig_year.update_traces(line_color='#0055A4', line_width=3, marker_size=8)
-    fig_year.update_layout(hovermode='x unified', height=400)
-
-    st.plotly_chart(fig_year, use_container_width=True)
+    show_figure(figures['year'])
 
     # Two columns for charts
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("🗺️ Regional Distribution")
-
-        region_counts = filtered_df[region_col].value_counts().head(15)
-
-        fig_region = px.bar(
-            x=region_counts.values[::-1],
-            y=region_counts.index[::-1],
-            orientation='h',
-            title='Top 15 Regions',
-            labels={'x': 'Number of Laureates', 'y': 'Region'}
-        )
-        fig_region.update_traces(marker_color='#0055A4')
-        fig_region.update_layout(height=500)
-
-        st.plotly_chart(fig_region, use_container_width=True)
+        show_figure(figures['region'])
 
     with col2:
         st.subheader("⚡ Technology Domains")
-
-        domain_counts = filtered_df[domain_col].value_counts().head(10)
-
-        fig_domain = px.pie(
-            values=domain_counts.values,
-            names=domain_counts.index,
-            title='Top 10 Technology Domains',
-            hole=0.4
-        )
-        fig_domain.update_layout(height=500)
-
-        st.plotly_chart(fig_domain, use_container_width=True)
+        show_figure(figures['domain'])
 
     st.divider()
 
@@ -389,42 +595,24 @@ def main():
     with col1:
         st.subheader("👥 Gender Distribution")
 
-        gender_counts = filtered_df[gender_col].value_counts()
-
-        fig_gender = go.Figure(data=[go.Pie(
-            labels=gender_counts.index,
-            values=gender_counts.values,
-            hole=0.4,
-            marker=dict(colors=['#0055A4', '#EF4135'])
-        )])
-        fig_gender.update_layout(height=400)
-
-        st.plotly_chart(fig_gender, use_container_width=True)
+        show_figure(figures['gender'])
 
         # Calculate percentages
-        total = gender_counts.sum()
-        for gender, count in gender_counts.items():
+        gender_counts = overview['gender_counts']
+        total = sum(count for _, count in gender_counts)
+        for gender, count in gender_counts:
             pct = (count / total * 100) if total > 0 else 0
             st.metric(f"{gender}", f"{count:,}", f"{pct:.1f}%")
 
     with col2:
         st.subheader("📋 Candidature Type")
 
-        type_counts = filtered_df[type_col].value_counts()
-
-        fig_type = go.Figure(data=[go.Pie(
-            labels=type_counts.index,
-            values=type_counts.values,
-            hole=0.4,
-            marker=dict(colors=['#0055A4', '#EF4135', '#FFD700'])
-        )])
-        fig_type.update_layout(height=400)
-
-        st.plotly_chart(fig_type, use_container_width=True)
+        show_figure(figures['type'])
 
         # Calculate percentages
-        total = type_counts.sum()
-        for ctype, count in type_counts.items():
+        type_counts = overview['type_counts']
+        total = sum(count for _, count in type_counts)
+        for ctype, count in type_counts:
             pct = (count / total * 100) if total > 0 else 0
             st.metric(f"{ctype}", f"{count:,}", f"{pct:.1f}%")
 
@@ -433,101 +621,256 @@ def main():
     # Heatmap: Region x Year
     st.subheader("🔥 Regional Activity Heatmap")
 
-    # Get top 10 regions
-    top_regions = filtered_df[region_col].value_counts().head(10).index
-
-    # Create pivot table
-    heatmap_data = filtered_df[filtered_df[region_col].isin(top_regions)]
-    pivot = heatmap_data.groupby([region_col, year_col]).size().reset_index(name='count')
-    pivot_table = pivot.pivot(index=region_col, columns=year_col, values='count').fillna(0)
-
-    fig_heatmap = px.imshow(
-        pivot_table,
-        labels=dict(x="Year", y="Region", color="Laureates"),
-        x=pivot_table.columns,
-        y=pivot_table.index,
-        color_continuous_scale='Blues',
-        aspect='auto'
-    )
-    fig_heatmap.update_layout(height=500)
-
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+    show_figure(figures['heatmap'])
 
     st.divider()
 
-    # Map visualization
-    st.subheader("🌍 Geographic Distribution")
+def show_map(rendered_map):
+    """Display a rendered map, or why there is none"""
+    # Check if we have any valid coordinates
+    if rendered_map['kind'] == 'empty':
+        st.warning("⚠️ No geographic coordinates available for the selected filters.")
+        st.info("💡 Try adjusting your filters to include more regions.")
+    elif rendered_map['kind'] == 'clusters':
+        show_figure(rendered_map['figures']['map'])
+
+        st.info("💡 Each bubble groups the laureates of one area, sized by their count. Move the Map detail slider to 'Laureates' to see individual points.")
+    else:
+        show_figure(rendered_map['figures']['map'])
+
+        st.info("💡 Laureates with a known commune are placed there; the others are placed at their region center with random variation. Each dot represents one laureate.")
 
-    # Try to create a simple map using region-based geocoding
+def render_landing():
+    """Render the landing view (overview and default map) through the figure cache"""
+    return render_landing_view(load_data(), load_filter_index(), load_count_cube(), load_geocoded_rows(),
+                               cache=cached_render)
+
+@st.cache_resource
+def load_landing_snapshot():
+    """
+    The prebuilt landing snapshot, or None when there is none or it was
+    built from another version of the CSV than the one on disk.
+    """
+    csv_path = ASSETS['laureates_csv']['path']
     try:
-        import numpy as np
-
-        # Get region coordinates mapping
-        region_coords = get_region_coordinates()
-
-        # Geocode based on region from CSV data
-        map_data = []
-        for idx, row in filtered_df.iterrows():
-            region = row.get(region_col)
-            if pd.notna(region) and region in region_coords:
-                lat, lon = region_coords[region]
-
-                # Add small random jitter to spread points within region
-                # ~0.3 degrees ≈ 30km variation
-                lat_jitter = np.random.uniform(-0.3, 0.3)
-                lon_jitter = np.random.uniform(-0.3, 0.3)
-
-                map_data.append({
-                    'lat': lat + lat_jitter,
-                    'lon': lon + lon_jitter,
-                    'region': region,
-                    'year': row.get(year_col, 'Unknown'),
-                    'project': row.get('Projet', 'Unknown'),
-                    'laureate': row.get('Nom du lauréat', 'Unknown'),
-                    'domain': row.get(domain_col, 'Unknown')
-                })
-
-        map_df = pd.DataFrame(map_data)
-
-        # Check if we have any valid coordinates
-        if map_df.empty:
-            st.warning("⚠️ No geographic coordinates available for the selected filters.")
-            st.info("💡 Try adjusting your filters to include more regions.")
+        with open(LANDING_SNAPSHOT, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        if snapshot.get('source_sha256') != source_digest(csv_path):
+            return None
+        return snapshot
+    except (OSError, ValueError):
+        return None
+
+def warm_engine():
+    """
+    Load the data and every index, then put the landing view in the figure
+    cache - straight from the snapshot when it was built from the same CSV.
+    Runs without a page: failures are reported for the next run to show.
+    """
+    try:
+        ensure_asset('laureates_csv')
+        load_data()
+        load_filter_index()
+        load_count_cube()
+        load_geocoded_rows()
+
+        snapshot = load_landing_snapshot()
+        if snapshot is not None:
+            cached_render(snapshot['overview_key'], lambda: snapshot['overview'])
+            cached_render(snapshot['map_key'], lambda: snapshot['map'])
         else:
-            # Determine zoom level based on data spread
-            zoom_level = 5 if len(map_df) > 100 else 6
-
-            fig_map = px.scatter_mapbox(
-                map_df,
-                lat='lat',
-                lon='lon',
-                hover_name='laureate',
-                hover_data={
-                    'project': True,
-                    'region': True,
-                    'year': True,
-                    'domain': True,
-                    'lat': False,
-                    'lon': False
-                },
-                color='region',
-                zoom=zoom_level,
-                height=600,
-                title=f'Geographic Distribution of {len(map_df):,} Laureates'
-            )
+            render_landing()
+    except Exception as e:
+        # The session loads the data itself, reporting any download error
+        report_problem(f"Background warm-up failed: {e}")
+
+@st.cache_resource
+def start_engine_warmup():
+    """Warm the interactive engine in a background thread, once per process"""
+    thread = threading.Thread(target=warm_engine, name='engine-warmup', daemon=True)
+    thread.start()
+    return thread
+
+def show_landing_snapshot(snapshot):
+    """Paint the prebuilt landing view while the engine warms up"""
+    st.sidebar.header("🔍 Filters")
+    st.sidebar.info("⏳ Loading the data - filters will be available in a moment.")
+
+    show_overview(snapshot['overview'])
 
-            fig_map.update_layout(
-                mapbox_style="open-street-map",
-                margin={"r":0,"t":40,"l":0,"b":0}
+    st.subheader("🌍 Geographic Distribution")
+    show_map(snapshot['map'])
+
+def main():
+    setup_page()
+
+    # Header
+    st.markdown("""
+    <div class="main-header">
+        <h1>🚀 i-Lab Laureates Dashboard</h1>
+        <p>Concours national d'aide à la création d'entreprises de technologies innovantes</p>
+        <p>Interactive analysis of 3,923 laureates from 1999-2025</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # On a cold start, paint the prebuilt snapshot (when it was built from
+    # the CSV on disk) while the engine warms up, then rerun into the
+    # interactive dashboard
+    warmup = start_engine_warmup()
+    if warmup.is_alive():
+        snapshot = load_landing_snapshot()
+        if snapshot is not None:
+            show_landing_snapshot(snapshot)
+            warmup.join()
+            st.rerun()
+
+    # Load data
+    with st.spinner("Loading data..."):
+        df = load_data()
+        filter_index = load_filter_index()
+    show_problems()
+
+    # Data cleaning
+    year_col = 'Année de concours'
+    region_col = 'Région'
+    domain_col = 'Domaine technologique'
+    gender_col = 'Genre'
+    type_col = 'Type de candidature'
+
+    # Sidebar filters
+    st.sidebar.header("🔍 Filters")
+
+    # Text search over the project names and summaries
+    search_query = st.sidebar.text_input(
+        "Search projects",
+        help="Words from the project name or summary (accents and case are ignored)"
+    )
+
+    # Defaults are the landing state, which the snapshot was rendered with
+    default_years, default_selections = landing_filters(df, filter_index)
+
+    # Year range
+    years = filter_index['years']
+    year_range = st.sidebar.slider(
+        "Year Range",
+        min_value=min(years),
+        max_value=max(years),
+        value=default_years
+    )
+
+    # Region filter
+    regions = sorted([r for r in df[region_col].unique() if pd.notna(r)])
+    selected_regions = st.sidebar.multiselect(
+        "Regions",
+        options=regions,
+        default=[]
+    )
+
+    # Domain filter
+    domains = sorted([d for d in df[domain_col].unique() if pd.notna(d)])
+    selected_domains = st.sidebar.multiselect(
+        "Technology Domains",
+        options=domains,
+        default=[]
+    )
+
+    # Gender filter
+    genders = [g for g in df[gender_col].unique() if pd.notna(g)]
+    selected_genders = st.sidebar.multiselect(
+        "Gender",
+        options=genders,
+        default=default_selections[gender_col]
+    )
+
+    # Apply filters - bitmap intersection on the prebuilt index, no full-frame copy
+    row_ids = select_rows(
+        filter_index,
+        year_range,
+        {region_col: selected_regions, domain_col: selected_domains, gender_col: selected_genders}
+    )
+    signature = filter_signature(
+        year_range,
+        {region_col: selected_regions, domain_col: selected_domains, gender_col: selected_genders}
+    )
+
+    # Search within the filtered rows; the table lists the best matches first
+    ranked_ids = None
+    if search_query.strip():
+        ranked_ids = search_index(load_search_index(), search_query, rows=row_ids)
+    if ranked_ids is not None:
+        row_ids = np.sort(ranked_ids)
+        signature += (('search', tuple(sorted(set(search_terms(search_query))))),)
+        st.sidebar.caption(f"{len(ranked_ids):,} laureates match the search")
+        if len(ranked_ids) == 0:
+            st.info("No laureate matches this search with the current filters.")
+            st.stop()
+    table_ids = row_ids if ranked_ids is None else ranked_ids
+    filtered_df = df.iloc[table_ids]
+
+    # Metrics and charts come from the process-wide figure cache; a miss
+    # slices the precomputed count cube and builds the figures once
+    overview = cached_render(
+        figure_cache_key(signature),
+        partial(render_filtered_overview, year_range, {region_col: selected_regions, domain_col: selected_domains, gender_col: selected_genders},
+                None if ranked_ids is None else row_ids)
+    )
+    overview_tab, survival_tab, repeat_tab = st.tabs(["📊 Overview", "⏳ Company Survival", "🔁 Repeat Laureates"])
+
+    with overview_tab:
+        show_overview(overview)
+
+        # Map visualization
+        st.subheader("🌍 Geographic Distribution")
+
+        # Large selections open as clusters; markers are only sent when asked for
+        detail_levels = list(MAP_DETAIL_LEVELS)
+        map_detail = st.select_slider(
+            "Map detail",
+            options=detail_levels,
+            value=default_map_detail(overview['metrics']['total_count']),
+            help="Zoom from region totals to grouped areas to individual laureates"
+        )
+
+        # Try to create a simple map using region-based geocoding
+        try:
+            rendered_map = cached_render(
+                figure_cache_key(signature, map_detail),
+                partial(render_filtered_map, signature, row_ids, map_detail)
             )
 
-            st.plotly_chart(fig_map, use_container_width=True)
+            show_map(rendered_map)
 
-            st.info("💡 Points are geocoded based on region centers with random variation. Each dot represents one laureate, positioned within their region.")
+        except Exception as e:
+            st.warning(f"⚠️ Map visualization unavailable: {str(e)}")
+            st.info("💡 The dashboard will continue to work without the map. All other visualizations are available above.")
+
+    # Survival of the filtered laureates' companies, cached per filter state and grouping
+    with survival_tab:
+        st.subheader("⏳ Company Survival")
+        if load_survival_data() is None:
+            st.info("💡 Company survival needs the Sirene-enriched laureates of the current data: "
+                    "run `python3 scripts/enrich_sirene.py` (again after each data refresh).")
+        else:
+            compare_by = st.selectbox("Compare by", options=list(SURVIVAL_GROUPS))
+            rendered_survival = cached_render(
+                figure_cache_key(signature, 'survival', compare_by),
+                partial(render_survival, row_ids, compare_by)
+            )
+            show_survival(rendered_survival, overview['metrics']['total_count'])
 
-    except Exception as e:
-        st.warning(f"⚠️ Map visualization unavailable: {str(e)}")
-        st.info("💡 The dashboard will continue to work without the map. All other visualizations are available above.")
+    # Repeat participation of the filtered laureates, from the prebuilt graph
+    with repeat_tab:
+        st.subheader("🔁 Repeat Laureates")
+        try:
+            rendered_repeats = cached_render(
+                figure_cache_key(signature, 'repeats'),
+                partial(render_repeats, row_ids)
+            )
+            show_repeats(rendered_repeats)
+
+        except Exception as e:
+            st.warning(f"⚠️ Repeat-laureate analysis unavailable: {str(e)}")
+            st.info("💡 The dashboard will continue to work without it. All other visualizations are available.")
 
     st.divider()
 
@@ -545,11 +888,19 @@ def main():
             use_container_width=True
         )
 
+        export_format = st.radio(
+            "Export format",
+            options=list(EXPORT_FORMATS),
+            horizontal=True
+        )
+        extension, mime = EXPORT_FORMATS[export_format]
+
+        # The file is only generated when the button is clicked
         st.download_button(
-            label="Download Filtered Data (CSV)",
-            data=filtered_df.to_csv(index=False).encode('utf-8'),
-            file_name=f'ilab_filtered_{datetime.now().strftime("%Y%m%d")}.csv',
-            mime='text/csv'
+            label=f"Download Filtered Data ({export_format})",
+            data=partial(export_rows, table_ids, export_format),
+            file_name=f'ilab_filtered_{datetime.now().strftime("%Y%m%d")}.{extension}',
+            mime=mime
         )
 
     # Footer
@@ -0,0 +1,12 @@
+"""
+Shared test setup: the scripts are flat modules, imported the way they
+import each other (scripts/ on sys.path), and the app modules from the
+repository root
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
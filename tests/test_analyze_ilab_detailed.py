@@ -0,0 +1,86 @@
+"""Single-pass detailed analysis (analyze_ilab_detailed.py) against the original one-pass-per-statistic analysis"""
+
+import csv
+import json
+import random
+from collections import Counter, defaultdict
+
+from analyze_ilab_detailed import analyze_streaming, iter_csv_rows, load_csv_data
+
+FIELDS = ['Genre', 'Année de concours', 'Type de candidature', 'Domaine technologique', 'Région',
+          'Nom du lauréat', 'Déjà lauréat en', 'Jury', 'Grand-Prix', 'N° SIRET', 'N° SIREN']
+
+def write_fixture(path, fields, count=300, seed=0):
+    """A laureates CSV with blanks in every column and a few odd years"""
+    rng = random.Random(seed)
+    choices = {
+        'Genre': ['Homme', 'Femme', ''],
+        'Année de concours': [str(year) for year in range(2010, 2016)] + ['', 'NC'],
+        'Type de candidature': ['en émergence', 'création-développement', ''],
+        'Domaine technologique': [f'Domaine {i}' for i in range(30)] + [''],
+        'Région': ['Bretagne', 'Occitanie', 'Île-de-France', 'Grand Est', ''],
+        'Déjà lauréat en': ['', '', '', '2012 (en émergence)'],
+        'Jury': ['National', 'Régional', ''],
+        'Grand-Prix': ['', '', 'Grand Prix'],
+        'N° SIRET': ['', '12345678900012'],
+        'N° SIREN': ['', '123456789'],
+    }
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(fields)
+        for i in range(count):
+            writer.writerow([f'Lauréat {i}' if field == 'Nom du lauréat' else rng.choice(choices[field])
+                             for field in fields])
+
+def multi_pass_analysis(data):
+    """The analysis as analyze_comprehensive built it before: one pass per statistic"""
+    analysis = {"metadata": {"total_records": len(data), "fields": list(data[0].keys()) if data else []}}
+    first = data[0]
+
+    if 'Genre' in first:
+        analysis['gender_distribution'] = dict(Counter(row.get('Genre', 'Non spécifié') for row in data))
+    if 'Année de concours' in first:
+        year_counts = Counter(row['Année de concours'] for row in data if row.get('Année de concours'))
+        analysis['by_year'] = dict(sorted(year_counts.items()))
+        if len(year_counts) > 1:
+            years_list = sorted(int(y) for y in year_counts if y.isdigit())
+            if years_list:
+                analysis['year_range'] = {'first': years_list[0], 'last': years_list[-1],
+                                          'span': years_list[-1] - years_list[0] + 1}
+    if 'Région' in first:
+        analysis['by_region'] = dict(Counter(row['Région'] for row in data if row.get('Région')).most_common())
+    if 'Domaine technologique' in first:
+        domains = Counter(row['Domaine technologique'] for row in data if row.get('Domaine technologique'))
+        analysis['by_domain'] = dict(domains.most_common(25))
+    if 'Type de candidature' in first:
+        analysis['by_candidature_type'] = dict(Counter(row['Type de candidature'] for row in data
+                                                       if row.get('Type de candidature')))
+    if 'Grand-Prix' in first:
+        analysis['grand_prix_winners'] = sum(1 for row in data if row.get('Grand-Prix'))
+    if 'Jury' in first:
+        analysis['by_jury'] = dict(Counter(row['Jury'] for row in data if row.get('Jury')))
+    analysis['company_info'] = {'with_siret': sum(1 for row in data if row.get('N° SIRET')),
+                                'with_siren': sum(1 for row in data if row.get('N° SIREN'))}
+    analysis['repeat_laureates'] = sum(1 for row in data if row.get('Déjà lauréat en'))
+    if 'Année de concours' in first and 'Région' in first:
+        region_year = defaultdict(lambda: defaultdict(int))
+        for row in data:
+            if row.get('Année de concours') and row.get('Région'):
+                region_year[row['Région']][row['Année de concours']] += 1
+        analysis['region_year_detail'] = {region: dict(years) for region, years in region_year.items()}
+    return analysis
+
+def dumped(analysis):
+    """The JSON the script writes, without the run date"""
+    analysis['metadata'].pop('analysis_date', None)
+    return json.dumps(analysis, ensure_ascii=False, indent=2)
+
+def test_streaming_analysis_matches_the_multi_pass_one(tmp_path):
+    for name, fields in [('full', FIELDS), ('no_jury_no_gender', [f for f in FIELDS if f not in ('Jury', 'Genre')])]:
+        path = tmp_path / f"{name}.csv"
+        write_fixture(path, fields)
+
+        # Same JSON, key order included, from a row generator as from the list
+        expected = dumped(multi_pass_analysis(load_csv_data(path)))
+        assert dumped(analyze_streaming(iter_csv_rows(path))) == expected
+        assert dumped(analyze_streaming(load_csv_data(path))) == expected
@@ -0,0 +1,48 @@
+"""Vectorized Kaplan-Meier curves (analyze_survival.py) against the textbook product-limit loop"""
+
+import numpy as np
+
+from analyze_survival import kaplan_meier
+
+def textbook_kaplan_meier(durations, events):
+    """One step per distinct time: S *= 1 - deaths / at risk"""
+    survival, steps = 1.0, []
+    for time in sorted(set(durations)):
+        at_risk = sum(duration >= time for duration in durations)
+        deaths = sum(event for duration, event in zip(durations, events) if duration == time)
+        survival *= 1 - deaths / at_risk
+        steps.append((time, at_risk, deaths, survival))
+    return steps
+
+def test_kaplan_meier_matches_the_textbook_loop_per_group():
+    rng = np.random.default_rng(0)
+    n = 3000
+    durations = np.round(rng.exponential(6, n), 1)  # rounded, so many tied times
+    events = rng.random(n) < 0.6
+    durations[rng.random(n) < 0.05] = np.nan
+    groups = rng.choice(['2005-2009', '2010-2014', 'Santé', None], n).astype(object)
+    # A group where every company closes: its curve must end at exactly 0
+    durations[:4], events[:4], groups[:4] = [1.0, 2.0, 2.0, 3.5], True, 'Fermées'
+
+    curves = kaplan_meier(durations, events, groups)
+
+    assert sorted(curves['group'].unique()) == ['2005-2009', '2010-2014', 'Fermées', 'Santé']
+    for group, curve in curves.groupby('group'):
+        rows = (groups == group) & ~np.isnan(durations)
+        expected = textbook_kaplan_meier(durations[rows].tolist(), events[rows].tolist())
+        assert curve['time'].tolist() == [time for time, _, _, _ in expected]
+        assert curve['at_risk'].tolist() == [at_risk for _, at_risk, _, _ in expected]
+        assert curve['events'].tolist() == [deaths for _, _, deaths, _ in expected]
+        assert np.allclose(curve['survival'], [survival for _, _, _, survival in expected], rtol=1e-12, atol=0)
+    assert curves.loc[curves['group'] == 'Fermées', 'survival'].iloc[-1] == 0.0
+
+def test_kaplan_meier_without_groups_pools_every_row():
+    durations = np.array([2.0, 1.0, np.nan, 2.0, 5.0, 1.0, 3.0])
+    events = np.array([True, False, True, True, False, True, False])
+
+    curve = kaplan_meier(durations, events)
+
+    expected = textbook_kaplan_meier([2.0, 1.0, 2.0, 5.0, 1.0, 3.0], [True, False, True, False, True, False])
+    assert curve['group'].unique().tolist() == ['All laureates']
+    assert list(zip(curve['time'], curve['at_risk'], curve['events'])) == [step[:3] for step in expected]
+    assert np.allclose(curve['survival'], [step[3] for step in expected])
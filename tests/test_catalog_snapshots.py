@@ -0,0 +1,80 @@
+"""Delta-encoded catalog snapshot store (catalog_snapshots.py)"""
+
+from datetime import datetime
+
+import pyarrow as pa
+from pandas.testing import assert_frame_equal
+
+from catalog_snapshots import add_snapshot, changes_between, reconstruct, to_frame
+
+def catalog(rows):
+    """A catalog frame, typed as ingest_catalog gives it, from {id: (title, last_modified, quality_score, views)}"""
+    ids = sorted(rows)
+    return to_frame(pa.table({
+        'id': pa.array(ids, type=pa.string()),
+        'title': pa.array([rows[i][0] for i in ids], type=pa.string()),
+        'last_modified': pa.array([rows[i][1] for i in ids], type=pa.timestamp('us')),
+        'quality_score': pa.array([rows[i][2] for i in ids], type=pa.float64()),
+        'metric.views': pa.array([rows[i][3] for i in ids], type=pa.int64()),
+    }))
+
+JAN, FEB, MAR = datetime(2026, 1, 16), datetime(2026, 2, 16), datetime(2026, 3, 16)
+
+SNAPSHOTS = {
+    '20260116-055249': {
+        'a': ('Budget', JAN, 0.5, 10),
+        'b': ('Communes', JAN, 0.75, 2),
+        'c': ('Écoles', JAN, 0.25, None),
+        'd': ('Gares', JAN, None, 7),
+    },
+    # a viewed, b removed, c rescored, e added
+    '20260216-055249': {
+        'a': ('Budget', FEB, 0.5, 12),
+        'c': ('Écoles', JAN, 0.5, None),
+        'd': ('Gares', JAN, None, 7),
+        'e': ('Hôpitaux', FEB, 0.5, 1),
+    },
+    # b re-added with more views, c scored back, e removed, f added
+    '20260316-055249': {
+        'a': ('Budget', FEB, 0.5, 12),
+        'b': ('Communes', JAN, 0.75, 9),
+        'c': ('Écoles', JAN, 0.25, None),
+        'd': ('Gares', JAN, None, 7),
+        'f': ('Musées', MAR, 1.0, 3),
+    },
+}
+T1, T2, T3 = SNAPSHOTS
+
+def store_snapshots(store_dir):
+    for snapshot_id, rows in SNAPSHOTS.items():
+        add_snapshot(store_dir, catalog(rows), snapshot_id)
+
+def test_reconstruct_round_trips_every_snapshot(tmp_path):
+    store_snapshots(tmp_path)
+
+    for snapshot_id, rows in SNAPSHOTS.items():
+        rebuilt = reconstruct(tmp_path, snapshot_id).sort_values('id').reset_index(drop=True)
+        assert_frame_equal(rebuilt, catalog(rows))
+    assert reconstruct(tmp_path)['id'].tolist() == reconstruct(tmp_path, T3)['id'].tolist()
+
+def test_changes_between_follows_adds_removes_and_re_adds(tmp_path):
+    store_snapshots(tmp_path)
+
+    added, removed, cells = changes_between(tmp_path, T1, T2)
+    assert (added, removed) == (['e'], ['b'])
+    assert sorted(map(tuple, cells[['id', 'column', 'old', 'new']].values.tolist())) == [
+        ('a', 'last_modified', JAN, FEB), ('a', 'metric.views', 10, 12), ('c', 'quality_score', 0.25, 0.5)]
+
+    # b was removed then re-added: its views still changed from 2 to 9; c is back
+    # to its old score; e only existed in between
+    added, removed, cells = changes_between(tmp_path, T1, T3)
+    assert (added, removed) == (['f'], [])
+    assert sorted(map(tuple, cells[['id', 'column', 'old', 'new']].values.tolist())) == [
+        ('a', 'last_modified', JAN, FEB), ('a', 'metric.views', 10, 12), ('b', 'metric.views', 2, 9)]
+
+    added, removed, cells = changes_between(tmp_path, T2, T3)
+    assert (added, removed) == (['b', 'f'], ['e'])
+    assert cells[['id', 'column']].values.tolist() == [['c', 'quality_score']]
+
+    added, removed, cells = changes_between(tmp_path, T2, T2)
+    assert (added, removed, len(cells)) == ([], [], 0)
@@ -0,0 +1,105 @@
+"""One-pass spec aggregation (dataset_specs.py) against pandas groupby().agg()"""
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from dataset_specs import MISSING_LABEL, aggregate, analyze, guess_spec, prepare, typed_values
+
+SPEC = {
+    'title': "TEST",
+    'path': None,
+    'dimensions': {
+        'year': ('Année de concours', 'year'),
+        'month': ('created_at', 'month'),
+        'region': ('Région', 'category'),
+        'featured': ('featured', 'bool'),
+        'suffix': ('website', 'domain_suffix'),
+    },
+    'measures': {
+        'rows': (None, 'count'),
+        'grand_prix': ('Grand-Prix', 'nonempty'),
+        'views': ('views', 'sum'),
+        'score': ('score', 'mean'),
+    },
+    'reports': [
+        ("BY YEAR", ['year'], None),
+        ("BY REGION", ['region'], 3),
+        ("BY REGION AND YEAR", ['region', 'year'], None),
+        ("BY FEATURED, SUFFIX AND MONTH", ['featured', 'suffix', 'month'], 10),
+    ],
+}
+
+def sample_table(n=2000, seed=0):
+    """Text cells as a CSV gives them: blanks, padding, stray values"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Année de concours': rng.choice(['2004', 'Année 2012', '2019', '', 'inconnue', None], n),
+        'created_at': rng.choice(['2021-03-04', '2021-03-30', '2022-11-01', 'n/a', None], n),
+        'Région': rng.choice(['Bretagne', ' Bretagne ', 'Occitanie', 'Île-de-France', '', None], n),
+        'featured': rng.choice(['oui', 'Non', 'TRUE', '0', '', None], n),
+        'website': rng.choice(['https://a.fr/x', 'b.com', 'http://www.c.co.uk:8080', 'pas de site', None], n),
+        'Grand-Prix': rng.choice(['Grand Prix', '  ', '', None], n),
+        'views': rng.choice(['10', '250', '', 'beaucoup', None], n),
+        'score': rng.choice(['0.5', '0.25', '1', 'n/a', None], n),
+    })
+
+def groupby_reference(table, by, limit=None):
+    """The same report the straightforward way: typed columns, then groupby().agg()"""
+    frame = pd.DataFrame({name: typed_values(table[column], kind)
+                          for name, (column, kind) in SPEC['dimensions'].items()})
+    text = table['Grand-Prix'].astype('string').str.strip()
+    frame['grand_prix'] = (text.notna() & (text != '')).astype(int)
+    frame['views'] = pd.to_numeric(table['views'], errors='coerce')
+    frame['score'] = pd.to_numeric(table['score'], errors='coerce')
+    frame['rows'] = 1
+
+    measures = {'rows': ('rows', 'size'), 'grand_prix': ('grand_prix', 'sum'),
+                'views': ('views', 'sum'), 'score': ('score', 'mean')}
+    if by:
+        # Missing labels sort last, as MISSING_LABEL does in aggregate
+        expected = frame.groupby(by, sort=True, dropna=False).agg(**measures).reset_index()
+        for name in by:
+            expected[name] = expected[name].astype(object).where(expected[name].notna(), MISSING_LABEL)
+    else:
+        expected = frame.assign(total=0).groupby('total').agg(**measures).reset_index(drop=True)
+    if limit is not None:
+        expected = expected.sort_values('rows', ascending=False, kind='stable').head(limit)
+    return expected.reset_index(drop=True)
+
+def test_aggregate_matches_groupby_for_every_report():
+    table = sample_table()
+    prepared = prepare(table, SPEC)
+
+    for _, by, limit in [("TOTAL", [], None)] + SPEC['reports']:
+        result = aggregate(prepared, by, limit)
+        expected = groupby_reference(table, by, limit)
+        for name in by:
+            result[name] = result[name].astype(object)
+        assert_frame_equal(result, expected, check_dtype=False)
+
+def test_analyze_reports_cover_every_row():
+    table = sample_table(seed=1)
+    analysis = analyze(SPEC, table)
+
+    assert list(analysis) == ["TOTAL"] + [title for title, _, _ in SPEC['reports']]
+    assert analysis["TOTAL"]['rows'].tolist() == [len(table)]
+    for title, by, limit in SPEC['reports']:
+        if limit is None:
+            assert analysis[title]['rows'].sum() == len(table)
+            assert analysis[title]['views'].sum() == analysis["TOTAL"]['views'].iloc[0]
+        else:
+            assert len(analysis[title]) <= limit
+
+def test_guess_spec_keeps_the_first_candidate_field(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text("Nom;Domaine technologique;Année de concours;Domaine secondaire;Date de mise à jour;Région\n"
+                    "A;Santé;2020;Numérique;2024-01-01;Bretagne\n", encoding='utf-8')
+
+    spec = guess_spec(path)
+
+    assert spec['dimensions'] == {
+        'year': ('Année de concours', 'year'),
+        'region': ('Région', 'category'),
+        'category': ('Domaine technologique', 'category'),
+    }
@@ -0,0 +1,169 @@
+"""Mirror racing and resumable, verified downloads (download_ilab.py) against a local server"""
+
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from download_ilab import HEADERS, DownloadError, fetch, meta_path, part_path, race_mirrors
+
+BODY = b'Nom;Annee\n' + b''.join(f'Laureat {i};{2000 + i % 25}\n'.encode() for i in range(20_000))
+ETAG = '"v1"'
+SLOW_SECONDS = 2.0
+CUT_AT = 100_000  # bytes sent before an 'interrupted' response drops the connection
+# A portal error page, large enough not to be rejected on its size alone
+ERROR_PAGE = b'<!DOCTYPE html><html><body><h1>Service unavailable</h1>' + b'<p>Retry later.</p>' * 200 + b'</body></html>'
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    """
+    One path per mirror behaviour: /csv serves BODY (ETag, Range, If-Range,
+    If-None-Match), /slow serves it late, /html an error page, /missing a 404,
+    /flaky drops the first transfer and then serves ranges as state says.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        state = self.server.state
+        with state['lock']:
+            state['requests'].append((self.path, dict(self.headers)))
+
+        if self.path == '/missing':
+            self.send_error(404)
+        elif self.path == '/html':
+            self.send_body(ERROR_PAGE, 'text/html')
+        elif self.path == '/slow':
+            time.sleep(SLOW_SECONDS)
+            self.send_body(BODY)
+        elif self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+        elif self.headers.get('Range'):
+            if self.path == '/flaky' and state['ranges'] == 'down':
+                self.send_error(503)
+                return
+            offset = int(self.headers['Range'].split('=')[1].rstrip('-'))
+            if self.headers.get('If-Range') != ETAG:
+                self.send_body(BODY)
+                return
+            self.send_response(206)
+            self.send_header('Content-Type', 'text/csv')
+            self.send_header('ETag', ETAG)
+            self.send_header('Content-Range', f'bytes {offset}-{len(BODY) - 1}/{len(BODY)}')
+            self.send_header('Content-Length', str(len(BODY) - offset))
+            self.end_headers()
+            self.wfile.write(BODY[offset:])
+        elif self.path == '/flaky':
+            # Announce the whole body, send part of it, then drop the connection
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv')
+            self.send_header('ETag', ETAG)
+            self.send_header('Content-Length', str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY[:CUT_AT])
+            self.close_connection = True
+        else:
+            self.send_body(BODY)
+
+    def send_body(self, body, content_type='text/csv'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def mirror():
+    """Base URL of a local mirror server; its request log is in mirror.state"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MirrorHandler)
+    server.daemon_threads = True
+    server.state = {'requests': [], 'ranges': 'up', 'lock': threading.Lock()}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    class Mirror(str):
+        pass
+
+    base = Mirror(f'http://127.0.0.1:{server.server_address[1]}')
+    base.state = server.state
+    yield base
+    server.shutdown()
+    server.server_close()
+
+def requests_to(mirror, path):
+    return [headers for request_path, headers in mirror.state['requests'] if request_path == path]
+
+def test_race_picks_the_fast_mirror_over_a_slow_one(mirror):
+    start = time.perf_counter()
+    probe = race_mirrors([f'{mirror}/slow', f'{mirror}/csv'], HEADERS, timeout=10)
+    probe['response'].close()
+
+    assert probe['url'] == f'{mirror}/csv'
+    assert time.perf_counter() - start < SLOW_SECONDS
+
+def test_race_skips_an_html_error_page_and_a_404(mirror):
+    probe = race_mirrors([f'{mirror}/html', f'{mirror}/missing', f'{mirror}/csv'], HEADERS, timeout=10)
+    probe['response'].close()
+    assert probe['url'] == f'{mirror}/csv'
+
+    with pytest.raises(DownloadError, match='HTML page'):
+        race_mirrors([f'{mirror}/html'], HEADERS, timeout=10)
+    with pytest.raises(DownloadError, match='404'):
+        race_mirrors([f'{mirror}/missing'], HEADERS, timeout=10)
+
+def test_fetch_then_revalidate_with_a_304(mirror, tmp_path):
+    output = tmp_path / "ilab.csv"
+
+    assert fetch([f'{mirror}/csv'], output) == 'downloaded'
+    assert output.read_bytes() == BODY
+    assert not part_path(output).exists()
+
+    assert fetch([f'{mirror}/csv'], output) == 'not_modified'
+    assert requests_to(mirror, '/csv')[-1]['If-None-Match'] == ETAG
+    assert output.read_bytes() == BODY
+
+def test_interrupted_transfer_resumes_with_range_and_if_range(mirror, tmp_path):
+    output = tmp_path / "ilab.csv"
+
+    assert fetch([f'{mirror}/flaky'], output) == 'downloaded'
+    assert output.read_bytes() == BODY
+
+    resume = requests_to(mirror, '/flaky')[1]
+    assert resume['Range'] == f'bytes={CUT_AT}-'
+    assert resume['If-Range'] == ETAG
+
+def test_next_run_resumes_from_the_part_file(mirror, tmp_path):
+    output = tmp_path / "ilab.csv"
+
+    # Every resume attempt fails: the partial download stays on disk
+    mirror.state['ranges'] = 'down'
+    with pytest.raises(DownloadError, match='kept failing'):
+        fetch([f'{mirror}/flaky'], output)
+    assert part_path(output).stat().st_size == CUT_AT
+    assert meta_path(part_path(output)).exists()
+    assert not output.exists()
+
+    # A later run asks only for the missing bytes
+    mirror.state['ranges'] = 'up'
+    requests_before = len(mirror.state['requests'])
+    assert fetch([f'{mirror}/flaky'], output) == 'downloaded'
+    assert output.read_bytes() == BODY
+    assert not part_path(output).exists()
+
+    later = [headers for _, headers in mirror.state['requests'][requests_before:]]
+    assert [headers['Range'] for headers in later] == [f'bytes={CUT_AT}-']
+
+def test_checksum_mismatch_keeps_the_current_file(mirror, tmp_path):
+    output = tmp_path / "ilab.csv"
+    output.write_bytes(b'current')
+
+    with pytest.raises(DownloadError, match='Checksum mismatch'):
+        fetch([f'{mirror}/csv'], output, expected_sha256='0' * 64)
+    assert output.read_bytes() == b'current'
+    assert not part_path(output).exists()
+
+    assert fetch([f'{mirror}/csv'], output, expected_sha256=hashlib.sha256(BODY).hexdigest()) == 'downloaded'
+    assert output.read_bytes() == BODY
@@ -0,0 +1,102 @@
+"""Streamed Sirene hash join (enrich_sirene.py) against an in-memory pandas merge"""
+
+import zipfile
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from enrich_sirene import (ESTABLISHMENT_COLUMNS, ESTABLISHMENT_FIELDS, STOCK_DATE_COLUMN, UNIT_COLUMNS,
+                           UNIT_FIELDS, enrich, hash_join_stock)
+
+BLOCK_SIZE = 4096  # a few dozen rows per batch, so the join spans many batches
+
+def write_stock(tmp_path, seed=0, companies=800):
+    """Small StockUniteLegale / StockEtablissement files (with columns enrich does not read)"""
+    rng = np.random.default_rng(seed)
+    sirens = [f'{n:09d}' for n in rng.choice(10**9, companies, replace=False)]
+    units = pd.DataFrame({
+        'siren': sirens,
+        'denominationUniteLegale': [f'SOCIETE {siren}' for siren in sirens],
+        'etatAdministratifUniteLegale': rng.choice(['A', 'C'], companies),
+        'dateCreationUniteLegale': [f'{year}-01-15' for year in rng.integers(1990, 2020, companies)],
+        'dateDebut': [f'{year}-06-30' for year in rng.integers(2020, 2025, companies)],
+        'activitePrincipaleUniteLegale': rng.choice(['62.01Z', '72.19Z', '21.20Z'], companies),
+        'categorieJuridiqueUniteLegale': rng.choice(['5710', '5499'], companies),
+        'trancheEffectifsUniteLegale': rng.choice(['NN', '11', '21'], companies),
+    })
+
+    rows = []
+    for siren in sirens:
+        for nic in range(1, int(rng.integers(1, 4)) + 1):
+            rows.append({
+                'siren': siren, 'nic': f'{nic:05d}', 'siret': f'{siren}{nic:05d}',
+                'etablissementSiege': 'true' if nic == 1 else 'false',
+                'etatAdministratifEtablissement': rng.choice(['A', 'F']),
+                'activitePrincipaleEtablissement': rng.choice(['62.01Z', '72.19Z']),
+                'codePostalEtablissement': f'{int(rng.integers(1000, 96000)):05d}',
+                'libelleCommuneEtablissement': rng.choice(['PARIS', 'LYON', 'GRENOBLE']),
+            })
+    establishments = pd.DataFrame(rows)
+
+    units_path = tmp_path / "StockUniteLegale_utf8.csv"
+    establishments_path = tmp_path / "StockEtablissement_utf8.csv"
+    units.to_csv(units_path, index=False)
+    establishments.to_csv(establishments_path, index=False)
+    return units, establishments, units_path, establishments_path
+
+def laureates_for(units, establishments, seed=1):
+    """Laureates as the i-Lab file has them: SIREN and/or SIRET, messy or missing, some not in the stock"""
+    rng = np.random.default_rng(seed)
+    picked = establishments.sample(120, random_state=seed).reset_index(drop=True)
+    sirens, sirets = [], []
+    for i, row in picked.iterrows():
+        kind = i % 5
+        sirens.append([row['siren'], f"{row['siren']}.0", None, row['siren'][:3] + ' ' + row['siren'][3:], ''][kind])
+        sirets.append([None, row['siret'], row['siret'], '', 'inconnu'][kind])
+    sirens += ['000000001', None]
+    sirets += ['00000000100011', None]
+    return pd.DataFrame({'Nom': [f'Laureat {i}' for i in range(len(sirens))],
+                         'N° SIREN': sirens, 'N° SIRET': sirets})
+
+def test_hash_join_matches_an_isin_filter(tmp_path):
+    units, establishments, units_path, establishments_path = write_stock(tmp_path)
+    keys = set(units['siren'].sample(50, random_state=2)) | {'000000001'}
+
+    archive = tmp_path / "StockEtablissement_utf8.zip"
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.write(establishments_path, establishments_path.name)
+
+    for path, stock, columns in [(units_path, units, UNIT_COLUMNS),
+                                 (establishments_path, establishments, ESTABLISHMENT_COLUMNS),
+                                 (archive, establishments, ESTABLISHMENT_COLUMNS)]:
+        matched, scanned = hash_join_stock(path, 'siren', keys, columns, BLOCK_SIZE)
+        expected = stock.loc[stock['siren'].isin(keys), columns].reset_index(drop=True)
+        assert scanned == len(stock)
+        assert_frame_equal(matched.to_pandas(), expected, check_dtype=False)
+
+def test_enrich_matches_a_pandas_merge(tmp_path):
+    units, establishments, units_path, establishments_path = write_stock(tmp_path)
+    laureates = laureates_for(units, establishments)
+
+    enriched, stats = enrich(laureates, units_path, establishments_path, BLOCK_SIZE, as_of='2025-01-31')
+
+    # Reference: the whole stock in memory, merged on the cleaned numbers
+    siret = laureates['N° SIRET'].fillna('').str.replace(r'\D', '', regex=True)
+    siret = siret.where(siret.str.len() == 14, '')
+    siren = laureates['N° SIREN'].fillna('').str.replace(r'\.0$', '', regex=True).str.replace(' ', '')
+    siren = siren.where(siren.str.len() == 9, siret.str[:9])
+    keys = pd.DataFrame({'siren': siren, 'siret': siret})
+
+    units = units.assign(dateFermetureUniteLegale=units['dateDebut'].where(units['etatAdministratifUniteLegale'] == 'C'))
+    by_unit = keys.merge(units, on='siren', how='left')[UNIT_FIELDS]
+    own = keys.merge(establishments, on='siret', how='left', indicator=True)
+    by_establishment = keys.drop(columns='siret').merge(
+        establishments[establishments['etablissementSiege'] == 'true'], on='siren', how='left')[ESTABLISHMENT_FIELDS]
+    has_own = own['_merge'] == 'both'
+    by_establishment.loc[has_own] = own.loc[has_own, ESTABLISHMENT_FIELDS]
+    expected = pd.concat([laureates, by_unit, by_establishment], axis=1).assign(**{STOCK_DATE_COLUMN: '2025-01-31'})
+
+    assert_frame_equal(enriched, expected, check_dtype=False)
+    assert stats['enriched'] == by_unit['etatAdministratifUniteLegale'].notna().sum() == 96
+    assert stats['units_scanned'] == len(units)
@@ -0,0 +1,33 @@
+"""Columnar cache of the laureates CSV (ilab_data.py)"""
+
+import numpy as np
+import pandas as pd
+
+from ilab_data import grid_clusters, load_detail_rows, load_laureates
+
+HEADER = "Année de concours;Région;Nom du lauréat;Résumé\n"
+
+def write_csv(path, names):
+    path.write_text(HEADER + ''.join(f"{2000 + i};Bretagne;{name};Résumé de {name}\n"
+                                     for i, name in enumerate(names)), encoding='utf-8')
+
+def test_detail_rows_come_from_the_cache_only_while_it_matches_the_csv(tmp_path):
+    csv_path, cache_path = tmp_path / "ilab.csv", tmp_path / "ilab.arrow"
+    write_csv(csv_path, ['Alice', 'Bruno', 'Chloé'])
+    load_laureates(csv_path, cache_path)
+    assert cache_path.exists()
+    assert load_detail_rows([2, 0], csv_path, cache_path)['Résumé'].tolist() == ['Résumé de Chloé', 'Résumé de Alice']
+
+    # The CSV is refreshed but its cache is not rewritten: rows must come from the new CSV
+    write_csv(csv_path, ['Denis', 'Émilie', 'Fatou', 'Gaspard'])
+    assert load_detail_rows([2, 0], csv_path, cache_path)['Nom du lauréat'].tolist() == ['Fatou', 'Denis']
+
+def test_grid_clusters_do_not_count_rows_without_a_region():
+    df = pd.DataFrame({'Région': pd.Categorical(['Bretagne', 'Occitanie', None, None, None])})
+    lat = np.array([48.1, 43.6, 48.1, 48.1, 45.0])
+    lon = np.array([-1.7, 1.4, -1.7, -1.7, 5.0])
+
+    clusters = grid_clusters(df, lat, lon, np.arange(5), zoom=8).sort_values('lat', ascending=False)
+
+    assert clusters['count'].tolist() == [3, 1, 1]
+    assert clusters['region'].tolist() == ['Bretagne', 'Unknown', 'Occitanie']
@@ -0,0 +1,73 @@
+"""Blocked French Tech matching (match_french_tech.py) against brute-force all-pairs Jaccard"""
+
+import pandas as pd
+
+import match_french_tech
+from conftest import ROOT
+from match_french_tech import (DEFAULT_THRESHOLD, candidate_pairs, domain_host, link_companies,
+                               load_french_tech, name_key, trigram_sets)
+
+FRENCH_TECH = ROOT / "data" / "ilab" / "French Tech 40_120 - 2023.csv"
+
+def register_for(french_tech):
+    """A small company register: spelling variants of the list, plus look-alike decoys"""
+    names, websites = [], []
+    for i, (name, website) in enumerate(zip(french_tech['name'], french_tech['website'])):
+        names += [name.upper() + ' SAS', name.replace('a', 'à', 1) + ' Groupe', name[:-1] + 'x']
+        websites += [website if i % 2 == 0 else '', '', 'https://www.linkedin.com/company/x']
+        names += [name[:len(name) // 2] + ' Conseil', 'Société ' + name[::-1]]
+        websites += ['', f'https://{name_key(name)}.example.fr']
+    return pd.DataFrame({'name': names, 'website': websites})
+
+def trigrams(key):
+    padded = f' {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def brute_force_links(left, right, threshold):
+    """Score every (left, right) pair with Python sets and keep each left's best match"""
+    left_grams = [trigrams(name_key(name)) for name in left['name']]
+    right_grams = [trigrams(name_key(name)) for name in right['name']]
+    left_hosts = left['website'].map(domain_host).tolist()
+    right_hosts = right['website'].map(domain_host).tolist()
+
+    needed, best = set(), {}
+    for i, (grams, host) in enumerate(zip(left_grams, left_hosts)):
+        for j, (other, other_host) in enumerate(zip(right_grams, right_hosts)):
+            similarity = len(grams & other) / len(grams | other)
+            same_domain = host != '' and host == other_host
+            if similarity >= threshold or same_domain:
+                needed.add((i, j))
+            confidence = round(0.7 + 0.3 * similarity if same_domain else similarity, 3)
+            score = (confidence, round(similarity, 3))
+            if confidence >= threshold and (i not in best or score > best[i][0]):
+                best[i] = (score, j)
+    return needed, {i: j for i, (_, j) in best.items()}
+
+def test_blocking_finds_every_pair_all_pairs_jaccard_finds():
+    left = load_french_tech(FRENCH_TECH)
+    right = register_for(left)
+    needed, expected = brute_force_links(left, right, DEFAULT_THRESHOLD)
+
+    left_ids, right_ids, skipped = candidate_pairs(
+        trigram_sets(left['name'].map(name_key).tolist()), trigram_sets(right['name'].map(name_key).tolist()),
+        left['website'].map(domain_host).to_numpy(dtype=str), right['website'].map(domain_host).to_numpy(dtype=str),
+        DEFAULT_THRESHOLD)
+    candidates = set(zip(left_ids.tolist(), right_ids.tolist()))
+    assert needed <= candidates
+    assert skipped == {'blocks': 0, 'pairs': 0}
+    assert len(candidates) < len(left) * len(right)
+
+    links, stats = link_companies(left, right)
+    assert dict(zip(links['left'].tolist(), links['right'].tolist())) == expected
+    assert stats['links'] == len(expected) > 0
+
+def test_oversized_blocks_are_skipped_and_counted(monkeypatch):
+    left = pd.DataFrame({'name': ['Alpha Robotique', 'Beta Robotique'], 'website': ['', '']})
+    right = pd.DataFrame({'name': ['Alpha Robotique SAS', 'Gamma Robotique'], 'website': ['', '']})
+    assert link_companies(left, right)[1]['skipped_blocks'] == 0
+
+    # Every block of this pair of tables is bigger than one pair
+    monkeypatch.setattr(match_french_tech, 'MAX_BLOCK_PAIRS', 0)
+    links, stats = link_companies(left, right)
+    assert stats['skipped_blocks'] > 0 and stats['skipped_pairs'] >= stats['skipped_blocks']
+    assert stats['candidates'] == len(links) == 0
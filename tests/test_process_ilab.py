@@ -0,0 +1,94 @@
+"""Incremental processing of the laureates CSV (process_ilab.py)"""
+
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from process_ilab import (append_json_records, append_processed_parquet, find_appended_rows, file_sha256,
+                          load_csv_data, read_processed_columns, row_fingerprint, save_processed_parquet)
+
+ROWS = [
+    {'Année de concours': '2020', 'Région': 'Bretagne'},
+    {'Année de concours': '2021', 'Région': 'Occitanie'},
+]
+
+def write_csv(path, rows, newline='\n'):
+    lines = [';'.join(rows[0])] + [';'.join(row.values()) for row in rows]
+    path.write_bytes((newline.join(lines) + newline).encode('utf-8'))
+
+def manifest_for(path, rows):
+    return {
+        'source': path.name,
+        'size': path.stat().st_size,
+        'sha256': file_sha256(path),
+        'fields': list(rows[0]),
+        'record_count': len(rows),
+        'row_fingerprints': [row_fingerprint(row) for row in rows],
+    }
+
+def test_append_json_records_matches_a_full_dump(tmp_path):
+    output = tmp_path / "processed.json"
+    output.write_text(json.dumps(ROWS[:1], ensure_ascii=False, indent=2), encoding='utf-8')
+
+    assert append_json_records(output, ROWS[1:])
+    assert output.read_text(encoding='utf-8') == json.dumps(ROWS, ensure_ascii=False, indent=2)
+
+def test_append_json_records_with_no_records_keeps_valid_json(tmp_path):
+    output = tmp_path / "processed.json"
+    dumped = json.dumps(ROWS, ensure_ascii=False, indent=2)
+    output.write_text(dumped, encoding='utf-8')
+
+    assert append_json_records(output, [])
+    assert output.read_text(encoding='utf-8') == dumped
+    assert json.loads(output.read_text(encoding='utf-8')) == ROWS
+
+def test_crlf_reexport_has_no_appended_rows(tmp_path):
+    source = tmp_path / "ilab_laureats.csv"
+    write_csv(source, ROWS)
+    manifest = manifest_for(source, load_csv_data(source))
+
+    write_csv(source, ROWS, newline='\r\n')
+    assert find_appended_rows(source, manifest, source.stat().st_size) == []
+
+def test_appended_rows_are_found(tmp_path):
+    source = tmp_path / "ilab_laureats.csv"
+    write_csv(source, ROWS[:1])
+    manifest = manifest_for(source, load_csv_data(source))
+
+    write_csv(source, ROWS)
+    assert find_appended_rows(source, manifest, source.stat().st_size) == ROWS[1:]
+
+def laureate_records(count):
+    return [{'Année de concours': str(2000 + i % 5), 'Région': ['Bretagne', 'Occitanie', ''][i % 3],
+             'Projet': f'Projet {i}', 'Grand-Prix': 'Grand Prix' if i % 7 == 0 else None}
+            for i in range(count)]
+
+def test_parquet_round_trip_matches_the_json_records(tmp_path):
+    records = laureate_records(40)
+    fields = list(records[0])
+    output_json, output_parquet = tmp_path / "processed.json", tmp_path / "processed.parquet"
+    output_json.write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding='utf-8')
+    save_processed_parquet(records, fields, output_parquet, 'zstd')
+    from_json = json.loads(output_json.read_text(encoding='utf-8'))
+
+    # Repetitive columns are dictionary-encoded, unique ones stay plain strings
+    schema = pq.read_schema(output_parquet)
+    assert pa.types.is_dictionary(schema.field('Région').type)
+    assert schema.field('Projet').type == pa.string()
+
+    columns = dict(read_processed_columns(output_parquet, ['Région', 'Grand-Prix']))
+    assert list(columns) == ['Région', 'Grand-Prix']
+    for field, values in columns.items():
+        assert values == [row[field] for row in from_json]
+    assert dict(read_processed_columns(output_parquet)) == {field: [row[field] for row in from_json]
+                                                            for field in fields}
+
+def test_parquet_append_keeps_the_encoding(tmp_path):
+    records = laureate_records(40)
+    output = tmp_path / "processed.parquet"
+    save_processed_parquet(records[:30], list(records[0]), output, 'zstd')
+
+    assert append_processed_parquet(records[30:], output, 'zstd')
+    assert pa.types.is_dictionary(pq.read_schema(output).field('Région').type)
+    assert dict(read_processed_columns(output)) == {field: [row[field] for row in records] for field in records[0]}
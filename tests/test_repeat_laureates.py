@@ -0,0 +1,26 @@
+"""Person keys of the repeat-laureate graph (repeat_laureates.py)"""
+
+import pandas as pd
+
+from repeat_laureates import NAME_COLUMNS, build_repeat_graph, person_keys
+
+LAUREATES = pd.DataFrame({
+    'Nom du lauréat': ['Martin', 'MARTIN', 'Durand', None],
+    'Prénom du candidat': ['Élise', 'Elise', 'Élise', None],
+    'Année de concours': ['2015', '2018', '2018', '2019'],
+    'Type de candidature': ['en émergence', 'création-développement', 'en émergence', 'en émergence'],
+})
+
+def test_person_keys_fold_names_and_keep_nameless_rows_apart():
+    keys = person_keys(LAUREATES)
+
+    assert keys[0] == keys[1]
+    assert len(set(keys)) == 3
+
+def test_person_keys_without_a_name_column():
+    keys = person_keys(LAUREATES.drop(columns=['Prénom du candidat']))
+    assert keys[0] == keys[1] and keys[1] != keys[2]
+
+    # No name at all: every row is a person of its own
+    graph = build_repeat_graph(LAUREATES.drop(columns=NAME_COLUMNS))
+    assert sorted(graph['row_person']) == [0, 1, 2, 3]